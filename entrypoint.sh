@@ -41,33 +41,7 @@ fi
 
 echo "✅ Configuration file found"
 
-# Start health check server in background
-echo "🚀 Starting health check server..."
-python -c "
-import uvicorn
-import sys
-import os
-sys.path.append('/app')
-os.environ['PYTHONPATH'] = '/app'
-
-from src.core.health import create_app
-app = create_app()
-uvicorn.run(app, host='0.0.0.0', port=8080, log_level='info')
-" &
-
-HEALTH_PID=$!
-
-# Give health server time to start
-sleep 3
-
-# Verify health server is running (accept any response, just check if it's responding)
-if curl -s http://localhost:8080/health > /dev/null 2>&1; then
-    echo "✅ Health check server started (PID: $HEALTH_PID)"
-else
-    echo "❌ Health check server failed to start"
-    exit 1
-fi
-
+# The health API (port 8080) is served by the application process itself
 echo "🚀 Starting OpenClaw application..."
 
 # Start the main application
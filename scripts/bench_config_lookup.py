@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Config lookup micro-benchmark for OpenClaw
+
+Times dotted-key reads the way every request path does them: the old
+split-and-walk lookup against ConfigManager's memoised get().
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.config_manager import ConfigManager  # noqa: E402
+
+KEYS = [
+    "llm.model_name",
+    "llm.timeouts.connect",
+    "security.rate_limiting.enabled",
+    "discord.chat.max_history",
+    "web.enabled",
+    "missing.key.entirely",
+]
+
+
+def split_walk(config, key, default=None):
+    """The pre-cache lookup: split the key and walk the tree on every call"""
+    keys = key.split('.')
+    current = config
+    try:
+        for k in keys:
+            current = current[k]
+        return current
+    except (KeyError, TypeError):
+        return default
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default=str(ROOT / "config" / "config.yaml"))
+    parser.add_argument("--number", type=int, default=200000, help="lookups per key")
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(str(Path(args.config).parent))
+    config_manager.config = yaml.safe_load(Path(args.config).read_text())
+    config = config_manager.config
+
+    print(f"{'key':<34} {'split-walk ns':>14} {'cached ns':>10} {'speedup':>8}")
+    for key in KEYS:
+        before = timeit.timeit(lambda: split_walk(config, key), number=args.number) / args.number
+        after = timeit.timeit(lambda: config_manager.get(key), number=args.number) / args.number
+        print(f"{key:<34} {before * 1e9:>14.0f} {after * 1e9:>10.0f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
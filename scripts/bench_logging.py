@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Event loop lag benchmark for OpenClaw logging
+
+Logs from a busy coroutine with direct handlers and with the queued pipeline,
+while a heartbeat coroutine measures how late the loop wakes up.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.core.logging_setup import LoggingPipeline, TEXT_FORMAT  # noqa: E402
+
+
+class SlowDiskHandler(logging.FileHandler):
+    """File handler with an artificial per-write delay, standing in for a busy disk"""
+
+    def __init__(self, path: str, delay: float):
+        super().__init__(path)
+        self.delay = delay
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        super().emit(record)
+
+
+async def heartbeat(lags, interval: float, stop: asyncio.Event) -> None:
+    """Record wake-up lag like a Discord gateway heartbeat would see it"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(time.perf_counter() - started - interval, 0.0))
+
+
+async def chatty(logger: logging.Logger, messages: int, stop: asyncio.Event) -> None:
+    """Log /chat-style previews, yielding to the loop between messages"""
+    response = "x" * 2000
+    for index in range(messages):
+        logger.info("📤 Sending response %d (%d chars): %.100s", index, len(response), response)
+        await asyncio.sleep(0)
+    stop.set()
+
+
+async def run(logger: logging.Logger, messages: int, interval: float):
+    """Measure heartbeat lag while logging"""
+    lags = []
+    stop = asyncio.Event()
+    await asyncio.gather(heartbeat(lags, interval, stop), chatty(logger, messages, stop))
+    return lags
+
+
+def report(name: str, lags) -> str:
+    """One result line"""
+    lags = sorted(lags) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    return (
+        f"{name:<8} heartbeats {len(lags):5d}  p50 {statistics.median(lags) * 1000:7.2f}ms  "
+        f"p99 {p99 * 1000:7.2f}ms  max {lags[-1] * 1000:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--disk-delay-ms", type=float, default=1.0, help="simulated latency per write")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="heartbeat interval")
+    args = parser.parse_args()
+
+    interval = args.interval_ms / 1000
+    delay = args.disk_delay_ms / 1000
+    root = logging.getLogger()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_handler = SlowDiskHandler(str(Path(tmp) / "direct.log"), delay)
+        direct_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.handlers = [direct_handler]
+        root.setLevel(logging.INFO)
+        direct = asyncio.run(run(logging.getLogger("bench"), args.messages, interval))
+        direct_handler.close()
+
+        queued_handler = SlowDiskHandler(str(Path(tmp) / "queued.log"), delay)
+        queued_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        pipeline = LoggingPipeline([queued_handler], queue_size=args.messages * 2)
+        pipeline.start()
+        queued = asyncio.run(run(logging.getLogger("bench"), args.messages, interval))
+        pipeline.stop()
+
+    print(report("direct", direct))
+    print(report("queued", queued))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup latency benchmark for the OpenClaw health API
+
+Compares the old separate cold uvicorn process with serving the app in-process.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SEPARATE_SERVER = """
+import uvicorn
+from src.core.health import create_app
+uvicorn.run(create_app(), host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def wait_for_health(port: int, timeout: float = 30.0) -> bool:
+    """Poll /health/live until it answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/live", timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.01)
+    return False
+
+
+def bench_separate(port: int) -> float:
+    """Seconds from spawning a fresh interpreter to the first /health answer"""
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SEPARATE_SERVER.format(port=port)],
+        cwd=str(ROOT),
+        env={**os.environ, "PYTHONPATH": str(ROOT)}
+    )
+    try:
+        if not wait_for_health(port):
+            raise RuntimeError("separate health server did not come up")
+        return time.monotonic() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def bench_in_process(port: int) -> float:
+    """Seconds from building the app on a running loop to the first /health answer"""
+    from src.core.health import HealthChecker, HealthServer, create_app
+
+    started = time.monotonic()
+    checker = HealthChecker(None)
+    server = HealthServer(create_app(health_checker=checker), host="127.0.0.1", port=port)
+    if not await server.start():
+        raise RuntimeError("in-process health server did not come up")
+    await asyncio.to_thread(wait_for_health, port)
+    elapsed = time.monotonic() - started
+    await server.stop()
+    return elapsed
+
+
+def summarize(name: str, samples) -> str:
+    """One result line"""
+    return (
+        f"{name:<12} median {statistics.median(samples) * 1000:8.1f}ms  "
+        f"min {min(samples) * 1000:8.1f}ms  max {max(samples) * 1000:8.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+
+    separate = [bench_separate(args.port) for _ in range(args.runs)]
+    in_process = [asyncio.run(bench_in_process(args.port)) for _ in range(args.runs)]
+
+    print(summarize("separate", separate))
+    print(summarize("in-process", in_process))
+    print("(the old entrypoint also slept 3s after spawning the separate server)")
+
+
+if __name__ == "__main__":
+    main()
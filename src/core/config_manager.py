@@ -4,36 +4,86 @@ Configuration Manager for OpenClaw AI Agent
 Handles loading and managing configuration from YAML files and environment variables.
 """
 
+import asyncio
+import copy
+import inspect
 import os
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import logging
 
+from pydantic import ValidationError
+
+from src.core.config_schema import OpenClawConfig, format_errors, parse_config
+
+
+# libyaml's C loader when PyYAML was built with it; several times faster than the pure Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Marks keys that are absent, since None is a legitimate configured value
+_MISSING = object()
+
+ConfigCallback = Callable[[Any], Union[None, Awaitable[None]]]
+
+# Parsed settings (None if invalid) and schema errors for one config tree
+SchemaResult = Tuple[Optional[OpenClawConfig], List[str]]
+
+
+def check_schema(config: Dict[str, Any]) -> SchemaResult:
+    """Parse a config tree against the schema without raising"""
+    try:
+        return parse_config(config), []
+    except ValidationError as e:
+        return None, format_errors(e)
+
 
 class ConfigManager:
     """Configuration manager for OpenClaw AI Agent"""
     
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = config_path or os.getenv("CONFIG_PATH", "/app/config")
-        self.config: Dict[str, Any] = {}
         self.logger = logging.getLogger(__name__)
+        self._lookups: Dict[str, Any] = {}
+        self._subscribers: List[Tuple[str, ConfigCallback]] = []
+        self._watch_task: Optional[asyncio.Task] = None
+        self._file_signature: Optional[Tuple[float, int]] = None
+        self._schema: Optional[Tuple[int, SchemaResult]] = None
+        self._validation: Optional[Tuple[int, bool]] = None
+        self.version = 0
+        self.reloads = 0
+        self.config: Dict[str, Any] = {}
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """The active configuration tree"""
+        return self._config
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]) -> None:
+        """Swap in a new configuration tree and drop cached lookups"""
+        self._config = value
+        self._changed()
+    
+    def _changed(self) -> None:
+        """Start a new config version; lookups, settings and validation are recomputed on demand"""
+        self.version += 1
+        self._lookups = {}
+    
+    @property
+    def config_file(self) -> Path:
+        """Path of the main YAML file"""
+        return Path(self.config_path) / "config.yaml"
     
     async def load_config(self) -> None:
         """Load configuration from YAML files"""
         try:
-            config_file = Path(self.config_path) / "config.yaml"
-            
-            if not config_file.exists():
-                raise FileNotFoundError(f"Configuration file not found: {config_file}")
+            # Reading, YAML parsing and schema parsing all happen in a worker thread
+            candidate, signature, schema = await asyncio.to_thread(self._read_candidate)
+            self._install(candidate, schema)
+            self._file_signature = signature
             
-            with open(config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
-            
-            # Override with environment variables
-            self._override_with_env()
-            
-            self.logger.info(f"✅ Configuration loaded from {config_file}")
+            self.logger.info(f"✅ Configuration loaded from {self.config_file}")
             
         except Exception as e:
             self.logger.error(f"❌ Failed to load configuration: {e}")
@@ -47,6 +97,7 @@ class ConfigManager:
             "MODEL_NAME": "llm.model_name",
             "DISCORD_BOT_TOKEN": "discord.bot.token",
             "GITHUB_TOKEN": "github.api.token",
+            "GITHUB_WEBHOOK_SECRET": "github.webhooks.secret",
             "DOCKER_HOST": "docker.host",
             "LOG_LEVEL": "application.log_level",
         }
@@ -58,8 +109,22 @@ class ConfigManager:
                 self.logger.debug(f"✅ Overrode {config_key} with {env_var}")
     
     def get(self, key: str, default: Any = None) -> Any:
-        """Get configuration value using dot notation"""
-        return self.get_nested_value(key, default)
+        """Get configuration value using dot notation (memoised until the config changes)"""
+        try:
+            value = self._lookups[key]
+        except KeyError:
+            value = self._lookups[key] = self._resolve(key)
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key: str) -> Any:
+        """Walk the tree for a dotted key, returning _MISSING when absent"""
+        current = self._config
+        try:
+            for k in key.split('.'):
+                current = current[k]
+            return current
+        except (KeyError, TypeError):
+            return _MISSING
     
     def set_nested_value(self, key: str, value: Any) -> None:
         """Set nested configuration value using dot notation"""
@@ -72,6 +137,7 @@ class ConfigManager:
             current = current[k]
         
         current[keys[-1]] = value
+        self._changed()
     
     def get_nested_value(self, key: str, default: Any = None) -> Any:
         """Get nested configuration value using dot notation"""
@@ -113,24 +179,145 @@ class ConfigManager:
         """Get GitHub configuration"""
         return self.get("github", {})
     
+    def _install(self, config: Dict[str, Any], schema: SchemaResult) -> None:
+        """Make config current along with its already-computed schema result"""
+        self.config = config
+        self._schema = (self.version, schema)
+    
+    def _schema_result(self) -> SchemaResult:
+        """Schema result for the current config version, parsing it at most once"""
+        if self._schema is None or self._schema[0] != self.version:
+            self._schema = (self.version, check_schema(self._config))
+        return self._schema[1]
+    
+    @property
+    def settings(self) -> Optional[OpenClawConfig]:
+        """Typed, frozen view of the current config, or None if it fails the schema"""
+        return self._schema_result()[0]
+    
     def validate_config(self) -> bool:
-        """Validate essential configuration"""
-        required_keys = [
-            "application.name",
-            "llm.base_url",
-            "llm.model_name",
-        ]
+        """Validate the configuration; the result is cached until the config changes"""
+        if self._validation is not None and self._validation[0] == self.version:
+            return self._validation[1]
         
-        for key in required_keys:
-            if not self.get(key):
-                self.logger.error(f"❌ Required configuration missing: {key}")
-                return False
+        valid = self._check_config()
+        self._validation = (self.version, valid)
+        return valid
+    
+    def _check_config(self) -> bool:
+        """Run the schema and cross-field checks, logging problems once per config version"""
+        settings, errors = self._schema_result()
+        for error in errors:
+            self.logger.error(f"❌ Invalid configuration: {error}")
+        if settings is None:
+            return False
         
         # Validate Discord token if Discord integration is enabled
-        discord_enabled = self.get("discord.enabled", True)
-        if discord_enabled and not self.get_discord_token():
+        if settings.discord.enabled and not self.get_discord_token():
             self.logger.error("❌ Discord token required when Discord integration is enabled")
             return False
         
         self.logger.info("✅ Configuration validation passed")
-        return True
\ No newline at end of file
+        return True
+    
+    def subscribe(self, key: str, callback: ConfigCallback) -> Callable[[], None]:
+        """Call callback(new_value) after a reload changes the value at key; returns an unsubscribe function"""
+        entry = (key, callback)
+        self._subscribers.append(entry)
+        
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+        
+        return unsubscribe
+    
+    def _stat_config_file(self) -> Optional[Tuple[float, int]]:
+        """Modification time and size of the config file, or None if it is missing"""
+        try:
+            stat = self.config_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+    
+    def _read_candidate(self) -> Tuple[Dict[str, Any], Optional[Tuple[float, int]], SchemaResult]:
+        """Read, parse and schema-check the config file without touching the live config (blocking)"""
+        config_file = self.config_file
+        if not config_file.exists():
+            raise FileNotFoundError(f"Configuration file not found: {config_file}")
+        
+        signature = self._stat_config_file()
+        with open(config_file, 'r') as f:
+            candidate = yaml.load(f, Loader=YAML_LOADER) or {}
+        
+        scratch = ConfigManager(self.config_path)
+        scratch.config = candidate
+        scratch._override_with_env()
+        return scratch.config, signature, check_schema(scratch.config)
+    
+    async def reload(self) -> bool:
+        """Re-read the config file and swap it in if it validates, then notify subscribers"""
+        try:
+            candidate, signature, schema = await asyncio.to_thread(self._read_candidate)
+        except Exception as e:
+            self.logger.error(f"❌ Config reload failed, keeping current config: {e}")
+            return False
+        
+        # Swap and validate without awaiting in between, so no task sees a half-applied config
+        previous, previous_schema, previous_valid = self._config, self._schema_result(), self.validate_config()
+        self._install(candidate, schema)
+        if not self.validate_config():
+            self._install(previous, previous_schema)
+            self._validation = (self.version, previous_valid)
+            self.logger.error("❌ Reloaded config is invalid, keeping current config")
+            return False
+        
+        self._file_signature = signature
+        self.reloads += 1
+        self.logger.info(f"🔄 Configuration reloaded from {self.config_file}")
+        await self._notify(previous)
+        return True
+    
+    async def _notify(self, previous: Dict[str, Any]) -> None:
+        """Run subscribers whose key changed between the previous and current config"""
+        old = ConfigManager(self.config_path)
+        old.config = previous
+        
+        for key, callback in list(self._subscribers):
+            new_value = self.get(key)
+            if new_value == old.get(key):
+                continue
+            try:
+                result = callback(copy.deepcopy(new_value))
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"❌ Config subscriber for {key} failed: {e}")
+    
+    async def _watch_loop(self, interval: float) -> None:
+        """Poll the config file's mtime and size off the event loop and reload on change"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                signature = await asyncio.to_thread(self._stat_config_file)
+                if signature is not None and signature != self._file_signature:
+                    if not await self.reload():
+                        # Don't retry a broken file every tick; wait for the next edit
+                        self._file_signature = signature
+            except Exception as e:
+                self.logger.error(f"❌ Config watch failed: {e}")
+    
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Start hot-reloading the config file"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+            self.logger.info(f"✅ Watching {self.config_file} for changes (every {interval}s)")
+    
+    async def stop_watching(self) -> None:
+        """Stop hot-reloading"""
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
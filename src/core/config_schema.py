@@ -0,0 +1,102 @@
+"""
+Configuration Schema for OpenClaw AI Agent
+
+Typed, frozen view of config.yaml used to validate a loaded configuration once per version.
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class _Section(BaseModel):
+    """Immutable config section; keys without a field are kept as-is"""
+    model_config = ConfigDict(frozen=True, extra="allow")
+
+
+class ApplicationSettings(_Section):
+    """application: section"""
+    name: str = Field(min_length=1)
+    version: str = "1.0.0"
+    debug: bool = False
+    log_level: str = "INFO"
+    hot_reload: bool = True
+    hot_reload_interval: float = Field(2.0, gt=0)
+
+
+class LLMSettings(_Section):
+    """llm: section"""
+    base_url: str = Field(min_length=1)
+    model_name: str = Field(min_length=1)
+    api_key: str = "sk-dummy"
+    max_tokens: int = Field(4000, gt=0)
+    temperature: float = Field(0.7, ge=0, le=2)
+
+
+class DiscordBotSettings(_Section):
+    """discord.bot: section"""
+    token: Optional[str] = None
+    command_prefix: str = "/"
+    status: Optional[str] = None
+
+
+class DiscordSettings(_Section):
+    """discord: section"""
+    enabled: bool = True
+    bot: DiscordBotSettings = DiscordBotSettings()
+
+
+class RateLimitSettings(_Section):
+    """security.rate_limiting: section"""
+    enabled: bool = False
+    requests_per_minute: float = Field(30, gt=0)
+    burst: Optional[int] = Field(None, gt=0)
+    guild_requests_per_minute: Optional[float] = Field(None, gt=0)
+    commands: Dict[str, float] = {}
+    backend: Literal["memory", "sqlite"] = "memory"
+    sweep_interval: float = Field(60.0, gt=0)
+
+
+class SecuritySettings(_Section):
+    """security: section"""
+    allowed_discord_servers: List[Any] = []
+    admin_users: List[Any] = []
+    rate_limiting: RateLimitSettings = RateLimitSettings()
+
+
+class WebSettings(_Section):
+    """web: section"""
+    enabled: bool = True
+    host: str = "0.0.0.0"
+    port: int = Field(8080, ge=0, le=65535)
+    log_level: str = "warning"
+
+
+class MonitoringSettings(_Section):
+    """monitoring: section"""
+    prometheus_enabled: bool = False
+    prometheus_port: int = Field(9090, ge=0, le=65535)
+    health_check_interval: float = Field(30, gt=0)
+
+
+class OpenClawConfig(_Section):
+    """Whole config.yaml; sections without a model stay plain dicts"""
+    application: ApplicationSettings
+    llm: LLMSettings
+    discord: DiscordSettings = DiscordSettings()
+    security: SecuritySettings = SecuritySettings()
+    web: WebSettings = WebSettings()
+    monitoring: MonitoringSettings = MonitoringSettings()
+
+
+def parse_config(config: Dict[str, Any]) -> OpenClawConfig:
+    """Parse a raw config tree, raising pydantic.ValidationError if it does not fit the schema"""
+    return OpenClawConfig.model_validate(config or {})
+
+
+def format_errors(error: ValidationError) -> List[str]:
+    """One "dotted.key: message" line per schema violation"""
+    return [
+        f"{'.'.join(str(part) for part in detail['loc']) or '<root>'}: {detail['msg']}"
+        for detail in error.errors()
+    ]
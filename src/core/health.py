@@ -6,23 +6,38 @@ Provides health check endpoints and monitoring for the application.
 
 import logging
 import asyncio
+import contextlib
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 
+from src.core.lazy import lazy_import
+from src.core.metrics import Metrics, get_metrics
+
+# Only needed when the agent serves the API itself
+uvicorn = lazy_import("uvicorn")
+
 
 class HealthChecker:
     """Health checker service for OpenClaw"""
     
-    def __init__(self, config_manager, llm_client=None):
+    def __init__(self, config_manager, llm_client=None, metrics: Optional[Metrics] = None):
         self.config_manager = config_manager
         self.llm_client = llm_client
+        self.metrics = metrics or get_metrics()
         self.logger = logging.getLogger(__name__)
         self.start_time = datetime.now()
+        self.check_interval = (
+            config_manager.get("monitoring.health_check_interval", 30) if config_manager else 30
+        )
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.stopping = False
     
-    async def get_system_health(self) -> Dict[str, Any]:
-        """Get comprehensive system health"""
+    async def get_system_health(self, deep: bool = False) -> Dict[str, Any]:
+        """Get comprehensive system health (deep=True runs a real vLLM generation)"""
         health = {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
@@ -33,7 +48,7 @@ class HealthChecker:
         
         # Check vLLM service
         if self.llm_client:
-            llm_health = await self.llm_client.health_check()
+            llm_health = await self.llm_client.health_check(deep=deep)
             health["services"]["vllm"] = llm_health
             
             # Update overall status based on vLLM
@@ -97,31 +112,101 @@ class HealthChecker:
         
         return health
     
-    async def get_simple_health(self) -> Dict[str, Any]:
-        """Get simple health status for load balancers"""
-        health = await self.get_system_health()
+    async def refresh(self) -> Dict[str, Any]:
+        """Run a cheap health check and store it as the cached snapshot"""
+        self._snapshot = await self.get_system_health(deep=False)
+        self.metrics.record_health(self._snapshot)
+        return self._snapshot
+    
+    async def _monitor_loop(self) -> None:
+        """Refresh the cached snapshot every monitoring.health_check_interval seconds"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.logger.error(f"❌ Health refresh failed: {e}")
+            await asyncio.sleep(self.check_interval)
+    
+    def start_monitor(self) -> None:
+        """Start the background health monitor"""
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+            self.logger.info(f"✅ Health monitor started (interval: {self.check_interval}s)")
+    
+    async def stop_monitor(self) -> None:
+        """Stop the background health monitor"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+    
+    def get_cached_health(self) -> Optional[Dict[str, Any]]:
+        """Latest snapshot from the background monitor, if any"""
+        return self._snapshot
+    
+    def get_liveness(self) -> Dict[str, Any]:
+        """Liveness status - process is up, no I/O performed"""
+        return {
+            "status": "alive",
+            "timestamp": datetime.now().isoformat(),
+            "uptime_seconds": (datetime.now() - self.start_time).total_seconds()
+        }
+    
+    def mark_stopping(self) -> None:
+        """Report not-ready while the agent drains during shutdown"""
+        self.stopping = True
+    
+    def get_readiness(self) -> Dict[str, Any]:
+        """Readiness status from the cached snapshot"""
+        if self.stopping:
+            return {"status": "stopping", "timestamp": datetime.now().isoformat()}
+        if self._snapshot is None:
+            return {"status": "starting", "timestamp": datetime.now().isoformat()}
         return {
-            "status": health["status"],
-            "timestamp": health["timestamp"]
+            "status": self._snapshot["status"],
+            "timestamp": self._snapshot["timestamp"]
         }
+    
+    async def get_simple_health(self) -> Dict[str, Any]:
+        """Get simple health status for load balancers"""
+        return self.get_readiness()
 
 
-def create_app(config_manager=None, llm_client=None) -> FastAPI:
-    """Create FastAPI application for health checks"""
+def create_app(
+    config_manager=None,
+    llm_client=None,
+    health_checker: Optional[HealthChecker] = None,
+    webhooks=None
+) -> FastAPI:
+    """Create FastAPI application for health checks (pass health_checker to share the agent's)
+
+    With a WebhookProcessor, GitHub deliveries are accepted on POST /github/webhook.
+    """
+    health_checker = health_checker or HealthChecker(config_manager, llm_client)
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        health_checker.start_monitor()
+        yield
+        await health_checker.stop_monitor()
+    
     app = FastAPI(
         title="OpenClaw Health API",
         description="Health check endpoints for OpenClaw AI Agent",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
-    
-    health_checker = HealthChecker(config_manager, llm_client)
+    app.state.health_checker = health_checker
     
     @app.get("/health")
     async def health_check():
         """Simple health check endpoint - always returns 200 if server is running"""
         try:
             # During initial startup, just confirm the server is responding
-            if config_manager is None:
+            if health_checker.config_manager is None:
                 return JSONResponse(
                     content={"status": "healthy", "timestamp": datetime.now().isoformat(), "message": "Server starting up"},
                     status_code=200
@@ -135,11 +220,23 @@ def create_app(config_manager=None, llm_client=None) -> FastAPI:
                 status_code=500
             )
     
+    @app.get("/health/live")
+    async def liveness_check():
+        """Liveness endpoint - no I/O, 200 while the event loop is serving"""
+        return JSONResponse(content=health_checker.get_liveness(), status_code=200)
+    
+    @app.get("/health/ready")
+    async def readiness_check():
+        """Readiness endpoint - served from the cached monitor snapshot"""
+        health = health_checker.get_readiness()
+        status_code = 200 if health["status"] == "healthy" else 503
+        return JSONResponse(content=health, status_code=status_code)
+    
     @app.get("/health/detailed")
     async def detailed_health_check():
         """Detailed health check endpoint"""
         try:
-            health = await health_checker.get_system_health()
+            health = health_checker.get_cached_health() or await health_checker.refresh()
             status_code = 200 if health["status"] == "healthy" else 503
             return JSONResponse(content=health, status_code=status_code)
         except Exception as e:
@@ -148,6 +245,26 @@ def create_app(config_manager=None, llm_client=None) -> FastAPI:
                 status_code=500
             )
     
+    @app.get("/health/deep")
+    async def deep_health_check():
+        """Deep probe endpoint - runs a real vLLM generation"""
+        try:
+            health = await health_checker.get_system_health(deep=True)
+            status_code = 200 if health["status"] == "healthy" else 503
+            return JSONResponse(content=health, status_code=status_code)
+        except Exception as e:
+            return JSONResponse(
+                content={"status": "error", "message": str(e)},
+                status_code=500
+            )
+    
+    if webhooks is not None:
+        @app.post("/github/webhook")
+        async def github_webhook(request: Request):
+            """Verify the signature and queue the delivery; processing happens in the background"""
+            status_code, status = webhooks.accept(await request.body(), request.headers)
+            return JSONResponse(content={"status": status}, status_code=status_code)
+    
     @app.get("/")
     async def root():
         """Root endpoint"""
@@ -155,7 +272,68 @@ def create_app(config_manager=None, llm_client=None) -> FastAPI:
             "service": "OpenClaw AI Agent",
             "status": "running",
             "health_check": "/health",
-            "detailed_health": "/health/detailed"
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
+            "detailed_health": "/health/detailed",
+            "deep_health": "/health/deep"
         }
     
-    return app
\ No newline at end of file
+    return app
+
+
+class HealthServer:
+    """Serves the health API on the agent's own event loop"""
+    
+    def __init__(self, app: FastAPI, host: str = "0.0.0.0", port: int = 8080, log_level: str = "warning"):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level=log_level, access_log=False, lifespan="on")
+        )
+        # The agent owns SIGINT/SIGTERM and stops the server itself: capture_signals is the
+        # hook from uvicorn 0.29 on, install_signal_handlers the one before it
+        self.server.capture_signals = contextlib.nullcontext
+        self.server.install_signal_handlers = lambda: None
+        self._task: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def from_config(cls, config_manager, health_checker: HealthChecker, webhooks=None) -> "HealthServer":
+        """Build a server for the agent's health checker from the web config section"""
+        return cls(
+            create_app(config_manager, health_checker.llm_client, health_checker=health_checker, webhooks=webhooks),
+            host=config_manager.get("web.host", "0.0.0.0"),
+            port=config_manager.get("web.port", 8080),
+            log_level=config_manager.get("web.log_level", "warning")
+        )
+    
+    async def _serve(self) -> None:
+        """Run uvicorn, which calls sys.exit when it cannot bind or start the app"""
+        try:
+            await self.server.serve()
+        except SystemExit as e:
+            self.logger.error(f"❌ Health server exited during startup (code {e.code})")
+    
+    async def start(self, timeout: float = 10.0) -> bool:
+        """Start serving and wait until the socket is listening"""
+        self._task = asyncio.create_task(self._serve())
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not self.server.started:
+            if self._task.done() or asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        self.logger.info(f"✅ Health API serving in-process on {self.host}:{self.port}")
+        return True
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Finish in-flight requests, run the app shutdown, then close the socket"""
+        if self._task is None:
+            return
+        self.server.should_exit = True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.server.force_exit = True
+            await self._task
+        self._task = None
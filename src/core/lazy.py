@@ -0,0 +1,152 @@
+"""
+Lazy Imports for OpenClaw AI Agent
+
+Defers heavy third-party and subsystem imports until first use, and profiles import cost.
+"""
+
+import importlib
+import re
+import subprocess
+import sys
+import threading
+import time
+import types
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Seconds spent resolving each lazy module on first use
+_load_times: Dict[str, float] = {}
+_load_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        """Import the real module once and return it"""
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            with _load_lock:
+                module = self.__dict__["_lazy_target"]
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    _load_times.setdefault(self.__name__, time.perf_counter() - started)
+                    self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return a module, or a LazyModule proxy if it has not been imported yet"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def attach(package: str, attrs: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]], List[str]]:
+    """PEP 562 helpers exposing attrs ({name: "relative.module"}) from a package on first access
+
+    Usage in a package ``__init__``::
+
+        __getattr__, __dir__, __all__ = attach(__name__, {"Client": ".client"})
+    """
+    def __getattr__(name: str):
+        if name not in attrs:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(attrs[name], package)
+        value = getattr(module, name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(attrs) | set(vars(sys.modules[package])))
+
+    return __getattr__, __dir__, sorted(attrs)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """Whether a module returned by lazy_import has actually been imported"""
+    return not isinstance(module, LazyModule) or module.__dict__["_lazy_target"] is not None
+
+
+def get_lazy_load_times() -> Dict[str, float]:
+    """First-use import cost of each lazy module resolved so far"""
+    return dict(_load_times)
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``python -X importtime`` output"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        """Top-level package the module belongs to"""
+        return self.module.split(".", 1)[0]
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse ``-X importtime`` stderr into timings, skipping the header and other noise"""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def profile_imports(target: str = "src.core.main", python: Optional[str] = None) -> List[ImportTiming]:
+    """Import target in a fresh interpreter with -X importtime and return the timings"""
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def format_import_table(timings: Iterable[ImportTiming], limit: int = 25) -> str:
+    """Per-package self time and the slowest modules by cumulative time"""
+    timings = list(timings)
+    total_us = sum(t.self_us for t in timings)
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        by_package[timing.package] += timing.self_us
+
+    lines = [f"Total import time: {total_us / 1000:.1f}ms across {len(timings)} modules", ""]
+    lines.append(f"{'package':<32} {'self ms':>10} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        share = self_us / total_us if total_us else 0.0
+        lines.append(f"{package:<32} {self_us / 1000:>10.1f} {share:>7.1%}")
+
+    lines += ["", f"{'module':<48} {'self ms':>10} {'cumulative ms':>14}"]
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:limit]:
+        lines.append(f"{timing.module:<48} {timing.self_us / 1000:>10.1f} {timing.cumulative_us / 1000:>14.1f}")
+    return "\n".join(lines)
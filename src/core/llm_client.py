@@ -5,11 +5,29 @@ Handles communication with vLLM server for AI-powered responses.
 """
 
 import asyncio
+import json
 import logging
-import aiohttp
-from typing import Dict, List, Any, Optional
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Deque, Dict, List, Any, AsyncIterator, Optional, Tuple
 from dataclasses import dataclass
 
+from src.core.lazy import lazy_import
+from src.core.llm_router import Endpoint, EndpointRouter
+from src.core.metrics import Metrics, get_metrics
+from src.core.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+from src.core.response_cache import ResponseCache, make_cache_key
+from src.core.tokens import PromptBudget, TokenCounter, TokenUsage
+
+aiohttp = lazy_import("aiohttp")
+
+
+DEFAULT_SYSTEM_MESSAGE = (
+    "You are OpenClaw, an AI DevOps assistant. You help with Docker, GitHub, "
+    "and development tasks using clear, actionable responses."
+)
+
 
 @dataclass
 class ChatMessage:
@@ -18,11 +36,356 @@ class ChatMessage:
     content: str
 
 
+class SchedulerBusyError(Exception):
+    """Raised when a scheduler lane is full and the request is shed"""
+
+
+# Lanes in priority order: interactive chat first, health probes before background work
+SCHEDULER_LANES = ("interactive", "health", "background")
+
+DEFAULT_LANE_QUEUE_LIMITS = {
+    "interactive": 32,
+    "health": 2,
+    "background": 16,
+}
+
+
+@dataclass
+class LaneStats:
+    """Admission statistics for one scheduler lane"""
+    admitted: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record_wait(self, waited: float) -> None:
+        """Record how long an admitted request waited for a slot"""
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+
+class RequestScheduler:
+    """Bounded-concurrency admission control with priority lanes in front of vLLM"""
+
+    def __init__(self, max_in_flight: int = 4, queue_limits: Optional[Dict[str, int]] = None):
+        self.max_in_flight = max_in_flight
+        self.queue_limits = queue_limits if queue_limits is not None else dict(DEFAULT_LANE_QUEUE_LIMITS)
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in SCHEDULER_LANES}
+        self._stats: Dict[str, LaneStats] = {lane: LaneStats() for lane in SCHEDULER_LANES}
+
+    @classmethod
+    def from_config(cls, scheduler_config: Dict[str, Any]) -> "RequestScheduler":
+        """Build a scheduler from the llm.scheduler config section"""
+        queue_limits = dict(DEFAULT_LANE_QUEUE_LIMITS)
+        queue_limits.update(scheduler_config.get("queue_limits", {}))
+        return cls(
+            max_in_flight=scheduler_config.get("max_in_flight", 4),
+            queue_limits=queue_limits
+        )
+
+    def _check_lane(self, lane: str) -> None:
+        """Reject unknown lane names"""
+        if lane not in self._waiters:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+
+    def queue_depth(self, lane: Optional[str] = None) -> int:
+        """Number of requests waiting, for one lane or all lanes"""
+        if lane:
+            return len(self._waiters[lane])
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, lane: str = "interactive") -> None:
+        """Wait for an execution slot, or raise SchedulerBusyError if the lane is full"""
+        self._check_lane(lane)
+        stats = self._stats[lane]
+
+        if self.in_flight < self.max_in_flight and not self.queue_depth():
+            self.in_flight += 1
+            stats.record_wait(0.0)
+            return
+
+        if len(self._waiters[lane]) >= self.queue_limits.get(lane, 0):
+            stats.rejected += 1
+            raise SchedulerBusyError(f"vLLM scheduler lane '{lane}' is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        queued_at = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on
+                self.release()
+            else:
+                self._waiters[lane].remove(waiter)
+            raise
+        stats.record_wait(time.monotonic() - queued_at)
+
+    def release(self) -> None:
+        """Release a slot, handing it directly to the highest-priority waiter"""
+        for lane in SCHEDULER_LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "interactive"):
+        """Hold an execution slot for the duration of the block"""
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and wait-time statistics per lane"""
+        lanes = {}
+        for lane in SCHEDULER_LANES:
+            stats = self._stats[lane]
+            lanes[lane] = {
+                "queue_depth": len(self._waiters[lane]),
+                "queue_limit": self.queue_limits.get(lane, 0),
+                "admitted": stats.admitted,
+                "rejected": stats.rejected,
+                "avg_wait_seconds": stats.total_wait / stats.admitted if stats.admitted else 0.0,
+                "max_wait_seconds": stats.max_wait,
+            }
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth(),
+            "lanes": lanes,
+        }
+
+
+@dataclass
+class TimeoutSettings:
+    """Per-phase HTTP timeouts, with the total budget scaled by max_tokens"""
+    connect: float = 5.0
+    sock_read: float = 60.0
+    total: float = 30.0
+    per_token: float = 0.05
+    max_total: float = 600.0
+
+    @classmethod
+    def from_config(cls, timeout_config: Dict[str, Any]) -> "TimeoutSettings":
+        """Build settings from the llm.timeouts config section"""
+        return cls(
+            connect=timeout_config.get("connect", 5.0),
+            sock_read=timeout_config.get("sock_read", 60.0),
+            total=timeout_config.get("total", 30.0),
+            per_token=timeout_config.get("per_token", 0.05),
+            max_total=timeout_config.get("max_total", 600.0)
+        )
+
+    def for_request(self, max_tokens: Optional[int] = None) -> "aiohttp.ClientTimeout":
+        """ClientTimeout for a request expected to generate up to max_tokens"""
+        total = min(self.max_total, self.total + (max_tokens or 0) * self.per_token)
+        return aiohttp.ClientTimeout(total=total, connect=self.connect, sock_read=self.sock_read)
+
+
+class ConnectionPoolStats:
+    """Connection pool utilisation gathered from aiohttp trace hooks"""
+
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        self.queue_wait_total = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def trace_config(self) -> "aiohttp.TraceConfig":
+        """TraceConfig wiring the pool hooks to these counters"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_queued_start(session, context, params):
+            context.queued_at = time.monotonic()
+
+        async def on_queued_end(session, context, params):
+            self.queued += 1
+            self.queue_wait_total += time.monotonic() - context.queued_at
+
+        async def on_create_end(session, context, params):
+            self.created += 1
+
+        async def on_reuse(session, context, params):
+            self.reused += 1
+
+        async def on_request_start(session, context, params):
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        async def on_request_done(session, context, params):
+            self.in_use -= 1
+
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_done)
+        trace_config.on_request_exception.append(on_request_done)
+        return trace_config
+
+    def get_stats(self, limit: int, limit_per_host: int) -> Dict[str, Any]:
+        """Pool utilisation for tuning the connector limits"""
+        acquired = self.created + self.reused
+        return {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "requests_in_flight": self.in_use,
+            "peak_requests_in_flight": self.peak_in_use,
+            "utilization": self.in_use / limit if limit else 0.0,
+            "connections_created": self.created,
+            "connections_reused": self.reused,
+            "reuse_ratio": self.reused / acquired if acquired else 0.0,
+            "queued_for_connection": self.queued,
+            "avg_queue_wait_seconds": self.queue_wait_total / self.queued if self.queued else 0.0,
+        }
+
+
+BatchKey = Tuple[str, int, float, str]
+
+
+class CompletionBatcher:
+    """Coalesces concurrent short prompts into multi-prompt /completions calls"""
+
+    def __init__(
+        self,
+        send_batch: Callable[[BatchKey, List[str]], Awaitable[Optional[List[str]]]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.005
+    ):
+        self.send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.logger = logging.getLogger(__name__)
+        self._pending: Dict[BatchKey, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self.batches = 0
+        self.batched_requests = 0
+
+    @classmethod
+    def from_config(cls, send_batch, batching_config: Dict[str, Any]) -> "CompletionBatcher":
+        """Build a batcher from the llm.batching config section"""
+        return cls(
+            send_batch,
+            max_batch_size=batching_config.get("max_batch_size", 16),
+            max_wait=batching_config.get("max_wait_ms", 5) / 1000
+        )
+
+    async def submit(self, key: BatchKey, prompt: str) -> Optional[str]:
+        """Queue a prompt and wait for its slice of the batched response"""
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((prompt, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._dispatch(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_wait, self._dispatch, key)
+
+        return await future
+
+    def _dispatch(self, key: BatchKey) -> None:
+        """Detach the pending batch for a key and send it in the background"""
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: BatchKey, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send one batch and fan the results back out to the waiting futures"""
+        self.batches += 1
+        self.batched_requests += len(batch)
+        try:
+            results = await self.send_batch(key, [prompt for prompt, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(results[index] if results and index < len(results) else None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching effectiveness counters"""
+        return {
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "avg_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+        }
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key"""
+
+    def __init__(self, on_deduplicated: Optional[Callable[[], None]] = None):
+        self.on_deduplicated = on_deduplicated
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once per key at a time; duplicates await the leader's result"""
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.deduplicated += 1
+            if self.on_deduplicated:
+                self.on_deduplicated()
+        # Shield so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call so later requests start a fresh one"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every waiter has already gone away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Deduplication counters"""
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._calls),
+        }
+
+
+def make_request_key(request_data: Dict[str, Any]) -> str:
+    """Normalized key for a request payload, independent of dict ordering"""
+    return json.dumps(request_data, sort_keys=True, separators=(",", ":"))
+
+
 class VLLMClient:
     """Client for interacting with vLLM server"""
     
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, metrics: Optional[Metrics] = None):
         self.config_manager = config_manager
+        self.metrics = metrics or get_metrics()
         self.logger = logging.getLogger(__name__)
         self.session: Optional[aiohttp.ClientSession] = None
         self.base_url: str = ""
@@ -30,6 +393,25 @@ class VLLMClient:
         self.api_key: str = ""
         self.max_tokens: int = 4000
         self.temperature: float = 0.7
+        self.scheduler = RequestScheduler()
+        self.cache: Optional[ResponseCache] = None
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+        self.breaker_config: Dict[str, Any] = {}
+        self.timeouts = TimeoutSettings()
+        self.pool_stats = ConnectionPoolStats()
+        self.connection_limit: int = 32
+        self.connection_limit_per_host: int = 16
+        self.router: Optional[EndpointRouter] = None
+        self.endpoints_config: Optional[List[Any]] = None
+        self.lane_models: Dict[str, str] = {}
+        self.batcher: Optional[CompletionBatcher] = None
+        self.batch_max_tokens: int = 64
+        self.single_flight: Optional[SingleFlight] = SingleFlight(self.metrics.llm_deduplicated.inc)
+        self.tokens = TokenCounter()
+        self.budget = PromptBudget()
+        self.token_usage = TokenUsage()
+        self._unsubscribe_config: Optional[Callable[[], None]] = None
     
     async def initialize(self) -> None:
         """Initialize the vLLM client"""
@@ -41,115 +423,569 @@ class VLLMClient:
             self.api_key = llm_config.get("api_key", "sk-dummy")
             self.max_tokens = llm_config.get("max_tokens", 4000)
             self.temperature = llm_config.get("temperature", 0.7)
+            self.scheduler = RequestScheduler.from_config(llm_config.get("scheduler", {}))
+            self.retry_policy = RetryPolicy.from_config(llm_config.get("retry", {}))
+            self.breaker_config = llm_config.get("circuit_breaker", {})
+            self.circuit_breaker = CircuitBreaker.from_config(self.breaker_config)
+            
+            # Optional multi-replica routing and per-lane model selection
+            self.endpoints_config = llm_config.get("endpoints")
+            self.router = EndpointRouter.from_config(llm_config)
+            self.lane_models = llm_config.get("lane_models", {})
+            
+            # Optional micro-batching of short prompt completions
+            batching_config = llm_config.get("batching", {})
+            if batching_config.get("enabled", False):
+                self.batcher = CompletionBatcher.from_config(self._send_prompt_batch, batching_config)
+                self.batch_max_tokens = batching_config.get("max_tokens", 64)
+            
+            # Token counting and context window budget (loading a tokenizer reads from disk)
+            tokens_config = llm_config.get("tokens", {})
+            self.tokens = await asyncio.to_thread(TokenCounter.from_config, tokens_config)
+            self.budget = PromptBudget.from_config(tokens_config)
+            
+            # Identical concurrent requests share one generation unless disabled
+            if not llm_config.get("single_flight", {}).get("enabled", True):
+                self.single_flight = None
+            
+            # Opt-in completion cache
+            cache_config = llm_config.get("cache", {})
+            if cache_config.get("enabled", False):
+                self.cache = ResponseCache.from_config(cache_config)
+                await self.cache.load()
+            
+            # Create HTTP session with a tuned keep-alive pool and per-phase timeouts
+            connection_config = llm_config.get("connection", {})
+            self.connection_limit = connection_config.get("limit", 32)
+            self.connection_limit_per_host = connection_config.get("limit_per_host", 16)
+            self.timeouts = TimeoutSettings.from_config(llm_config.get("timeouts", {}))
+            
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=connection_config.get("keepalive_timeout", 60),
+                use_dns_cache=True,
+                ttl_dns_cache=connection_config.get("dns_cache_ttl", 300)
+            )
             
-            # Create HTTP session
             self.session = aiohttp.ClientSession(
+                connector=connector,
                 headers={
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {self.api_key}"
                 },
-                timeout=aiohttp.ClientTimeout(total=30)
+                timeout=self.timeouts.for_request(),
+                trace_configs=[self.pool_stats.trace_config()]
             )
             
-            self.logger.info(f"✅ vLLM client initialized: {self.base_url}")
+            # Pick up model/timeout/retry changes when the config file is edited
+            self._unsubscribe_config = self.config_manager.subscribe("llm", self.apply_config)
+            
+            if self.router:
+                self.logger.info(f"✅ vLLM client initialized with {len(self.router.endpoints)} endpoints ({self.router.strategy})")
+            else:
+                self.logger.info(f"✅ vLLM client initialized: {self.base_url}")
             
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize vLLM client: {e}")
             raise
     
+    def apply_config(self, llm_config: Dict[str, Any]) -> None:
+        """Apply reloaded per-request llm settings to the live client"""
+        self.model_name = llm_config.get("model_name", self.model_name)
+        self.max_tokens = llm_config.get("max_tokens", self.max_tokens)
+        self.temperature = llm_config.get("temperature", self.temperature)
+        self.lane_models = llm_config.get("lane_models", {})
+        self.retry_policy = RetryPolicy.from_config(llm_config.get("retry", {}))
+        self.timeouts = TimeoutSettings.from_config(llm_config.get("timeouts", {}))
+        
+        # The session, connection pool and endpoint list are built once at startup
+        if (
+            llm_config.get("base_url", self.base_url) != self.base_url
+            or llm_config.get("endpoints") != self.endpoints_config
+        ):
+            self.logger.warning("⚠️ llm.base_url/endpoints changes take effect after a restart")
+        
+        self.logger.info(f"🔄 vLLM client settings reloaded (model: {self.model_name})")
+    
+    def _model_urls(self) -> List[str]:
+        """Servers to probe: every routed replica, or the single base_url"""
+        if self.router:
+            return [endpoint.base_url for endpoint in self.router.endpoints]
+        return [self.base_url]
+    
+    async def _fetch_models(self, base_url: str) -> Optional[List[str]]:
+        """Model ids one server lists, or None when it does not answer"""
+        try:
+            async with self.session.get(f"{base_url}/models") as response:
+                if response.status != 200:
+                    self.logger.error(f"❌ vLLM server {base_url} returned status {response.status}")
+                    return None
+                data = await response.json()
+        except Exception as e:
+            self.logger.error(f"❌ vLLM server {base_url} unreachable: {e}")
+            return None
+        models = [model.get("id", "") for model in data.get("data", [])]
+        return [model for model in models if model]  # Filter out empty strings
+    
+    async def _probe_models(self) -> Dict[str, Optional[List[str]]]:
+        """Query /models on every server concurrently"""
+        if not self.session:
+            raise RuntimeError("Client not initialized")
+        urls = self._model_urls()
+        results = await asyncio.gather(*(self._fetch_models(url) for url in urls))
+        return dict(zip(urls, results))
+    
     async def test_connection(self) -> bool:
-        """Test connection to vLLM server"""
+        """Test connection to vLLM; with several replicas, one answering is enough"""
         try:
-            if not self.session:
-                raise RuntimeError("Client not initialized")
-            
-            # Test models endpoint
-            async with self.session.get(f"{self.base_url}/models") as response:
-                if response.status == 200:
-                    models = await response.json()
-                    self.logger.info(f"✅ vLLM server accessible. Available models: {len(models.get('data', []))}")
-                    return True
-                else:
-                    self.logger.error(f"❌ vLLM server returned status {response.status}")
-                    return False
-                    
+            probes = await self._probe_models()
         except Exception as e:
             self.logger.error(f"❌ vLLM connection test failed: {e}")
             return False
+        
+        reachable = [models for models in probes.values() if models is not None]
+        if not reachable:
+            return False
+        models = {model for listed in reachable for model in listed}
+        self.logger.info(
+            f"✅ vLLM server accessible ({len(reachable)}/{len(probes)} servers). Available models: {len(models)}"
+        )
+        return True
+    
+    def _build_request(self, messages: List[ChatMessage], **kwargs) -> Dict[str, Any]:
+        """Build the chat completion request payload"""
+        lane = kwargs.get("lane", "interactive")
+        requested_tokens = kwargs.get("max_tokens", self.max_tokens)
+        original = [{"role": msg.role, "content": msg.content} for msg in messages]
+        
+        # Fit the prompt to the context window here rather than letting vLLM reject it
+        fitted, max_tokens, prompt_tokens = self.budget.fit(self.tokens, original, requested_tokens)
+        if fitted != original:
+            self.token_usage.truncated_requests += 1
+            self.logger.warning(
+                f"⚠️ Prompt trimmed to fit the {self.budget.context_window}-token context window "
+                f"({len(original) - len(fitted)} messages dropped, ~{prompt_tokens} tokens left)"
+            )
+        if max_tokens < requested_tokens:
+            self.token_usage.clamped_requests += 1
+            self.logger.debug("max_tokens clamped from %d to %d (~%d prompt tokens)", requested_tokens, max_tokens, prompt_tokens)
+        
+        return {
+            "model": kwargs.get("model") or self.lane_models.get(lane) or self.model_name,
+            "messages": fitted,
+            "max_tokens": max_tokens,
+            "temperature": kwargs.get("temperature", self.temperature),
+        }
+    
+    def _record_usage(self, usage: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Account the usage block vLLM returned, returning its completion tokens"""
+        prompt_tokens, completion_tokens = self.token_usage.record(usage)
+        if usage:
+            self.metrics.record_token_usage(prompt_tokens, completion_tokens)
+            self.logger.debug("Token usage: %s prompt, %s completion", prompt_tokens, completion_tokens)
+        return completion_tokens
+    
+    def _cache_key(self, request_data: Dict[str, Any], use_cache: Optional[bool]) -> Optional[str]:
+        """Cache key for a request, or None when the request must not be cached"""
+        if self.cache is None:
+            return None
+        # Only deterministic requests are cached unless the caller explicitly asks
+        if use_cache is False or (use_cache is None and request_data["temperature"] != 0):
+            return None
+        return make_cache_key(
+            request_data["model"],
+            request_data["messages"],
+            request_data["max_tokens"],
+            request_data["temperature"]
+        )
+    
+    def _is_upstream_failure(self, status: int) -> bool:
+        """Statuses that count against the breaker and endpoint health"""
+        return status in self.retry_policy.retry_statuses or status >= 500
+    
+    def _breaker(self, endpoint: Optional[Endpoint]) -> CircuitBreaker:
+        """Breaker guarding a request: one per routed replica, so a dead replica cannot block healthy ones"""
+        if endpoint is None:
+            return self.circuit_breaker
+        if endpoint.breaker is None:
+            endpoint.breaker = CircuitBreaker.from_config(self.breaker_config)
+        return endpoint.breaker
+    
+    @asynccontextmanager
+    async def _open_completion(self, request_data: Dict[str, Any], path: str = "/chat/completions"):
+        """POST a completion request, retrying 429/502/503 and connection errors behind the circuit breaker"""
+        attempt = 0
+        while True:
+            attempt += 1
+            # Each attempt re-routes, so a retry lands on a different replica when one is available
+            endpoint = self.router.choose(request_data["model"]) if self.router else None
+            breaker = self._breaker(endpoint)
+            breaker.before_request()
+            base_url = endpoint.base_url if endpoint else self.base_url
+            if endpoint:
+                self.router.start(endpoint)
+            started = time.monotonic()
+            endpoint_ok = False
+            latency = None
+            yielded = False
+            recorded = False
+            cancelled = False
+            retry_after = None
+            try:
+                async with self.session.post(
+                    f"{base_url}{path}",
+                    json=request_data,
+                    timeout=self.timeouts.for_request(request_data.get("max_tokens"))
+                ) as response:
+                    latency = time.monotonic() - started
+                    endpoint_ok = not self._is_upstream_failure(response.status)
+                    if not self.retry_policy.should_retry(response.status, attempt):
+                        if endpoint_ok:
+                            breaker.record_success()
+                        else:
+                            breaker.record_failure()
+                        recorded = True
+                        yielded = True
+                        yield response
+                        return
+                    
+                    breaker.record_failure()
+                    recorded = True
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.logger.warning(f"⚠️ vLLM returned {response.status}, retrying (attempt {attempt})")
+                    
+            except asyncio.TimeoutError:
+                # Timeouts are not retried: a slow generation would just be repeated
+                if not recorded:
+                    breaker.record_failure()
+                    recorded = True
+                raise
+                
+            except aiohttp.ClientConnectionError as e:
+                if yielded:
+                    raise
+                breaker.record_failure()
+                recorded = True
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                self.logger.warning(f"⚠️ vLLM connection failed ({e}), retrying (attempt {attempt})")
+                
+            except asyncio.CancelledError:
+                # /cancel or a caller's wait_for says nothing about the replica's health
+                cancelled = not recorded
+                raise
+                
+            finally:
+                if not recorded:
+                    # Cancelled (or failed unexpectedly) before a response: a half-open probe slot
+                    # must not stay taken, or the breaker rejects every later call
+                    breaker.release_probe()
+                if endpoint and cancelled:
+                    self.router.release(endpoint)
+                elif endpoint:
+                    self.router.finish(endpoint, endpoint_ok, latency)
+            
+            self.metrics.llm_retries.inc()
+            await asyncio.sleep(self.retry_policy.compute_delay(attempt, retry_after))
     
     async def get_completion(self, messages: List[ChatMessage], **kwargs) -> Optional[str]:
         """Get completion from vLLM"""
+        if kwargs.pop("stream", False):
+            # Drain the token stream so stream=True still returns the full text
+            chunks = [chunk async for chunk in self.stream_completion(messages, **kwargs)]
+            return "".join(chunks) if chunks else None
+        
         try:
             if not self.session:
                 raise RuntimeError("Client not initialized")
             
-            # Prepare request
-            request_data = {
-                "model": self.model_name,
-                "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
-                "max_tokens": kwargs.get("max_tokens", self.max_tokens),
-                "temperature": kwargs.get("temperature", self.temperature),
-            }
+            request_data = self._build_request(messages, **kwargs)
             
-            # Add optional parameters
-            if "stream" in kwargs:
-                request_data["stream"] = kwargs["stream"]
+            cache_key = self._cache_key(request_data, kwargs.get("cache"))
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.logger.debug("✅ Completion served from cache (%d chars)", len(cached))
+                    return cached
             
-            async with self.session.post(
-                f"{self.base_url}/chat/completions",
-                json=request_data
-            ) as response:
-                if response.status == 200:
+            lane = kwargs.get("lane", "interactive")
+            return await self._coalesce(
+                make_request_key(request_data),
+                lambda: self._fetch_completion(request_data, lane, cache_key)
+            )
+
+        except SchedulerBusyError:
+            self.metrics.record_llm_error("busy")
+            self.logger.warning("🚦 vLLM scheduler busy, shedding request")
+            raise
+        except CircuitOpenError as e:
+            self.metrics.record_llm_error("circuit_open")
+            self.logger.warning(f"🔌 {e}")
+            return None
+        except Exception as e:
+            self.metrics.record_llm_error("exception")
+            self.logger.error(f"❌ Failed to get completion: {e}")
+            return None
+    
+    async def _coalesce(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn through the single-flight layer when it is enabled"""
+        if self.single_flight is None:
+            return await fn()
+        return await self.single_flight.do(key, fn)
+    
+    async def _fetch_completion(
+        self,
+        request_data: Dict[str, Any],
+        lane: str,
+        cache_key: Optional[str]
+    ) -> Optional[str]:
+        """Send one chat completion request and cache the result"""
+        async with self.scheduler.slot(lane):
+            started = time.monotonic()
+            with self.metrics.llm_in_flight.track_inprogress():
+                async with self._open_completion(request_data) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        self.metrics.record_llm_error(response.status)
+                        self.logger.error(f"❌ vLLM API error {response.status}: {error_text}")
+                        return None
+                    
                     result = await response.json()
                     content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    self.logger.debug(f"✅ Received completion ({len(content)} chars)")
-                    return content
-                else:
-                    error_text = await response.text()
-                    self.logger.error(f"❌ vLLM API error {response.status}: {error_text}")
-                    return None
+                    self.metrics.record_llm_request(
+                        "completion",
+                        time.monotonic() - started,
+                        completion_tokens=self._record_usage(result.get("usage"))
+                    )
+                    self.logger.debug("✅ Received completion (%d chars)", len(content))
+        
+        # Written after the slot is released, so a disk-backed cache never holds up a lane
+        if cache_key and content:
+            await self.cache.set(cache_key, content)
+        return content
+    
+    async def _send_prompt_batch(self, key: BatchKey, prompts: List[str]) -> Optional[List[str]]:
+        """POST several prompts in one /completions call, returning texts in prompt order"""
+        model, max_tokens, temperature, lane = key
+        request_data = {
+            "model": model,
+            "prompt": prompts,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        
+        async with self.scheduler.slot(lane):
+            started = time.monotonic()
+            with self.metrics.llm_in_flight.track_inprogress():
+                async with self._open_completion(request_data, path="/completions") as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        self.metrics.record_llm_error(response.status)
+                        self.logger.error(f"❌ vLLM API error {response.status}: {error_text}")
+                        return None
                     
+                    result = await response.json()
+                    self.metrics.record_llm_request(
+                        "batch",
+                        time.monotonic() - started,
+                        completion_tokens=self._record_usage(result.get("usage"))
+                    )
+                    self.metrics.llm_batch_size.observe(len(prompts))
+                    
+                    texts: List[Optional[str]] = [None] * len(prompts)
+                    for position, choice in enumerate(result.get("choices", [])):
+                        index = choice.get("index", position)
+                        if 0 <= index < len(texts):
+                            texts[index] = choice.get("text", "")
+                    return texts
+    
+    async def complete(self, prompt: str, **kwargs) -> Optional[str]:
+        """Raw prompt completion, micro-batched with concurrent short prompts when enabled"""
+        lane = kwargs.get("lane", "background")
+        model = kwargs.get("model") or self.lane_models.get(lane) or self.model_name
+        max_tokens = kwargs.get("max_tokens", self.batch_max_tokens)
+        
+        # Raw prompts have no history to drop, so fit them by cutting the middle
+        prompt_limit = self.budget.context_window - self.budget.min_completion_tokens
+        if self.tokens.count(prompt) > prompt_limit:
+            self.token_usage.truncated_requests += 1
+            prompt = self.tokens.truncate(prompt, prompt_limit)
+        max_tokens = min(max_tokens, max(self.budget.context_window - self.tokens.count(prompt), 1))
+        key: BatchKey = (model, max_tokens, kwargs.get("temperature", self.temperature), lane)
+        
+        try:
+            if not self.session:
+                raise RuntimeError("Client not initialized")
+            
+            if self.batcher and max_tokens <= self.batch_max_tokens:
+                return await self.batcher.submit(key, prompt)
+            
+            results = await self._send_prompt_batch(key, [prompt])
+            return results[0] if results else None
+            
+        except SchedulerBusyError:
+            self.metrics.record_llm_error("busy")
+            self.logger.warning("🚦 vLLM scheduler busy, shedding prompt request")
+            raise
+        except CircuitOpenError as e:
+            self.metrics.record_llm_error("circuit_open")
+            self.logger.warning(f"🔌 {e}")
+            return None
         except Exception as e:
-            self.logger.error(f"❌ Failed to get completion: {e}")
+            self.metrics.record_llm_error("exception")
+            self.logger.error(f"❌ Failed to get prompt completion: {e}")
             return None
     
-    async def chat(self, user_message: str, system_message: Optional[str] = None, **kwargs) -> Optional[str]:
-        """Simple chat interface"""
-        messages = []
+    @staticmethod
+    def _parse_stream_line(line: bytes) -> Optional[str]:
+        """Extract the content delta from one SSE line, or None if it carries no text"""
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text.startswith("data:"):
+            return None
         
-        if system_message:
-            messages.append(ChatMessage(role="system", content=system_message))
-        else:
-            messages.append(ChatMessage(
-                role="system", 
-                content="You are OpenClaw, an AI DevOps assistant. You help with Docker, GitHub, and development tasks using clear, actionable responses."
-            ))
+        data = text[len("data:"):].strip()
+        if not data or data == "[DONE]":
+            return None
         
-        messages.append(ChatMessage(role="user", content=user_message))
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            return None
         
-        return await self.get_completion(messages, **kwargs)
+        choices = chunk.get("choices") or [{}]
+        return choices[0].get("delta", {}).get("content") or None
     
-    async def get_available_models(self) -> List[str]:
-        """Get list of available models from vLLM"""
+    @staticmethod
+    def _parse_stream_usage(line: bytes) -> Optional[Dict[str, Any]]:
+        """Extract the usage block from the final SSE chunk, if this line carries one"""
+        if b'"usage"' not in line:
+            return None
+        
+        text = line.decode("utf-8", errors="replace").strip()
+        try:
+            return json.loads(text[len("data:"):].strip()).get("usage") or None
+        except (json.JSONDecodeError, AttributeError):
+            return None
+    
+    async def stream_completion(self, messages: List[ChatMessage], **kwargs) -> AsyncIterator[str]:
+        """Stream completion tokens from vLLM; on_complete is called only if the stream reached [DONE]"""
+        on_complete: Optional[Callable[[], None]] = kwargs.get("on_complete")
         try:
             if not self.session:
                 raise RuntimeError("Client not initialized")
             
-            async with self.session.get(f"{self.base_url}/models") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    models = [model.get("id", "") for model in data.get("data", [])]
-                    return [model for model in models if model]  # Filter out empty strings
-                else:
-                    self.logger.error(f"❌ Failed to get models: {response.status}")
-                    return []
-                    
+            request_data = self._build_request(messages, **kwargs)
+            
+            cache_key = self._cache_key(request_data, kwargs.get("cache"))
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    yield cached
+                    if on_complete:
+                        on_complete()
+                    return
+            
+            request_data["stream"] = True
+            request_data["stream_options"] = {"include_usage": True}
+            
+            async with self.scheduler.slot(kwargs.get("lane", "interactive")):
+                started = time.monotonic()
+                with self.metrics.llm_in_flight.track_inprogress():
+                    async with self._open_completion(request_data) as response:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            self.metrics.record_llm_error(response.status)
+                            self.logger.error(f"❌ vLLM API error {response.status}: {error_text}")
+                            return
+                        
+                        streamed = []
+                        first_token_at = None
+                        usage = None
+                        finished = False
+                        async for line in response.content:
+                            if line.strip() == b"data: [DONE]":
+                                finished = True
+                                break
+                            content = self._parse_stream_line(line)
+                            if content:
+                                if first_token_at is None:
+                                    first_token_at = time.monotonic()
+                                streamed.append(content)
+                                yield content
+                            else:
+                                usage = self._parse_stream_usage(line) or usage
+                        
+                        # Without a usage chunk, one delta per generated token approximates the count
+                        completion_tokens = self._record_usage(usage)
+                        self.metrics.record_llm_request(
+                            "stream",
+                            time.monotonic() - started,
+                            completion_tokens=completion_tokens if completion_tokens is not None else len(streamed),
+                            time_to_first_token=first_token_at - started if first_token_at else None
+                        )
+                        full_text = "".join(streamed)
+                        if not finished:
+                            # The connection ended without [DONE]: the text is a truncated reply
+                            self.logger.warning(f"⚠️ vLLM stream ended early ({len(full_text)} chars)")
+                            return
+                        self.logger.debug("✅ Streamed completion (%d chars)", len(full_text))
+            
+            # Written after the slot is released, so a disk-backed cache never holds up a lane
+            if cache_key and full_text:
+                await self.cache.set(cache_key, full_text)
+            if on_complete:
+                on_complete()
+                
+        except SchedulerBusyError:
+            self.metrics.record_llm_error("busy")
+            self.logger.warning("🚦 vLLM scheduler busy, shedding stream request")
+            raise
+        except CircuitOpenError as e:
+            self.metrics.record_llm_error("circuit_open")
+            self.logger.warning(f"🔌 {e}")
+        except Exception as e:
+            self.metrics.record_llm_error("exception")
+            self.logger.error(f"❌ Failed to stream completion: {e}")
+    
+    def _build_chat_messages(self, user_message: str, system_message: Optional[str] = None) -> List[ChatMessage]:
+        """Build the system + user message list for the chat helpers"""
+        return [
+            ChatMessage(role="system", content=system_message or DEFAULT_SYSTEM_MESSAGE),
+            ChatMessage(role="user", content=user_message),
+        ]
+    
+    async def chat(self, user_message: str, system_message: Optional[str] = None, **kwargs) -> Optional[str]:
+        """Simple chat interface"""
+        messages = self._build_chat_messages(user_message, system_message)
+        return await self.get_completion(messages, **kwargs)
+    
+    async def stream_chat(self, user_message: str, system_message: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """Streaming variant of chat() yielding content deltas"""
+        messages = self._build_chat_messages(user_message, system_message)
+        async for chunk in self.stream_completion(messages, **kwargs):
+            yield chunk
+    
+    async def get_available_models(self) -> List[str]:
+        """Get the models served by every vLLM server that answers"""
+        try:
+            probes = await self._probe_models()
         except Exception as e:
             self.logger.error(f"❌ Error getting models: {e}")
             return []
+        
+        models: List[str] = []
+        for listed in probes.values():
+            models.extend(model for model in listed or [] if model not in models)
+        return models
     
-    async def health_check(self) -> Dict[str, Any]:
-        """Perform health check on vLLM service"""
+    async def health_check(self, deep: bool = True) -> Dict[str, Any]:
+        """Perform health check on vLLM service (deep=False skips the test generation)"""
+        # Simultaneous /status commands and health probes share one check
+        return await self._coalesce(f"health_check:{deep}", lambda: self._run_health_check(deep))
+    
+    async def _run_health_check(self, deep: bool) -> Dict[str, Any]:
+        """Run one health check against the vLLM service"""
         try:
             if not self.session:
                 return {"status": "error", "message": "Client not initialized"}
@@ -157,25 +993,71 @@ class VLLMClient:
             # Test basic connectivity
             models = await self.get_available_models()
             
-            # Test actual completion
-            test_response = await self.chat("Say 'OK' if you can hear me.", max_tokens=10)
+            # Test actual completion; stats below are read after it so they include it
+            if deep:
+                test_response = await self.chat("Say 'OK' if you can hear me.", max_tokens=10, lane="health")
             
-            return {
-                "status": "healthy" if test_response else "unhealthy",
+            report = {
+                "status": "healthy" if models else "unhealthy",
                 "models_available": len(models),
                 "current_model": self.model_name,
-                "base_url": self.base_url,
-                "test_response": test_response
+                "base_url": None if self.router else self.base_url,
+                "scheduler": self.scheduler.get_stats(),
+                "cache": self.cache.get_stats() if self.cache is not None else None,
+                "circuit_breaker": self._breaker_stats(),
+                "connection_pool": self.get_pool_stats(),
+                "endpoints": self.router.get_stats() if self.router else None,
+                "batching": self.batcher.get_stats() if self.batcher else None,
+                "single_flight": self.single_flight.get_stats() if self.single_flight else None,
+                "tokens": self.get_token_stats()
+            }
+            if deep:
+                report["status"] = "healthy" if test_response else "unhealthy"
+                report["test_response"] = test_response
+            return report
+            
+        except SchedulerBusyError as e:
+            return {
+                "status": "busy",
+                "message": str(e),
+                "scheduler": self.scheduler.get_stats()
             }
             
         except Exception as e:
             return {
                 "status": "error",
-                "message": str(e)
+                "message": str(e),
+                "circuit_breaker": self._breaker_stats()
             }
     
+    def _breaker_stats(self) -> Optional[Dict[str, Any]]:
+        """Client-level breaker state; routed replicas report their own under endpoints"""
+        return None if self.router else self.circuit_breaker.get_stats()
+    
+    def get_token_stats(self) -> Dict[str, Any]:
+        """Context budget, counter cache and reported token usage"""
+        return {
+            "context_window": self.budget.context_window,
+            "counter": self.tokens.get_stats(),
+            "usage": self.token_usage.get_stats(),
+        }
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilisation"""
+        return self.pool_stats.get_stats(self.connection_limit, self.connection_limit_per_host)
+    
+    def request_timeout(self, max_tokens: Optional[int] = None) -> float:
+        """Total timeout in seconds for a request generating up to max_tokens"""
+        return self.timeouts.for_request(max_tokens or self.max_tokens).total
+    
     async def cleanup(self):
         """Cleanup resources"""
+        if self._unsubscribe_config is not None:
+            self._unsubscribe_config()
+        
+        if self.cache is not None:
+            self.cache.close()
+        
         if self.session:
             await self.session.close()
             self.logger.info("✅ vLLM client cleaned up")
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+vLLM Endpoint Router for OpenClaw AI Agent
+
+Spreads requests across vLLM replicas and passively ejects replicas that keep failing.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.resilience import CircuitBreaker
+
+
+ROUTING_STRATEGIES = ("least_outstanding", "latency_ewma")
+
+
+@dataclass
+class Endpoint:
+    """One vLLM replica and its observed load and health"""
+    base_url: str
+    models: List[str] = field(default_factory=list)
+    outstanding: int = 0
+    latency_ewma: Optional[float] = None
+    consecutive_failures: int = 0
+    ejected_until: Optional[float] = None
+    requests: int = 0
+    failures: int = 0
+    breaker: Optional[CircuitBreaker] = field(default=None, repr=False)
+
+    def serves(self, model: Optional[str]) -> bool:
+        """Check whether this replica serves a model (no list means any model)"""
+        return not model or not self.models or model in self.models
+
+    def is_available(self, now: float) -> bool:
+        """Check whether the replica is outside its ejection window and its breaker is not open"""
+        if self.breaker is not None and self.breaker.state == CircuitBreaker.OPEN:
+            return False
+        return self.ejected_until is None or now >= self.ejected_until
+
+
+class EndpointRouter:
+    """Least-outstanding or latency-EWMA routing with passive outlier ejection"""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        strategy: str = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not endpoints:
+            raise ValueError("At least one vLLM endpoint is required")
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, llm_config: Dict[str, Any]) -> Optional["EndpointRouter"]:
+        """Build a router from llm.endpoints, or None when only base_url is configured"""
+        endpoint_configs = llm_config.get("endpoints") or []
+        if not endpoint_configs:
+            return None
+
+        endpoints = []
+        for entry in endpoint_configs:
+            if isinstance(entry, str):
+                endpoints.append(Endpoint(base_url=entry.rstrip("/")))
+            else:
+                endpoints.append(Endpoint(base_url=entry["url"].rstrip("/"), models=list(entry.get("models", []))))
+
+        routing_config = llm_config.get("routing", {})
+        return cls(
+            endpoints,
+            strategy=routing_config.get("strategy", "least_outstanding"),
+            ewma_alpha=routing_config.get("ewma_alpha", 0.3),
+            failure_threshold=routing_config.get("failure_threshold", 3),
+            ejection_seconds=routing_config.get("ejection_seconds", 30.0)
+        )
+
+    def _score(self, endpoint: Endpoint):
+        """Sort key for picking the best candidate"""
+        # Replicas without a latency sample score 0 so they get explored;
+        # recent failures break ties so retries move to a different replica
+        latency = endpoint.latency_ewma or 0.0
+        if self.strategy == "latency_ewma":
+            return (latency * (endpoint.outstanding + 1), endpoint.consecutive_failures, endpoint.outstanding)
+        return (endpoint.outstanding, endpoint.consecutive_failures, latency)
+
+    def choose(self, model: Optional[str] = None) -> Endpoint:
+        """Pick the replica for the next request"""
+        candidates = [e for e in self.endpoints if e.serves(model)]
+        if not candidates:
+            raise ValueError(f"No vLLM endpoint serves model {model}")
+
+        now = self.clock()
+        available = [e for e in candidates if e.is_available(now)]
+        if not available:
+            # Everything is ejected or breaker-open; try the replica that is due back soonest
+            return min(candidates, key=lambda e: e.ejected_until or 0.0)
+        return min(available, key=self._score)
+
+    def start(self, endpoint: Endpoint) -> None:
+        """Mark a request as outstanding on a replica"""
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+
+    def release(self, endpoint: Endpoint) -> None:
+        """Drop an outstanding request that ended without an outcome (cancelled by the caller)"""
+        endpoint.outstanding = max(0, endpoint.outstanding - 1)
+
+    def finish(self, endpoint: Endpoint, success: bool, latency: Optional[float] = None) -> None:
+        """Record the outcome of a request and eject or readmit the replica"""
+        endpoint.outstanding = max(0, endpoint.outstanding - 1)
+
+        if success:
+            if endpoint.ejected_until is not None:
+                self.logger.info(f"✅ vLLM endpoint readmitted: {endpoint.base_url}")
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = None
+            if latency is not None:
+                if endpoint.latency_ewma is None:
+                    endpoint.latency_ewma = latency
+                else:
+                    endpoint.latency_ewma += self.ewma_alpha * (latency - endpoint.latency_ewma)
+            return
+
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            endpoint.ejected_until = self.clock() + self.ejection_seconds
+            self.logger.warning(
+                f"⚠️ vLLM endpoint ejected for {self.ejection_seconds}s after "
+                f"{endpoint.consecutive_failures} failures: {endpoint.base_url}"
+            )
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-replica routing state"""
+        now = self.clock()
+        return [
+            {
+                "base_url": e.base_url,
+                "models": e.models,
+                "available": e.is_available(now),
+                "outstanding": e.outstanding,
+                "latency_ewma_seconds": e.latency_ewma,
+                "requests": e.requests,
+                "failures": e.failures,
+                "consecutive_failures": e.consecutive_failures,
+                "circuit_breaker": e.breaker.get_stats() if e.breaker is not None else None,
+            }
+            for e in self.endpoints
+        ]
@@ -0,0 +1,138 @@
+"""
+Logging Pipeline for OpenClaw AI Agent
+
+Queues log records on the event loop and writes them from a background thread.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.lazy import lazy_import
+
+structlog = lazy_import("structlog")
+
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and defers formatting to the writer thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Hand the record over unformatted; the listener thread does the work"""
+        # Records never leave the process, so there is no need to pre-render
+        # msg % args or the traceback here as the stock handler does for pickling
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Drop the record instead of waiting when the writer has fallen behind"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Root logger wired to a queue, drained by a QueueListener thread"""
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        level: int = logging.INFO,
+        queue_size: int = 10000
+    ):
+        self.handlers = handlers
+        self.level = level
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = NonBlockingQueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._previous_handlers: Optional[List[logging.Handler]] = None
+
+    @classmethod
+    def from_config(cls, logging_config: Dict[str, Any], level: str = "INFO") -> "LoggingPipeline":
+        """Build the pipeline from the logging config section"""
+        formatter = build_formatter(logging_config.get("format", "text"))
+
+        handlers: List[logging.Handler] = []
+        if logging_config.get("console", True):
+            handlers.append(logging.StreamHandler(sys.stdout))
+
+        log_file = logging_config.get("file", "/app/logs/openclaw.log")
+        if log_file:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            if logging_config.get("rotation", "size") == "time":
+                handlers.append(logging.handlers.TimedRotatingFileHandler(
+                    log_file,
+                    when=logging_config.get("when", "midnight"),
+                    backupCount=logging_config.get("backup_count", 5),
+                    encoding="utf-8",
+                    delay=True
+                ))
+            else:
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    log_file,
+                    maxBytes=logging_config.get("max_bytes", 10 * 1024 * 1024),
+                    backupCount=logging_config.get("backup_count", 5),
+                    encoding="utf-8",
+                    delay=True
+                ))
+
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        return cls(
+            handlers,
+            level=getattr(logging, level.upper(), logging.INFO),
+            queue_size=logging_config.get("queue_size", 10000)
+        )
+
+    def start(self) -> None:
+        """Route the root logger through the queue and start the writer thread"""
+        root = logging.getLogger()
+        self._previous_handlers = root.handlers[:]
+        root.handlers = [self.queue_handler]
+        root.setLevel(self.level)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records, stop the writer thread and close the handlers"""
+        if self._previous_handlers is None:
+            return
+        self.listener.stop()
+        root = logging.getLogger()
+        root.handlers = self._previous_handlers
+        self._previous_handlers = None
+        for handler in self.handlers:
+            handler.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and records dropped under back-pressure"""
+        return {
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "dropped": self.queue_handler.dropped,
+        }
+
+
+def build_formatter(fmt: str) -> logging.Formatter:
+    """Plain text formatter, or structlog's JSON renderer for format: json"""
+    if fmt != "json":
+        return logging.Formatter(TEXT_FORMAT)
+
+    return structlog.stdlib.ProcessorFormatter(
+        processor=structlog.processors.JSONRenderer(ensure_ascii=False),
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+        ]
+    )
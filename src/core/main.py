@@ -6,23 +6,35 @@ Discord bot integration, GitHub automation, Docker-in-Docker capabilities,
 and vLLM integration for AI-powered assistance.
 """
 
+import argparse
 import asyncio
 import logging
+import signal
 import sys
-import os
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 
-import yaml
 from dotenv import load_dotenv
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.core.config_manager import ConfigManager
+from src.core.lazy import format_import_table, lazy_import, profile_imports
+from src.core.logging_setup import LoggingPipeline
 from src.core.llm_client import VLLMClient
-from src.core.health import HealthChecker
-from src.discord.bot import OpenClawBot
+from src.core.metrics import get_metrics, monitor_event_loop_lag
+from src.core.startup import StartupPipeline
+
+# FastAPI/uvicorn and py-cord are only imported once startup reaches their steps
+health = lazy_import("src.core.health")
+discord_bot = lazy_import("src.discord.bot")
+github_webhooks = lazy_import("src.github.webhooks")
+
+if TYPE_CHECKING:
+    from src.core.health import HealthChecker, HealthServer
+    from src.discord.bot import OpenClawBot
+    from src.github.webhooks import WebhookEvent, WebhookProcessor
 
 
 class OpenClawAgent:
@@ -31,8 +43,15 @@ class OpenClawAgent:
     def __init__(self):
         self.config_manager: Optional[ConfigManager] = None
         self.llm_client: Optional[VLLMClient] = None
-        self.health_checker: Optional[HealthChecker] = None
-        self.discord_bot: Optional[OpenClawBot] = None
+        self.health_checker: Optional["HealthChecker"] = None
+        self.health_server: Optional["HealthServer"] = None
+        self.discord_bot: Optional["OpenClawBot"] = None
+        self.webhooks: Optional["WebhookProcessor"] = None
+        self.metrics = get_metrics()
+        self._lag_task: Optional[asyncio.Task] = None
+        self.startup: Optional[StartupPipeline] = None
+        self._shutdown = asyncio.Event()
+        self.logging_pipeline: Optional[LoggingPipeline] = None
         self.logger = logging.getLogger(__name__)
     
     async def initialize(self) -> bool:
@@ -40,42 +59,95 @@ class OpenClawAgent:
         try:
             self.logger.info("🚀 Initializing OpenClaw AI Agent...")
             
-            # Load environment variables
-            self._load_environment()
-            
-            # Load configuration
-            self.config_manager = ConfigManager()
-            await self.config_manager.load_config()
-            
-            # Initialize logging
-            self._setup_logging()
-            
-            # Initialize vLLM client
-            self.llm_client = VLLMClient(self.config_manager)
-            await self.llm_client.initialize()
-            
-            # Test vLLM connectivity
-            if await self.llm_client.test_connection():
-                self.logger.info("✅ vLLM client initialized successfully")
-            else:
-                self.logger.warning("⚠️ vLLM client initialized but connection test failed")
+            self.startup = self._build_startup_pipeline()
+            report = await self.startup.run()
             
-            # Initialize health checker
-            self.health_checker = HealthChecker(self.config_manager, self.llm_client)
-            
-            # Initialize Discord bot
-            self.discord_bot = OpenClawBot(
-                config_manager=self.config_manager,
-                llm_client=self.llm_client
-            )
-            
-            self.logger.info("✅ OpenClaw AI Agent initialized successfully")
+            self.metrics.record_startup(report)
+            self.logger.info(f"⏱️ Startup phases:\n{report.format()}")
+            self.logger.info(f"✅ OpenClaw AI Agent initialized successfully in {report.ready_seconds:.2f}s")
             return True
             
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize OpenClaw: {e}")
             return False
     
+    def _build_startup_pipeline(self) -> StartupPipeline:
+        """Startup steps and their dependencies; independent steps run concurrently"""
+        pipeline = StartupPipeline()
+        pipeline.add("environment", self._load_environment)
+        pipeline.add("config", self._load_config, depends_on=("environment",))
+        pipeline.add("logging", self._setup_logging, depends_on=("config",))
+        pipeline.add("metrics", self._setup_metrics, depends_on=("logging",), critical=False)
+        pipeline.add("llm_client", self._init_llm_client, depends_on=("logging",))
+        pipeline.add("health_checker", self._init_health_checker, depends_on=("llm_client",))
+        pipeline.add("github_webhooks", self._init_webhooks, depends_on=("logging",), critical=False)
+        pipeline.add("web_server", self._start_web_server, depends_on=("health_checker", "github_webhooks"), critical=False)
+        pipeline.add("discord_bot", self._init_discord_bot, depends_on=("llm_client",))
+        # Discord connects without waiting for vLLM; the probe only reports reachability
+        pipeline.add("vllm_probe", self._probe_vllm, depends_on=("llm_client",), critical=False, background=True)
+        # Subscribers register during their own steps, so watch only once they exist
+        pipeline.add("config_watch", self._watch_config, depends_on=("llm_client", "discord_bot"), critical=False)
+        return pipeline
+    
+    async def _load_config(self):
+        """Load configuration"""
+        self.config_manager = ConfigManager()
+        await self.config_manager.load_config()
+    
+    def _watch_config(self):
+        """Hot-reload config.yaml if enabled"""
+        if self.config_manager.get("application.hot_reload", True):
+            self.config_manager.start_watching(self.config_manager.get("application.hot_reload_interval", 2.0))
+    
+    async def _init_llm_client(self):
+        """Initialize vLLM client (no network round-trip)"""
+        self.llm_client = VLLMClient(self.config_manager)
+        await self.llm_client.initialize()
+    
+    def _init_health_checker(self):
+        """Initialize health checker"""
+        self.health_checker = health.HealthChecker(self.config_manager, self.llm_client)
+    
+    async def _start_web_server(self):
+        """Serve the health API on this event loop, sharing the live health checker"""
+        if not self.config_manager.get("web.enabled", True):
+            return
+        self.health_server = health.HealthServer.from_config(self.config_manager, self.health_checker, self.webhooks)
+        if not await self.health_server.start():
+            raise RuntimeError(f"Health API failed to listen on port {self.health_server.port}")
+    
+    def _init_webhooks(self):
+        """Start the GitHub webhook consumer if enabled (the route is served by the web server)"""
+        webhook_config = self.config_manager.get("github.webhooks", {})
+        if not webhook_config.get("enabled", False):
+            return
+        self.webhooks = github_webhooks.WebhookProcessor.from_config(webhook_config, self.metrics)
+        self.webhooks.subscribe("*", self._log_webhooks)
+        self.webhooks.start()
+    
+    async def _log_webhooks(self, events: List["WebhookEvent"]):
+        """Log each dispatched GitHub event"""
+        for event in events:
+            target = f"{event.repository}#{event.number}" if event.number is not None else event.repository
+            actions = ", ".join(event.actions) or "-"
+            self.logger.info(f"📬 GitHub {event.event} {target}: {actions}")
+    
+    async def _init_discord_bot(self):
+        """Create the Discord bot and register its commands ahead of login"""
+        self.discord_bot = discord_bot.OpenClawBot(
+            config_manager=self.config_manager,
+            llm_client=self.llm_client
+        )
+        if not await self.discord_bot.initialize():
+            raise RuntimeError("Discord bot initialization failed")
+    
+    async def _probe_vllm(self):
+        """Test vLLM connectivity in the background"""
+        if await self.llm_client.test_connection():
+            self.logger.info("✅ vLLM client initialized successfully")
+        else:
+            self.logger.warning("⚠️ vLLM client initialized but connection test failed")
+    
     def _load_environment(self):
         """Load environment variables from .env file"""
         env_path = Path(__file__).parent.parent.parent / ".env"
@@ -86,32 +158,48 @@ class OpenClawAgent:
             self.logger.info("ℹ️ No .env file found, using environment variables only")
     
     def _setup_logging(self):
-        """Setup logging configuration"""
+        """Setup logging through a queue so handlers never block the event loop"""
         log_level = self.config_manager.get("application.log_level", "INFO")
         
-        logging.basicConfig(
-            level=getattr(logging, log_level),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('/app/logs/openclaw.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        self.logging_pipeline = LoggingPipeline.from_config(self.config_manager.get("logging", {}), log_level)
+        self.logging_pipeline.start()
+        
+        self.logger.info("✅ Logging initialized with level: %s", log_level)
+    
+    def _setup_metrics(self):
+        """Start the Prometheus endpoint if enabled"""
+        if not self.config_manager.get("monitoring.prometheus_enabled", False):
+            return
         
-        self.logger.info(f"✅ Logging initialized with level: {log_level}")
+        try:
+            self.metrics.start_server(self.config_manager.get("monitoring.prometheus_port", 9090))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to start Prometheus metrics server: {e}")
     
     async def run(self) -> None:
         """Run the OpenClaw agent"""
-        if not await self.initialize():
-            self.logger.error("❌ Failed to initialize, exiting...")
-            return
+        self._install_signal_handlers()
         
         try:
+            # Inside the try: a failed critical step still stops whatever already started
+            if not await self.initialize():
+                self.logger.error("❌ Failed to initialize, exiting...")
+                return
+            
             self.logger.info("🤖 Starting OpenClaw AI Agent...")
             
-            # Start Discord bot
+            if self.config_manager.get("monitoring.prometheus_enabled", False):
+                self._lag_task = asyncio.create_task(monitor_event_loop_lag(self.metrics))
+            
+            # Run the Discord bot until it exits or a shutdown signal arrives
+            waiters = {asyncio.create_task(self._shutdown.wait())}
             if self.discord_bot:
-                await self.discord_bot.start()
+                waiters.add(asyncio.create_task(self.discord_bot.start()))
+            done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
             
         except KeyboardInterrupt:
             self.logger.info("🛑 Received interrupt signal, shutting down...")
@@ -120,17 +208,58 @@ class OpenClawAgent:
         finally:
             await self.cleanup()
     
+    def _install_signal_handlers(self) -> None:
+        """Route SIGINT/SIGTERM to one coordinated shutdown of the bot and health API"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig)
+            except (NotImplementedError, RuntimeError):
+                pass
+    
+    def request_shutdown(self, sig: Optional[int] = None) -> None:
+        """Begin graceful shutdown"""
+        if not self._shutdown.is_set():
+            name = signal.Signals(sig).name if sig else "request"
+            self.logger.info(f"🛑 Received {name}, shutting down...")
+            self._shutdown.set()
+    
     async def cleanup(self):
         """Cleanup resources"""
         self.logger.info("🧹 Cleaning up resources...")
         
+        # Fail readiness first so traffic drains before anything closes
+        if self.health_checker:
+            self.health_checker.mark_stopping()
+        
+        if self._lag_task:
+            self._lag_task.cancel()
+        
+        if self.startup:
+            self.startup.cancel_background()
+        
+        if self.config_manager:
+            await self.config_manager.stop_watching()
+        
+        self.metrics.stop_server()
+        
         if self.discord_bot:
             await self.discord_bot.cleanup()
         
+        if self.health_server:
+            await self.health_server.stop()
+        
+        if self.webhooks:
+            await self.webhooks.stop()
+        
         if self.llm_client:
             await self.llm_client.cleanup()
         
         self.logger.info("✅ Cleanup completed")
+        
+        # Last, so everything above still reaches the log files
+        if self.logging_pipeline:
+            self.logging_pipeline.stop()
 
 
 async def main():
@@ -139,5 +268,22 @@ async def main():
     await agent.run()
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="OpenClaw AI Agent")
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="report per-module import cost (python -X importtime) instead of starting"
+    )
+    parser.add_argument("--profile-target", default="src.core.main", help="module to profile")
+    parser.add_argument("--profile-limit", type=int, default=25, help="rows per table")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.profile_imports:
+        print(format_import_table(profile_imports(args.profile_target), limit=args.profile_limit))
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Metrics Registry for OpenClaw AI Agent
+
+Prometheus metrics for the vLLM client, Discord bot, GitHub, Docker builds, health checks and event loop.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BUILD_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+RATIO_BUCKETS = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+class Metrics:
+    """Prometheus metric definitions and recording helpers"""
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry()
+        self.logger = logging.getLogger(__name__)
+        self._server = None
+
+        # vLLM client
+        self.llm_request_duration = Histogram(
+            "openclaw_llm_request_duration_seconds",
+            "End-to-end vLLM request latency",
+            ["mode"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry
+        )
+        self.llm_time_to_first_token = Histogram(
+            "openclaw_llm_time_to_first_token_seconds",
+            "Time from request start to the first streamed token",
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry
+        )
+        self.llm_tokens_per_second = Histogram(
+            "openclaw_llm_tokens_per_second",
+            "Completion tokens generated per second",
+            buckets=(1, 5, 10, 20, 40, 80, 160, 320),
+            registry=self.registry
+        )
+        self.llm_request_tokens = Histogram(
+            "openclaw_llm_request_tokens",
+            "Prompt and completion tokens per request, as reported by vLLM",
+            ["kind"],
+            buckets=(16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+            registry=self.registry
+        )
+        self.llm_errors = Counter(
+            "openclaw_llm_errors_total",
+            "Failed vLLM requests by HTTP status or failure kind",
+            ["status"],
+            registry=self.registry
+        )
+        self.llm_retries = Counter(
+            "openclaw_llm_retries_total",
+            "vLLM requests retried after a transient failure",
+            registry=self.registry
+        )
+        self.llm_deduplicated = Counter(
+            "openclaw_llm_deduplicated_total",
+            "vLLM calls that joined an identical request already in flight",
+            registry=self.registry
+        )
+        self.llm_batch_size = Histogram(
+            "openclaw_llm_batch_size",
+            "Prompts coalesced into one /completions call",
+            buckets=(1, 2, 4, 8, 16, 32, 64),
+            registry=self.registry
+        )
+        self.llm_in_flight = Gauge(
+            "openclaw_llm_requests_in_flight",
+            "vLLM HTTP requests currently in flight",
+            registry=self.registry
+        )
+
+        # Discord bot
+        self.command_duration = Histogram(
+            "openclaw_discord_command_duration_seconds",
+            "Slash command handling latency",
+            ["command"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry
+        )
+        self.commands_total = Counter(
+            "openclaw_discord_commands_total",
+            "Slash commands handled",
+            ["command", "outcome"],
+            registry=self.registry
+        )
+        self.job_wait = Histogram(
+            "openclaw_discord_job_wait_seconds",
+            "Time a deferred command job waited in the work queue",
+            ["command"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry
+        )
+        self.job_duration = Histogram(
+            "openclaw_discord_job_duration_seconds",
+            "Time a worker spent running a deferred command job",
+            ["command", "outcome"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry
+        )
+        self.job_queue_depth = Gauge(
+            "openclaw_discord_job_queue_depth",
+            "Deferred command jobs waiting for a worker",
+            registry=self.registry
+        )
+
+        # GitHub
+        self.github_webhooks = Counter(
+            "openclaw_github_webhooks_total",
+            "GitHub webhook deliveries by intake outcome",
+            ["outcome"],
+            registry=self.registry
+        )
+
+        # Docker builds
+        self.build_duration = Histogram(
+            "openclaw_docker_build_duration_seconds",
+            "Docker image build time by outcome",
+            ["outcome"],
+            buckets=BUILD_BUCKETS,
+            registry=self.registry
+        )
+        self.build_cache_ratio = Histogram(
+            "openclaw_docker_build_cache_ratio",
+            "Share of a successful build's steps served from the layer cache",
+            buckets=RATIO_BUCKETS,
+            registry=self.registry
+        )
+
+        # Health and runtime
+        self.service_healthy = Gauge(
+            "openclaw_service_healthy",
+            "1 if the service passed its last health check, else 0",
+            ["service"],
+            registry=self.registry
+        )
+        self.startup_phase_seconds = Gauge(
+            "openclaw_startup_phase_seconds",
+            "Duration of each startup phase in the last start",
+            ["phase"],
+            registry=self.registry
+        )
+        self.event_loop_lag = Histogram(
+            "openclaw_event_loop_lag_seconds",
+            "Delay between scheduled and actual event loop wake-ups",
+            buckets=LOOP_LAG_BUCKETS,
+            registry=self.registry
+        )
+
+    def record_llm_request(
+        self,
+        mode: str,
+        duration: float,
+        completion_tokens: Optional[int] = None,
+        time_to_first_token: Optional[float] = None
+    ) -> None:
+        """Record a successful vLLM request"""
+        self.llm_request_duration.labels(mode=mode).observe(duration)
+        if time_to_first_token is not None:
+            self.llm_time_to_first_token.observe(time_to_first_token)
+        if completion_tokens and duration > 0:
+            self.llm_tokens_per_second.observe(completion_tokens / duration)
+
+    def record_token_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        """Record the token usage vLLM reported for one request"""
+        if prompt_tokens is not None:
+            self.llm_request_tokens.labels(kind="prompt").observe(prompt_tokens)
+        if completion_tokens is not None:
+            self.llm_request_tokens.labels(kind="completion").observe(completion_tokens)
+
+    def record_llm_error(self, status: Any) -> None:
+        """Record a failed vLLM request"""
+        self.llm_errors.labels(status=str(status)).inc()
+
+    def record_command(self, command: str, duration: float, outcome: str = "success") -> None:
+        """Record a handled slash command"""
+        self.command_duration.labels(command=command).observe(duration)
+        self.commands_total.labels(command=command, outcome=outcome).inc()
+
+    def record_job(self, command: str, wait: float, duration: float, outcome: str) -> None:
+        """Record a deferred command job that left the work queue"""
+        self.job_wait.labels(command=command).observe(wait)
+        self.job_duration.labels(command=command, outcome=outcome).observe(duration)
+
+    def record_build(self, duration: float, outcome: str, cache_ratio: Optional[float] = None) -> None:
+        """Record a finished Docker build"""
+        self.build_duration.labels(outcome=outcome).observe(duration)
+        if cache_ratio is not None:
+            self.build_cache_ratio.observe(cache_ratio)
+
+    def record_health(self, health: Dict[str, Any]) -> None:
+        """Export per-service health from a health snapshot"""
+        for service, status in health.get("services", {}).items():
+            healthy = isinstance(status, dict) and status.get("status") == "healthy"
+            self.service_healthy.labels(service=service).set(1 if healthy else 0)
+
+    def record_startup(self, report) -> None:
+        """Export per-phase timings from a startup report"""
+        for result in report.results:
+            self.startup_phase_seconds.labels(phase=result.name).set(result.duration)
+        if report.ready_seconds is not None:
+            self.startup_phase_seconds.labels(phase="ready").set(report.ready_seconds)
+
+    def start_server(self, port: int, addr: str = "0.0.0.0") -> None:
+        """Serve /metrics from a background thread so the event loop never blocks"""
+        if self._server is not None:
+            return
+        self._server, _ = start_http_server(port, addr=addr, registry=self.registry)
+        self.logger.info(f"✅ Prometheus metrics served on {addr}:{port}")
+
+    def stop_server(self) -> None:
+        """Stop the metrics HTTP server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+async def monitor_event_loop_lag(metrics: "Metrics", interval: float = 0.5) -> None:
+    """Measure how late the event loop wakes up from a fixed sleep"""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = time.monotonic() - started - interval
+        metrics.event_loop_lag.observe(max(lag, 0.0))
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,267 @@
+"""
+Rate Limiter for OpenClaw AI Agent
+
+Token-bucket limits per user, guild and command, with in-memory or shared SQLite state.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# (bucket key, refill rate in tokens per second, bucket capacity)
+Limit = Tuple[str, float, float]
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    retry_after: float = 0.0
+    scope: Optional[str] = None
+
+
+def _refill(tokens: float, updated: float, rate: float, capacity: float, now: float) -> float:
+    """Tokens in a bucket after refilling since its last update"""
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryRateLimitBackend:
+    """Per-process bucket state in a dict"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def acquire(self, limits: List[Limit], now: float) -> Tuple[float, Optional[str]]:
+        """Take one token from every bucket, or none if any is empty
+
+        Returns (0, None) when allowed, else the wait in seconds and the limiting key.
+        """
+        levels = []
+        for key, rate, capacity in limits:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            level = _refill(tokens, updated, rate, capacity, now)
+            if level < 1:
+                return (1 - level) / rate, key
+            levels.append(level)
+
+        for (key, _, _), level in zip(limits, levels):
+            self._buckets[key] = (level - 1, now)
+        return 0.0, None
+
+    def sweep(self, idle_before: float) -> int:
+        """Drop buckets untouched since idle_before; they would be full again anyway"""
+        idle = [key for key, (_, updated) in self._buckets.items() if updated < idle_before]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        """Number of live buckets"""
+        return len(self._buckets)
+
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class SQLiteRateLimitBackend:
+    """Bucket state in a local SQLite file so several bot processes share limits"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and ensure the table exists"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path), check_same_thread=False, timeout=5.0, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        return self._conn
+
+    def acquire(self, limits: List[Limit], now: float) -> Tuple[float, Optional[str]]:
+        """Take one token from every bucket atomically across processes"""
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front so concurrent processes serialise
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = []
+                for key, rate, capacity in limits:
+                    row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                    tokens, updated = row if row else (capacity, now)
+                    level = _refill(tokens, updated, rate, capacity, now)
+                    if level < 1:
+                        conn.execute("ROLLBACK")
+                        return (1 - level) / rate, key
+                    levels.append(level)
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    [(key, level - 1, now) for (key, _, _), level in zip(limits, levels)]
+                )
+                conn.execute("COMMIT")
+                return 0.0, None
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def sweep(self, idle_before: float) -> int:
+        """Drop idle buckets"""
+        with self._lock:
+            cursor = self._connect().execute("DELETE FROM buckets WHERE updated < ?", (idle_before,))
+            return cursor.rowcount
+
+    def __len__(self) -> int:
+        """Number of stored buckets"""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Commands that stop or clear work must stay usable while a user is being limited
+DEFAULT_EXEMPT_COMMANDS = ("cancel", "reset")
+
+
+class RateLimiter:
+    """Token-bucket limiter keyed by user, guild and command"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 30,
+        burst: Optional[float] = None,
+        guild_requests_per_minute: Optional[float] = None,
+        command_limits: Optional[Dict[str, float]] = None,
+        exempt_users: Optional[List[Any]] = None,
+        exempt_commands: Optional[List[str]] = None,
+        backend=None,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or requests_per_minute
+        self.guild_requests_per_minute = guild_requests_per_minute
+        self.command_limits = command_limits or {}
+        self.exempt_users = {str(user) for user in exempt_users or []}
+        self.exempt_commands = set(DEFAULT_EXEMPT_COMMANDS if exempt_commands is None else exempt_commands)
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._shared = isinstance(self.backend, SQLiteRateLimitBackend)
+        self._last_sweep = clock()
+        self.allowed = 0
+        self.limited = 0
+
+    @classmethod
+    def from_config(cls, security_config: Dict[str, Any]) -> Optional["RateLimiter"]:
+        """Build a limiter from the security config section, or None when disabled"""
+        limit_config = security_config.get("rate_limiting", {})
+        if not limit_config.get("enabled", False):
+            return None
+
+        backend = None
+        if limit_config.get("backend", "memory") == "sqlite":
+            backend = SQLiteRateLimitBackend(limit_config.get("path", "/app/data/rate_limits.sqlite"))
+
+        return cls(
+            requests_per_minute=limit_config.get("requests_per_minute", 30),
+            burst=limit_config.get("burst"),
+            guild_requests_per_minute=limit_config.get("guild_requests_per_minute"),
+            command_limits=limit_config.get("commands", {}),
+            exempt_users=security_config.get("admin_users", []),
+            exempt_commands=limit_config.get("exempt_commands"),
+            backend=backend,
+            sweep_interval=limit_config.get("sweep_interval", 60.0)
+        )
+
+    def _limits(self, user_id: Any, guild_id: Any, command: Optional[str]) -> List[Limit]:
+        """Buckets a command invocation draws from"""
+        limits: List[Limit] = [(f"user:{user_id}", self.requests_per_minute / 60, self.burst)]
+        if guild_id is not None and self.guild_requests_per_minute:
+            rpm = self.guild_requests_per_minute
+            limits.append((f"guild:{guild_id}", rpm / 60, rpm))
+        if command in self.command_limits:
+            rpm = self.command_limits[command]
+            limits.append((f"command:{command}:{user_id}", rpm / 60, rpm))
+        return limits
+
+    def _idle_horizon(self) -> float:
+        """Seconds after which any bucket has refilled completely"""
+        windows = [self.burst / (self.requests_per_minute / 60)]
+        if self.guild_requests_per_minute:
+            windows.append(60.0)
+        if self.command_limits:
+            windows.append(60.0)
+        return max(windows)
+
+    async def check(self, user_id: Any, guild_id: Any = None, command: Optional[str] = None) -> RateLimitDecision:
+        """Consume one request for a user, or report how long they must wait"""
+        if str(user_id) in self.exempt_users or command in self.exempt_commands:
+            return RateLimitDecision(allowed=True)
+
+        now = self.clock()
+        limits = self._limits(user_id, guild_id, command)
+
+        if self._shared:
+            retry_after, key = await asyncio.to_thread(self.backend.acquire, limits, now)
+        else:
+            retry_after, key = self.backend.acquire(limits, now)
+
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            await self.sweep()
+
+        if key is None:
+            self.allowed += 1
+            return RateLimitDecision(allowed=True)
+
+        self.limited += 1
+        scope = key.split(":", 1)[0]
+        self.logger.info(f"🚦 Rate limited {scope} bucket {key} for {retry_after:.1f}s")
+        return RateLimitDecision(allowed=False, retry_after=retry_after, scope=scope)
+
+    async def sweep(self) -> int:
+        """Drop buckets that have been idle long enough to be full again"""
+        idle_before = self.clock() - self._idle_horizon()
+        try:
+            if self._shared:
+                return await asyncio.to_thread(self.backend.sweep, idle_before)
+            return self.backend.sweep(idle_before)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to sweep rate limit buckets: {e}")
+            return 0
+
+    def close(self) -> None:
+        """Release the backend"""
+        self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Limiter configuration and counters"""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "burst": self.burst,
+            "guild_requests_per_minute": self.guild_requests_per_minute,
+            "command_limits": dict(self.command_limits),
+            "backend": "sqlite" if self._shared else "memory",
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
@@ -0,0 +1,158 @@
+"""
+Resilience Primitives for OpenClaw AI Agent
+
+Retry with jittered exponential backoff and a circuit breaker for upstream calls.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is rejecting calls"""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into a delay in seconds"""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+
+@dataclass
+class RetryPolicy:
+    """Which responses to retry and how long to wait between attempts"""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: frozenset({429, 502, 503}))
+
+    @classmethod
+    def from_config(cls, retry_config: Dict[str, Any]) -> "RetryPolicy":
+        """Build a policy from the llm.retry config section"""
+        return cls(
+            max_attempts=retry_config.get("max_attempts", 3),
+            base_delay=retry_config.get("base_delay", 0.5),
+            max_delay=retry_config.get("max_delay", 8.0),
+            retry_statuses=frozenset(retry_config.get("retry_statuses", [429, 502, 503]))
+        )
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        """Check whether a response status on a given attempt warrants another try"""
+        return status in self.retry_statuses and attempt < self.max_attempts
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends one"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker that fails fast while upstream is down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_config(cls, breaker_config: Dict[str, Any]) -> "CircuitBreaker":
+        """Build a breaker from the llm.circuit_breaker config section"""
+        return cls(
+            failure_threshold=breaker_config.get("failure_threshold", 5),
+            recovery_timeout=breaker_config.get("recovery_timeout", 30.0),
+            half_open_max_calls=breaker_config.get("half_open_max_calls", 1)
+        )
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the recovery timeout passes"""
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            self.logger.info("🔌 Circuit half-open, probing upstream recovery")
+        return self._state
+
+    def before_request(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return
+        self.rejected += 1
+        raise CircuitOpenError("Circuit open: upstream marked unavailable")
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. cancelled)"""
+        if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        if self._state != self.CLOSED:
+            self.logger.info("✅ Circuit closed, upstream recovered")
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold or on a failed probe"""
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+                self.logger.warning(f"⚠️ Circuit opened after {self._consecutive_failures} consecutive failures")
+            self._state = self.OPEN
+            self._opened_at = self.clock()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state for the health endpoint"""
+        state = self.state
+        retry_in = None
+        if state == self.OPEN:
+            retry_in = max(0.0, self.recovery_timeout - (self.clock() - self._opened_at))
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
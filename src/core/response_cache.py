@@ -0,0 +1,222 @@
+"""
+Response Cache for OpenClaw AI Agent
+
+LRU + TTL cache for deterministic vLLM completions, with optional SQLite persistence.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class CacheEntry:
+    """Cached completion with its expiry and accounted size"""
+    value: str
+    expires_at: float
+    size: int
+
+
+def make_cache_key(model: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float) -> str:
+    """Hash the request fields that determine a completion"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        },
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheBackend:
+    """On-disk store so cached completions survive restarts"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and ensure the table exists"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def load(self, now: float) -> List[tuple]:
+        """Drop expired rows and return the live ones, oldest first"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM completions WHERE expires_at <= ?", (now,))
+            conn.commit()
+            return conn.execute(
+                "SELECT key, value, expires_at FROM completions ORDER BY rowid"
+            ).fetchall()
+
+    def put(self, key: str, value: str, expires_at: float) -> None:
+        """Insert or replace a cached completion"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO completions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            conn.commit()
+
+    def delete(self, keys: List[str]) -> None:
+        """Remove evicted completions"""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("DELETE FROM completions WHERE key = ?", [(k,) for k in keys])
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ResponseCache:
+    """In-memory LRU cache with TTL expiry and a byte-size cap"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        backend: Optional[SQLiteCacheBackend] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any]) -> "ResponseCache":
+        """Build a cache from the llm.cache config section"""
+        backend = None
+        if cache_config.get("persist", False):
+            backend = SQLiteCacheBackend(cache_config.get("path", "/app/data/llm_cache.sqlite"))
+        return cls(
+            max_entries=cache_config.get("max_entries", 512),
+            max_bytes=cache_config.get("max_bytes", 8 * 1024 * 1024),
+            ttl_seconds=cache_config.get("ttl_seconds", 3600),
+            backend=backend
+        )
+
+    def __len__(self) -> int:
+        """Number of entries held in memory"""
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry from memory and its size accounting"""
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+
+    def _insert(self, key: str, value: str, expires_at: float) -> List[str]:
+        """Insert into memory and return the keys evicted to make room"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return []
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(value=value, expires_at=expires_at, size=size)
+        self.total_bytes += size
+
+        evicted = []
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            old_key, _ = next(iter(self._entries.items()))
+            self._remove(old_key)
+            evicted.append(old_key)
+        self.evictions += len(evicted)
+        return evicted
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, or None on miss or expiry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= self.clock():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a completion, persisting it when a backend is configured"""
+        expires_at = self.clock() + self.ttl_seconds
+        evicted = self._insert(key, value, expires_at)
+
+        if self.backend and key in self._entries:
+            try:
+                await asyncio.to_thread(self.backend.put, key, value, expires_at)
+                if evicted:
+                    await asyncio.to_thread(self.backend.delete, evicted)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Failed to persist cache entry: {e}")
+
+    async def load(self) -> None:
+        """Warm the in-memory cache from the persistent backend"""
+        if not self.backend:
+            return
+
+        try:
+            rows = await asyncio.to_thread(self.backend.load, self.clock())
+            for key, value, expires_at in rows:
+                self._insert(key, value, expires_at)
+            self.logger.info(f"✅ Loaded {len(self._entries)} cached completions from {self.backend.path}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to load response cache: {e}")
+
+    def close(self) -> None:
+        """Release the persistent backend"""
+        if self.backend:
+            self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy for the health endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "persistent": self.backend is not None,
+        }
@@ -0,0 +1,173 @@
+"""
+Startup Pipeline for OpenClaw AI Agent
+
+Runs initialization steps concurrently in dependency order and records how long each took.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+
+StepFunc = Callable[[], Union[Awaitable[Any], Any]]
+
+
+class StartupError(Exception):
+    """Raised when a critical startup step fails"""
+
+
+@dataclass
+class StartupStep:
+    """One initialization step and the steps it waits for"""
+    name: str
+    func: StepFunc
+    depends_on: Tuple[str, ...] = ()
+    critical: bool = True
+    background: bool = False
+
+
+@dataclass
+class StepResult:
+    """Timing and outcome of a finished step"""
+    name: str
+    started: float
+    duration: float
+    ok: bool
+    error: Optional[str] = None
+    background: bool = False
+
+
+@dataclass
+class StartupReport:
+    """Per-phase timings for one startup"""
+    started: float
+    results: List[StepResult] = field(default_factory=list)
+    ready_at: Optional[float] = None
+
+    @property
+    def ready_seconds(self) -> Optional[float]:
+        """Time from start until every foreground step finished"""
+        return self.ready_at - self.started if self.ready_at is not None else None
+
+    def format(self) -> str:
+        """Human-readable timing table, in the order steps started"""
+        lines = []
+        for result in sorted(self.results, key=lambda r: r.started):
+            offset = (result.started - self.started) * 1000
+            status = "ok" if result.ok else f"failed: {result.error}"
+            suffix = " (background)" if result.background else ""
+            lines.append(f"  {result.name:<16} +{offset:7.1f}ms {result.duration * 1000:8.1f}ms  {status}{suffix}")
+        if self.ready_seconds is not None:
+            lines.append(f"  {'ready':<16} {self.ready_seconds * 1000:18.1f}ms")
+        return "\n".join(lines)
+
+
+class StartupPipeline:
+    """Dependency-aware startup orchestrator"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._steps: Dict[str, StartupStep] = {}
+        self._background: List[asyncio.Task] = []
+        self.report: Optional[StartupReport] = None
+
+    def add(
+        self,
+        name: str,
+        func: StepFunc,
+        depends_on: Tuple[str, ...] = (),
+        critical: bool = True,
+        background: bool = False
+    ) -> "StartupPipeline":
+        """Register a step; sync functions run inline, coroutines run concurrently"""
+        if name in self._steps:
+            raise ValueError(f"Duplicate startup step: {name}")
+        self._steps[name] = StartupStep(name, func, tuple(depends_on), critical, background)
+        return self
+
+    def _validate(self) -> None:
+        """Reject unknown dependencies, cycles and foreground steps waiting on background ones"""
+        for step in self._steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self._steps:
+                    raise ValueError(f"Startup step {step.name} depends on unknown step {dependency}")
+                if self._steps[dependency].background and not step.background:
+                    raise ValueError(f"Startup step {step.name} cannot wait for background step {dependency}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Startup dependency cycle at {name}")
+            visiting.add(name)
+            for dependency in self._steps[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self._steps:
+            visit(name)
+
+    async def _run_step(self, step: StartupStep, tasks: Dict[str, asyncio.Task]) -> None:
+        """Wait for dependencies, then run and time one step"""
+        for dependency in step.depends_on:
+            await tasks[dependency]
+
+        started = self.clock()
+        try:
+            result = step.func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            self.report.results.append(
+                StepResult(step.name, started, self.clock() - started, False, str(e), step.background)
+            )
+            # Background steps never fail startup; nothing is waiting on them
+            if step.critical and not step.background:
+                raise StartupError(f"Startup step {step.name} failed: {e}") from e
+            self.logger.warning(f"⚠️ Startup step {step.name} failed: {e}")
+            return
+
+        duration = self.clock() - started
+        self.report.results.append(StepResult(step.name, started, duration, True, None, step.background))
+        if step.background:
+            self.logger.info(f"✅ Background startup step {step.name} finished in {duration * 1000:.0f}ms")
+
+    async def run(self) -> StartupReport:
+        """Run foreground steps to completion and leave background steps running"""
+        self._validate()
+        self.report = StartupReport(started=self.clock())
+
+        tasks: Dict[str, asyncio.Task] = {}
+        for step in self._steps.values():
+            tasks[step.name] = asyncio.create_task(self._run_step(step, tasks), name=f"startup:{step.name}")
+
+        foreground = [tasks[name] for name, step in self._steps.items() if not step.background]
+        self._background = [tasks[name] for name, step in self._steps.items() if step.background]
+
+        try:
+            await asyncio.gather(*foreground)
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        self.report.ready_at = self.clock()
+        return self.report
+
+    async def wait_background(self, timeout: Optional[float] = None) -> None:
+        """Wait for deferred steps such as connectivity probes"""
+        if self._background:
+            await asyncio.wait(self._background, timeout=timeout)
+
+    def cancel_background(self) -> None:
+        """Stop deferred steps that are still running"""
+        for task in self._background:
+            task.cancel()
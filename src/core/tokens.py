@@ -0,0 +1,186 @@
+"""
+Token Accounting for OpenClaw AI Agent
+
+Counts prompt tokens, fits requests into the model's context window and tracks reported usage.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Rough English average; used when no tokenizer is configured
+CHARS_PER_TOKEN = 4
+
+# Chat template tokens added around every message, plus the assistant priming
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 2
+
+TRUNCATION_MARKER = "\n…[truncated]…\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap character-based token estimate"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class TokenCounter:
+    """Token counter with a per-text LRU cache, backed by a tokenizer or the heuristic"""
+
+    def __init__(
+        self,
+        encode: Optional[Callable[[str], List[int]]] = None,
+        cache_size: int = 4096
+    ):
+        self.encode = encode
+        self.cache_size = cache_size
+        self.logger = logging.getLogger(__name__)
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, tokens_config: Dict[str, Any]) -> "TokenCounter":
+        """Build a counter from the llm.tokens config section"""
+        encode = None
+        tokenizer_name = tokens_config.get("tokenizer")
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+                encode = lambda text: tokenizer.encode(text, add_special_tokens=False)  # noqa: E731
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f"⚠️ Tokenizer {tokenizer_name} unavailable, using character estimate: {e}"
+                )
+        return cls(encode=encode, cache_size=tokens_config.get("cache_size", 4096))
+
+    def count(self, text: str) -> int:
+        """Tokens in a piece of text"""
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        tokens = len(self.encode(text)) if self.encode else estimate_tokens(text)
+        self._cache[text] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Tokens a chat prompt will occupy, including template overhead"""
+        return sum(self.count(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages) + REPLY_PRIMING_TOKENS
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut the middle out of text so it fits max_tokens, keeping its start and end"""
+        if max_tokens <= 0:
+            return ""
+        tokens = self.count(text)
+        if tokens <= max_tokens:
+            return text
+
+        marker_tokens = self.count(TRUNCATION_MARKER)
+        keep = int(len(text) * max(max_tokens - marker_tokens, 0) / tokens)
+        while keep > 0:
+            head = keep // 2
+            candidate = text[:head] + TRUNCATION_MARKER + text[len(text) - (keep - head):]
+            if self.count(candidate) <= max_tokens:
+                return candidate
+            keep = int(keep * 0.9)
+        return ""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counter backend and cache effectiveness"""
+        return {
+            "tokenizer": self.encode is not None,
+            "cached_texts": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@dataclass
+class PromptBudget:
+    """Context window limits for fitting a request before it is sent"""
+    context_window: int = 8192
+    min_completion_tokens: int = 64
+
+    @classmethod
+    def from_config(cls, tokens_config: Dict[str, Any]) -> "PromptBudget":
+        """Build a budget from the llm.tokens config section"""
+        return cls(
+            context_window=tokens_config.get("context_window", 8192),
+            min_completion_tokens=tokens_config.get("min_completion_tokens", 64)
+        )
+
+    def fit(
+        self,
+        counter: TokenCounter,
+        messages: List[Dict[str, str]],
+        max_tokens: int
+    ) -> Tuple[List[Dict[str, str]], int, int]:
+        """Trim a chat prompt to the window and clamp max_tokens to what is left
+
+        Returns the messages to send, the clamped max_tokens and the prompt token count.
+        """
+        prompt_limit = self.context_window - self.min_completion_tokens
+        messages = list(messages)
+        prompt_tokens = counter.count_messages(messages)
+
+        # Drop the oldest history first, keeping any system prompt and the latest message
+        while prompt_tokens > prompt_limit and len(messages) > 2:
+            del messages[1 if messages[0]["role"] == "system" else 0]
+            prompt_tokens = counter.count_messages(messages)
+
+        # Then cut the longest remaining message down until the prompt fits
+        while prompt_tokens > prompt_limit:
+            index = max(range(len(messages)), key=lambda i: counter.count(messages[i]["content"]))
+            content = messages[index]["content"]
+            excess = prompt_tokens - prompt_limit
+            target = counter.count(content) - excess
+            shortened = counter.truncate(content, target)
+            if shortened == content:
+                break
+            messages[index] = {**messages[index], "content": shortened}
+            prompt_tokens = counter.count_messages(messages)
+
+        available = max(self.context_window - prompt_tokens, 1)
+        return messages, min(max_tokens, available), prompt_tokens
+
+
+class TokenUsage:
+    """Running totals of the token usage vLLM reports per request"""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.truncated_requests = 0
+        self.clamped_requests = 0
+
+    def record(self, usage: Optional[Dict[str, Any]]) -> Tuple[Optional[int], Optional[int]]:
+        """Add one response's usage block, returning its prompt and completion tokens"""
+        if not usage:
+            return None, None
+        prompt = usage.get("prompt_tokens")
+        completion = usage.get("completion_tokens")
+        self.requests += 1
+        self.prompt_tokens += prompt or 0
+        self.completion_tokens += completion or 0
+        return prompt, completion
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Usage totals for the health endpoint"""
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_prompt_tokens": self.prompt_tokens / self.requests if self.requests else 0.0,
+            "avg_completion_tokens": self.completion_tokens / self.requests if self.requests else 0.0,
+            "truncated_requests": self.truncated_requests,
+            "clamped_requests": self.clamped_requests,
+        }
@@ -6,23 +6,57 @@ Provides Discord integration with slash commands and natural language interface.
 
 import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Callable, Dict, Optional
 
 import discord
 from discord.ext import commands
 
 from src.core.config_manager import ConfigManager
+from src.core.llm_client import SchedulerBusyError
+from src.core.metrics import Metrics, get_metrics
+from src.core.rate_limiter import RateLimiter
+from src.discord.chat.context import ConversationStore
+from src.discord.chat.streaming import StreamingResponder
+from src.discord.commands.work_queue import InteractionWorkQueue, Job, WorkQueueFull
+
+
+BUSY_MESSAGE = "🚦 OpenClaw is busy right now, please try again in a moment."
+
+SLOW_DOWN_MESSAGE = "🐢 Slow down! You can use OpenClaw again in {seconds}s."
+
+JOB_FAILED_MESSAGES = {
+    "timeout": "❌ Request timed out. OpenClaw is taking too long to respond.",
+    "cancelled": "🛑 Request cancelled.",
+    "error": "❌ An error occurred while handling your request.",
+}
+
+CHAT_MAX_TOKENS = 500
+
+
+class CommandRateLimited(discord.CheckFailure):
+    """Raised by the global check when a user is over their rate limit"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited for {retry_after:.1f}s")
+        self.retry_after = retry_after
 
 
 class OpenClawBot:
     """OpenClaw Discord bot"""
     
-    def __init__(self, config_manager: ConfigManager, llm_client=None):
+    def __init__(self, config_manager: ConfigManager, llm_client=None, metrics: Optional[Metrics] = None):
         self.config_manager = config_manager
         self.llm_client = llm_client
+        self.metrics = metrics or get_metrics()
         self.logger = logging.getLogger(__name__)
         self.bot: Optional[discord.Bot] = None
+        self.conversations = ConversationStore.from_config(config_manager.get("discord.chat", {}))
+        self.rate_limiter = RateLimiter.from_config(config_manager.get("security", {}))
+        self.work_queue = InteractionWorkQueue.from_config(config_manager.get("discord.work_queue", {}), self.metrics)
         self._setup_complete = False
+        self._command_started: Dict[int, float] = {}
+        self._unsubscribe_config: Optional[Callable[[], None]] = None
     
     async def initialize(self) -> bool:
         """Initialize Discord bot"""
@@ -53,10 +87,23 @@ class OpenClawBot:
                 )
             )
             
+            # Drop conversation context that expired while we were down
+            await self.conversations.purge_expired()
+            
+            # Budget history with the same token counter the vLLM client fits prompts with
+            if self.llm_client is not None and getattr(self.llm_client, "tokens", None) is not None:
+                self.conversations.counter = self.llm_client.tokens
+            
             # Setup events and commands
             await self._setup_events()
             await self._setup_commands()
             
+            # Slow commands acknowledge immediately and finish on the worker pool
+            self.work_queue.start()
+            
+            # Rate limits follow edits to the security section without a restart
+            self._unsubscribe_config = self.config_manager.subscribe("security", self.apply_security_config)
+            
             self._setup_complete = True
             self.logger.info("✅ Discord bot initialized successfully")
             return True
@@ -103,6 +150,27 @@ class OpenClawBot:
             """Called when bot joins a new guild"""
             self.logger.info(f"🎉 Joined new guild: {guild.name} (ID: {guild.id})")
         
+        @self.bot.event
+        async def on_application_command(ctx: discord.ApplicationContext):
+            """Start timing a slash command"""
+            self._command_started[ctx.interaction.id] = time.monotonic()
+        
+        @self.bot.event
+        async def on_application_command_completion(ctx: discord.ApplicationContext):
+            """Record latency for a completed slash command"""
+            self._record_command(ctx, "success")
+        
+        @self.bot.event
+        async def on_application_command_error(ctx: discord.ApplicationContext, error: Exception):
+            """Record latency for a failed slash command"""
+            if isinstance(error, CommandRateLimited):
+                self._record_command(ctx, "rate_limited")
+                seconds = max(1, round(error.retry_after))
+                await ctx.respond(SLOW_DOWN_MESSAGE.format(seconds=seconds), ephemeral=True)
+                return
+            self._record_command(ctx, "error")
+            self.logger.error(f"❌ Command /{ctx.command.name} failed: {error}")
+        
         @self.bot.event
         async def on_error(event, *args, **kwargs):
             """Handle bot errors"""
@@ -111,6 +179,16 @@ class OpenClawBot:
     async def _setup_commands(self):
         """Setup slash commands"""
 
+        @self.bot.check
+        async def rate_limit(ctx: discord.ApplicationContext) -> bool:
+            """Apply security.rate_limiting to every slash command before it runs"""
+            if self.rate_limiter is None:
+                return True
+            decision = await self.rate_limiter.check(ctx.author.id, ctx.guild_id, ctx.command.name)
+            if not decision.allowed:
+                raise CommandRateLimited(decision.retry_after)
+            return True
+
         @self.bot.slash_command(name="ping", description="Check bot latency")
         async def ping(ctx: discord.ApplicationContext):
             """Simple ping command"""
@@ -120,111 +198,156 @@ class OpenClawBot:
         @self.bot.slash_command(name="status", description="Check OpenClaw system status")
         async def status(ctx: discord.ApplicationContext):
             """Check system status"""
-            try:
-                embed = discord.Embed(
-                    title="🤖 OpenClaw Status",
-                    color=discord.Color.green()
+            await self._enqueue(ctx, lambda: self._send_status(ctx))
+
+        @self.bot.slash_command(name="chat", description="Chat with OpenClaw AI")
+        async def chat(
+            ctx: discord.ApplicationContext,
+            message: discord.Option(str, description="Your message to OpenClaw")
+        ):
+            """Chat with AI"""
+            if not self.llm_client:
+                await ctx.respond("❌ LLM service not available", ephemeral=True)
+                return
+
+            self.logger.info("💬 Chat command received: %.50s...", message)
+            await self._enqueue(ctx, lambda: self._send_chat(ctx, message))
+
+        @self.bot.slash_command(name="cancel", description="Cancel your queued or running OpenClaw requests here")
+        async def cancel(ctx: discord.ApplicationContext):
+            """Cancel the caller's jobs in this guild"""
+            cancelled = self.work_queue.cancel_user(ctx.author.id, ctx.guild_id)
+            await ctx.respond(f"🛑 Cancelled {cancelled} request(s)" if cancelled else "Nothing to cancel", ephemeral=True)
+
+        @self.bot.slash_command(name="reset", description="Forget your /chat conversation in this channel")
+        async def reset(ctx: discord.ApplicationContext):
+            """Clear conversation context"""
+            await self.conversations.clear(ConversationStore.make_key(ctx.channel_id, ctx.author.id))
+            await ctx.respond("🧹 Conversation context cleared", ephemeral=True)
+
+        self.logger.info("✅ Discord commands setup completed")
+    
+    async def _enqueue(self, ctx: discord.ApplicationContext, run) -> None:
+        """Acknowledge the interaction now and hand the work to the queue"""
+        await ctx.defer()
+        job = Job(
+            command=ctx.command.name,
+            run=run,
+            guild_id=ctx.guild_id,
+            user_id=ctx.author.id,
+            on_failure=lambda outcome: ctx.respond(JOB_FAILED_MESSAGES[outcome], ephemeral=True)
+        )
+        try:
+            self.work_queue.submit(job)
+        except WorkQueueFull:
+            await ctx.respond(BUSY_MESSAGE, ephemeral=True)
+    
+    async def _send_status(self, ctx: discord.ApplicationContext) -> None:
+        """Build and send the /status embed"""
+        try:
+            embed = discord.Embed(
+                title="🤖 OpenClaw Status",
+                color=discord.Color.green()
+            )
+
+            # Check vLLM status
+            if self.llm_client:
+                vllm_health = await self.llm_client.health_check()
+                vllm_status = "✅ Healthy" if vllm_health.get("status") == "healthy" else "❌ Unhealthy"
+                embed.add_field(
+                    name="🧠 vLLM Service",
+                    value=vllm_status,
+                    inline=True
                 )
 
-                # Check vLLM status
-                if self.llm_client:
-                    vllm_health = await self.llm_client.health_check()
-                    vllm_status = "✅ Healthy" if vllm_health.get("status") == "healthy" else "❌ Unhealthy"
+                if vllm_health.get("models_available"):
                     embed.add_field(
-                        name="🧠 vLLM Service",
-                        value=vllm_status,
+                        name="📊 Available Models",
+                        value=str(vllm_health["models_available"]),
                         inline=True
                     )
 
-                    if vllm_health.get("models_available"):
-                        embed.add_field(
-                            name="📊 Available Models",
-                            value=str(vllm_health["models_available"]),
-                            inline=True
-                        )
+            embed.add_field(
+                name="🔧 Version",
+                value=self.config_manager.get("application.version", "1.0.0"),
+                inline=True
+            )
 
-                embed.add_field(
-                    name="🔧 Version",
-                    value=self.config_manager.get("application.version", "1.0.0"),
-                    inline=True
-                )
+            await ctx.respond(embed=embed)
 
-                await ctx.respond(embed=embed)
+        except Exception as e:
+            self.logger.error(f"❌ Status command error: {e}")
+            await ctx.respond("❌ Failed to get system status", ephemeral=True)
+    
+    async def _send_chat(self, ctx: discord.ApplicationContext, message: str) -> None:
+        """Stream a /chat answer into the deferred response"""
+        try:
+            # Include recent conversation turns within the token budget
+            conversation_key = ConversationStore.make_key(ctx.channel_id, ctx.author.id)
+            messages = await self.conversations.build_messages(conversation_key, message)
 
-            except Exception as e:
-                self.logger.error(f"❌ Status command error: {e}")
-                await ctx.respond("❌ Failed to get system status", ephemeral=True)
+            # Stream the AI response into the deferred message
+            responder = StreamingResponder(
+                edit=lambda text: ctx.edit(embed=self._chat_embed(text, message)),
+                interval=self.config_manager.get("discord.chat.stream_edit_interval", 1.0)
+            )
+
+            # Set only when vLLM finished the reply; a cut-off stream must not enter the history
+            completed = asyncio.Event()
+
+            async def consume():
+                async for chunk in self.llm_client.stream_completion(
+                    messages, max_tokens=CHAT_MAX_TOKENS, on_complete=completed.set
+                ):
+                    await responder.feed(chunk)
 
-        @self.bot.slash_command(name="chat", description="Chat with OpenClaw AI")
-        async def chat(
-            ctx: discord.ApplicationContext,
-            message: discord.Option(str, description="Your message to OpenClaw")
-        ):
-            """Chat with AI"""
             try:
-                if not self.llm_client:
-                    await ctx.respond("❌ LLM service not available", ephemeral=True)
-                    return
-
-                # Send typing indicator
-                await ctx.defer()
-                self.logger.info(f"💬 Chat command received: {message[:50]}...")
-
-                # Get AI response with timeout
-                import asyncio
-                try:
-                    response = await asyncio.wait_for(
-                        self.llm_client.chat(message, max_tokens=500),
-                        timeout=30.0
-                    )
-                    self.logger.info(f"✅ Got response: {response[:100] if response else 'None'}...")
-                except asyncio.TimeoutError:
-                    self.logger.error("❌ vLLM response timeout")
-                    await ctx.respond("❌ Request timed out. The AI is taking too long to respond.", ephemeral=True)
-                    return
-
-                if response:
-                    # Clean up response - remove thinking tags if present
-                    clean_response = response
-                    if '<think>' in clean_response:
-                        # Extract content after thinking
-                        parts = clean_response.split('</think>')
-                        if len(parts) > 1:
-                            clean_response = parts[-1].strip()
-                        else:
-                            # Remove think tags entirely
-                            clean_response = clean_response.replace('<think>', '').strip()
-                    
-                    # Ensure response isn't empty after cleaning
-                    if not clean_response or len(clean_response) < 10:
-                        clean_response = response  # Use original if cleaning went wrong
-                    
-                    self.logger.info(f"📤 Sending response to Discord: {clean_response[:100]}...")
-                    
-                    # Create embed for response
-                    embed = discord.Embed(
-                        title="🤖 OpenClaw Response",
-                        description=clean_response[:2000],  # Discord limit
-                        color=discord.Color.blue()
-                    )
-                    embed.add_field(
-                        name="💭 Your Message",
-                        value=message[:1024],
-                        inline=False
-                    )
+                await asyncio.wait_for(consume(), timeout=self.llm_client.request_timeout(CHAT_MAX_TOKENS))
+            except asyncio.TimeoutError:
+                self.logger.error("❌ vLLM response timeout")
+                await ctx.respond("❌ Request timed out. The AI is taking too long to respond.", ephemeral=True)
+                return
 
-                    await ctx.respond(embed=embed)
-                    self.logger.info("✅ Response sent to Discord successfully")
+            clean_response = await responder.finish()
+            if clean_response:
+                self.logger.info("📤 Sending response to Discord (%d chars, %d edits)", len(clean_response), responder.edits)
+                await ctx.edit(embed=self._chat_embed(clean_response, message))
+                if completed.is_set():
+                    await self.conversations.add_turn(conversation_key, message, clean_response)
                 else:
-                    await ctx.respond("❌ Failed to get AI response", ephemeral=True)
-
-            except Exception as e:
-                self.logger.error(f"❌ Chat command error: {e}")
-                import traceback
-                self.logger.error(traceback.format_exc())
-                await ctx.respond(f"❌ An error occurred: {str(e)[:100]}", ephemeral=True)
+                    self.logger.warning("⚠️ Partial response not saved to conversation history")
+                self.logger.info("✅ Response sent to Discord successfully")
+            else:
+                await ctx.respond("❌ Failed to get AI response", ephemeral=True)
 
-        self.logger.info("✅ Discord commands setup completed")
+        except SchedulerBusyError:
+            await ctx.respond(BUSY_MESSAGE, ephemeral=True)
+        except Exception as e:
+            self.logger.error(f"❌ Chat command error: {e}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            await ctx.respond(f"❌ An error occurred: {str(e)[:100]}", ephemeral=True)
+    
+    def _record_command(self, ctx: discord.ApplicationContext, outcome: str) -> None:
+        """Export per-command latency and count"""
+        started = self._command_started.pop(ctx.interaction.id, None)
+        if started is not None:
+            self.metrics.record_command(ctx.command.name, time.monotonic() - started, outcome)
+    
+    @staticmethod
+    def _chat_embed(response: str, message: str) -> discord.Embed:
+        """Build the embed used for /chat responses"""
+        embed = discord.Embed(
+            title="🤖 OpenClaw Response",
+            description=response[:2000],  # Discord limit
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="💭 Your Message",
+            value=message[:1024],
+            inline=False
+        )
+        return embed
     
     async def start(self):
         """Start the Discord bot"""
@@ -239,8 +362,25 @@ class OpenClawBot:
         self.logger.info("🚀 Starting Discord bot...")
         await self.bot.start(token)
     
+    def apply_security_config(self, security_config: Dict) -> None:
+        """Swap in a rate limiter built from the reloaded security section"""
+        previous = self.rate_limiter
+        self.rate_limiter = RateLimiter.from_config(security_config or {})
+        if previous is not None:
+            previous.close()
+        state = "enabled" if self.rate_limiter is not None else "disabled"
+        self.logger.info(f"🔄 Rate limiting reloaded ({state})")
+    
     async def cleanup(self):
         """Cleanup Discord bot"""
+        if self._unsubscribe_config is not None:
+            self._unsubscribe_config()
+        
+        await self.work_queue.stop()
+        self.conversations.close()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+        
         if self.bot:
             await self.bot.close()
             self.logger.info("✅ Discord bot cleaned up")
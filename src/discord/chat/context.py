@@ -0,0 +1,260 @@
+"""
+Conversation Context Store for OpenClaw Discord Chat
+
+Keeps recent /chat turns per channel and user so follow-up questions have context.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.core.llm_client import ChatMessage, DEFAULT_SYSTEM_MESSAGE
+from src.core.tokens import TokenCounter
+
+
+@dataclass
+class Turn:
+    """One user message and the assistant's reply"""
+    user: str
+    assistant: str
+
+
+@dataclass
+class Conversation:
+    """Ring buffer of recent turns for one channel/user pair"""
+    turns: Deque[Turn]
+    last_active: float
+
+
+class SQLiteConversationBackend:
+    """On-disk store so conversation context survives restarts"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and ensure the table exists"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, "
+                "user TEXT NOT NULL, assistant TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS turns_key ON turns (key, id)")
+        return self._conn
+
+    def load(self, key: str, limit: int, since: float) -> List[Tuple[str, str, float]]:
+        """Return up to limit recent turns for a key, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT user, assistant, created_at FROM turns WHERE key = ? AND created_at > ? "
+                "ORDER BY id DESC LIMIT ?",
+                (key, since, limit)
+            ).fetchall()
+        return list(reversed(rows))
+
+    def append(self, key: str, turn: Turn, created_at: float, keep: int) -> None:
+        """Store a turn and drop anything older than the last keep turns"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO turns (key, user, assistant, created_at) VALUES (?, ?, ?, ?)",
+                (key, turn.user, turn.assistant, created_at)
+            )
+            conn.execute(
+                "DELETE FROM turns WHERE key = ? AND id NOT IN "
+                "(SELECT id FROM turns WHERE key = ? ORDER BY id DESC LIMIT ?)",
+                (key, key, keep)
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Forget a conversation"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM turns WHERE key = ?", (key,))
+            conn.commit()
+
+    def purge(self, before: float) -> None:
+        """Drop turns older than the idle TTL"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM turns WHERE created_at <= ?", (before,))
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ConversationStore:
+    """Per-channel/per-user conversation history with TTL eviction"""
+
+    def __init__(
+        self,
+        max_turns: int = 10,
+        token_budget: int = 3000,
+        ttl_seconds: float = 3600,
+        max_conversations: int = 10000,
+        backend: Optional[SQLiteConversationBackend] = None,
+        counter: Optional[TokenCounter] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.ttl_seconds = ttl_seconds
+        self.max_conversations = max_conversations
+        self.backend = backend
+        self.counter = counter or TokenCounter()
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        # Ordered by last activity so idle conversations sit at the front
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, chat_config: Dict[str, Any]) -> "ConversationStore":
+        """Build a store from the discord.chat config section"""
+        backend = None
+        if chat_config.get("persist", False):
+            backend = SQLiteConversationBackend(chat_config.get("persist_path", "/app/data/conversations.sqlite"))
+        return cls(
+            max_turns=chat_config.get("context_length", 10),
+            token_budget=chat_config.get("context_token_budget", 3000),
+            ttl_seconds=chat_config.get("context_ttl", 3600),
+            max_conversations=chat_config.get("max_conversations", 10000),
+            backend=backend
+        )
+
+    @staticmethod
+    def make_key(channel_id: Any, user_id: Any) -> str:
+        """Conversation key for a channel/user pair"""
+        return f"{channel_id}:{user_id}"
+
+    def __len__(self) -> int:
+        """Number of conversations held in memory"""
+        return len(self._conversations)
+
+    def sweep(self) -> int:
+        """Evict idle and overflow conversations, returning how many were dropped"""
+        cutoff = self.clock() - self.ttl_seconds
+        evicted = 0
+        while self._conversations:
+            key, conversation = next(iter(self._conversations.items()))
+            if conversation.last_active > cutoff and len(self._conversations) <= self.max_conversations:
+                break
+            del self._conversations[key]
+            evicted += 1
+        return evicted
+
+    async def get_turns(self, key: str) -> List[Turn]:
+        """Recent turns for a conversation, loading from disk on a cold start"""
+        self.sweep()
+        conversation = self._conversations.get(key)
+        if conversation is not None:
+            return list(conversation.turns)
+
+        if not self.backend:
+            return []
+
+        try:
+            rows = await asyncio.to_thread(
+                self.backend.load, key, self.max_turns, self.clock() - self.ttl_seconds
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to load conversation {key}: {e}")
+            return []
+
+        if not rows:
+            return []
+
+        turns = deque((Turn(user=u, assistant=a) for u, a, _ in rows), maxlen=self.max_turns)
+        self._conversations[key] = Conversation(turns=turns, last_active=self.clock())
+        self._conversations.move_to_end(key)
+        return list(turns)
+
+    async def add_turn(self, key: str, user_message: str, assistant_message: str) -> None:
+        """Append a completed exchange to a conversation"""
+        now = self.clock()
+        turn = Turn(user=user_message, assistant=assistant_message)
+
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = Conversation(turns=deque(maxlen=self.max_turns), last_active=now)
+            self._conversations[key] = conversation
+        conversation.turns.append(turn)
+        conversation.last_active = now
+        self._conversations.move_to_end(key)
+        self.sweep()
+
+        if self.backend:
+            try:
+                await asyncio.to_thread(self.backend.append, key, turn, now, self.max_turns)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Failed to persist conversation {key}: {e}")
+
+    async def clear(self, key: str) -> None:
+        """Forget a conversation"""
+        self._conversations.pop(key, None)
+        if self.backend:
+            await asyncio.to_thread(self.backend.delete, key)
+
+    async def build_messages(
+        self,
+        key: str,
+        user_message: str,
+        system_message: Optional[str] = None
+    ) -> List[ChatMessage]:
+        """Build a prompt with as much recent history as fits the token budget"""
+        system = system_message or DEFAULT_SYSTEM_MESSAGE
+        count = self.counter.count
+        remaining = self.token_budget - count(system) - count(user_message)
+
+        history: List[ChatMessage] = []
+        for turn in reversed(await self.get_turns(key)):
+            cost = count(turn.user) + count(turn.assistant)
+            if cost > remaining:
+                break
+            remaining -= cost
+            history[:0] = [
+                ChatMessage(role="user", content=turn.user),
+                ChatMessage(role="assistant", content=turn.assistant),
+            ]
+
+        return [
+            ChatMessage(role="system", content=system),
+            *history,
+            ChatMessage(role="user", content=user_message),
+        ]
+
+    async def purge_expired(self) -> None:
+        """Drop expired turns from the persistent store"""
+        if self.backend:
+            await asyncio.to_thread(self.backend.purge, self.clock() - self.ttl_seconds)
+
+    def close(self) -> None:
+        """Release the persistent backend"""
+        if self.backend:
+            self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy statistics"""
+        return {
+            "conversations": len(self._conversations),
+            "max_conversations": self.max_conversations,
+            "max_turns": self.max_turns,
+            "token_budget": self.token_budget,
+            "persistent": self.backend is not None,
+        }
@@ -0,0 +1,82 @@
+"""
+Streaming Response Helpers for OpenClaw Discord Chat
+
+Turns a token stream from the LLM into rate-limited edits of a single Discord message.
+"""
+
+import time
+from typing import Awaitable, Callable, Optional
+
+
+THINKING_PLACEHOLDER = "🤔 Thinking..."
+
+
+def clean_response(response: str) -> str:
+    """Strip <think> reasoning blocks from a model response"""
+    clean = response
+    if '<think>' in clean:
+        # Extract content after thinking
+        parts = clean.split('</think>')
+        if len(parts) > 1:
+            clean = parts[-1].strip()
+        else:
+            # Remove think tags entirely
+            clean = clean.replace('<think>', '').strip()
+
+    # Ensure response isn't empty after cleaning
+    if not clean or len(clean) < 10:
+        clean = response  # Use original if cleaning went wrong
+
+    return clean
+
+
+def render_partial(response: str) -> str:
+    """Render an in-progress response, hiding an unfinished <think> block"""
+    if '<think>' in response and '</think>' not in response:
+        return THINKING_PLACEHOLDER
+    if '</think>' in response:
+        return response.split('</think>')[-1].strip() or THINKING_PLACEHOLDER
+    return response or THINKING_PLACEHOLDER
+
+
+class StreamingResponder:
+    """Coalesces streamed text into message edits at a bounded cadence"""
+
+    def __init__(
+        self,
+        edit: Callable[[str], Awaitable[None]],
+        interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.edit = edit
+        self.interval = interval
+        self.clock = clock
+        self.text = ""
+        self.edits = 0
+        self._last_edit: Optional[float] = None
+        self._last_rendered: Optional[str] = None
+
+    def _due(self) -> bool:
+        """Check whether enough time has passed since the last edit"""
+        # The very first chunk is shown immediately to minimise time-to-first-token
+        return self._last_edit is None or self.clock() - self._last_edit >= self.interval
+
+    async def _render(self) -> None:
+        """Push the current text to Discord if it changed"""
+        rendered = render_partial(self.text)
+        if rendered == self._last_rendered:
+            return
+        await self.edit(rendered)
+        self._last_rendered = rendered
+        self._last_edit = self.clock()
+        self.edits += 1
+
+    async def feed(self, chunk: str) -> None:
+        """Append a chunk and edit the message if the cadence allows it"""
+        self.text += chunk
+        if self._due():
+            await self._render()
+
+    async def finish(self) -> str:
+        """Return the cleaned full response once the stream ends"""
+        return clean_response(self.text) if self.text else ""
@@ -0,0 +1,257 @@
+"""
+Interaction Work Queue for OpenClaw Discord Commands
+
+Runs deferred slash command work on a pool of workers, taking turns between guilds.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from src.core.metrics import Metrics
+
+
+_job_ids = itertools.count(1)
+
+
+class WorkQueueFull(Exception):
+    """Raised when a job is submitted while the queue (or its guild's share) is full"""
+
+
+@dataclass(eq=False)
+class Job:
+    """One deferred command: run() does the work and sends the followups"""
+    command: str
+    run: Callable[[], Awaitable[None]]
+    guild_id: Optional[int] = None
+    user_id: Optional[int] = None
+    timeout: Optional[float] = None
+    on_failure: Optional[Callable[[str], Awaitable[Any]]] = None
+    id: int = field(default_factory=lambda: next(_job_ids))
+    enqueued_at: Optional[float] = None
+    started_at: Optional[float] = None
+    outcome: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def fairness_key(self) -> Any:
+        """Guild the job is scheduled under; DMs get one slot per user"""
+        return self.guild_id if self.guild_id is not None else ("dm", self.user_id)
+
+
+class InteractionWorkQueue:
+    """Per-guild round-robin job queue drained by a fixed pool of async workers"""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_pending: int = 200,
+        max_pending_per_guild: int = 20,
+        job_timeout: float = 120.0,
+        metrics: Optional[Metrics] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self.max_pending_per_guild = max_pending_per_guild
+        self.job_timeout = job_timeout
+        self.metrics = metrics
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._queues: Dict[Any, Deque[Job]] = {}
+        self._turns: Deque[Any] = deque()
+        self._available = asyncio.Semaphore(0)
+        self._running: Dict[int, Job] = {}
+        self._workers: List[asyncio.Task] = []
+        self._notifications: Set[asyncio.Task] = set()
+        self.pending = 0
+        self.outcomes: Dict[str, int] = {"success": 0, "error": 0, "timeout": 0, "cancelled": 0}
+
+    @classmethod
+    def from_config(cls, queue_config: Dict[str, Any], metrics: Optional[Metrics] = None) -> "InteractionWorkQueue":
+        """Build a queue from the discord.work_queue config section"""
+        return cls(
+            workers=queue_config.get("workers", 4),
+            max_pending=queue_config.get("max_pending", 200),
+            max_pending_per_guild=queue_config.get("max_pending_per_guild", 20),
+            job_timeout=queue_config.get("job_timeout", 120.0),
+            metrics=metrics
+        )
+
+    def start(self) -> None:
+        """Spawn the worker pool"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"work-queue:{n}") for n in range(self.worker_count)
+        ]
+        self.logger.info(f"✅ Work queue started with {self.worker_count} workers")
+
+    async def stop(self) -> None:
+        """Cancel waiting jobs, then stop workers and the jobs they are running"""
+        for queue in self._queues.values():
+            for job in queue:
+                self._finish(job, "cancelled")
+        self._queues.clear()
+        self._turns.clear()
+        self.pending = 0
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: Job) -> Job:
+        """Queue a job behind other jobs from its guild"""
+        key = job.fairness_key
+        queue = self._queues.get(key)
+        if self.pending >= self.max_pending or (queue is not None and len(queue) >= self.max_pending_per_guild):
+            raise WorkQueueFull(f"Work queue full ({self.pending} pending)")
+
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._turns.append(key)
+        if job.timeout is None:
+            job.timeout = self.job_timeout
+        job.enqueued_at = self.clock()
+        queue.append(job)
+        self.pending += 1
+        self._set_depth()
+        self._available.release()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a waiting or running job"""
+        running = self._running.get(job_id)
+        if running is not None:
+            # A job that already ended but is still reporting its failure cannot be cancelled
+            return running.task.cancel()
+
+        for key, queue in self._queues.items():
+            for job in queue:
+                if job.id == job_id:
+                    queue.remove(job)
+                    self._drop_if_empty(key)
+                    self.pending -= 1
+                    self._set_depth()
+                    self._finish(job, "cancelled")
+                    self._notify(job, "cancelled")
+                    return True
+        return False
+
+    def cancel_user(self, user_id: int, guild_id: Optional[int] = None) -> int:
+        """Cancel a user's waiting and running jobs in a guild; returns how many were cancelled"""
+        jobs = [job for queue in self._queues.values() for job in queue] + list(self._running.values())
+        cancelled = 0
+        for job in jobs:
+            if job.user_id == user_id and job.guild_id == guild_id and self.cancel(job.id):
+                cancelled += 1
+        return cancelled
+
+    def _drop_if_empty(self, key: Any) -> None:
+        """Forget a guild once it has nothing queued"""
+        if not self._queues[key]:
+            del self._queues[key]
+            self._turns.remove(key)
+
+    def _next_job(self) -> Optional[Job]:
+        """Take the oldest job of the guild whose turn it is"""
+        if not self._turns:
+            return None
+        key = self._turns.popleft()
+        queue = self._queues[key]
+        job = queue.popleft()
+        if queue:
+            self._turns.append(key)
+        else:
+            del self._queues[key]
+        self.pending -= 1
+        self._set_depth()
+        return job
+
+    async def _worker(self) -> None:
+        """Run jobs one at a time until cancelled"""
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+            # Jobs cancelled while waiting leave their permit behind
+            if job is not None:
+                await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        """Run one job under its timeout and record how it ended"""
+        job.started_at = self.clock()
+        job.task = asyncio.create_task(job.run())
+        self._running[job.id] = job
+        try:
+            try:
+                done, _ = await asyncio.wait({job.task}, timeout=job.timeout)
+            except asyncio.CancelledError:
+                # The worker itself is stopping
+                job.task.cancel()
+                await asyncio.gather(job.task, return_exceptions=True)
+                self._finish(job, "cancelled")
+                raise
+
+            if not done:
+                job.task.cancel()
+                await asyncio.gather(job.task, return_exceptions=True)
+                outcome = "timeout"
+            elif job.task.cancelled():
+                outcome = "cancelled"
+            elif job.task.exception() is not None:
+                self.logger.error(f"❌ /{job.command} job failed: {job.task.exception()}")
+                outcome = "error"
+            else:
+                outcome = "success"
+
+            self._finish(job, outcome)
+            if outcome != "success":
+                await self._call_failure(job, outcome)
+        finally:
+            # Still counted as running until the user has been told how it ended
+            self._running.pop(job.id, None)
+
+    def _finish(self, job: Job, outcome: str) -> None:
+        """Count a job that left the queue and export its timings"""
+        job.outcome = outcome
+        self.outcomes[outcome] += 1
+        now = self.clock()
+        started = job.started_at if job.started_at is not None else now
+        if self.metrics is not None:
+            self.metrics.record_job(job.command, started - job.enqueued_at, now - started, outcome)
+
+    def _notify(self, job: Job, outcome: str) -> None:
+        """Tell the user about a job cancelled before it started, without blocking the caller"""
+        if job.on_failure is not None:
+            task = asyncio.create_task(self._call_failure(job, outcome))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    async def _call_failure(self, job: Job, outcome: str) -> None:
+        """Run a job's failure callback, which usually sends an ephemeral followup"""
+        if job.on_failure is None:
+            return
+        try:
+            await job.on_failure(outcome)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to report {outcome} for /{job.command}: {e}")
+
+    def _set_depth(self) -> None:
+        """Export the number of waiting jobs"""
+        if self.metrics is not None:
+            self.metrics.job_queue_depth.set(self.pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, workers and per-outcome counts"""
+        return {
+            "workers": len(self._workers),
+            "pending": self.pending,
+            "running": len(self._running),
+            "guilds_waiting": len(self._turns),
+            **self.outcomes,
+        }
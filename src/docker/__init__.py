@@ -0,0 +1,18 @@
+"""
+Docker Integration for OpenClaw AI Agent
+
+Imported lazily so the agent does not load the docker SDK until a build is requested.
+"""
+
+from src.core.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "BuildError": ".builder",
+    "BuildLog": ".builder",
+    "BuildLogRelay": ".log_relay",
+    "BuildQueueFull": ".builder",
+    "BuildRequest": ".builder",
+    "BuildResult": ".builder",
+    "BuildTimeout": ".builder",
+    "DockerBuilder": ".builder",
+})
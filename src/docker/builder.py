@@ -0,0 +1,445 @@
+"""
+Docker Build Service for OpenClaw AI Agent
+
+Queues image builds against the DinD daemon, streams build contexts and reuses layer caches.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tarfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Deque, Dict, List, Optional
+
+from src.core.lazy import lazy_import
+from src.core.metrics import Metrics
+
+docker = lazy_import("docker")
+
+
+_STEP = re.compile(r"^Step \d+/\d+ : (\w+)")
+
+# Lines of daemon output kept on a BuildResult
+LOG_TAIL = 50
+
+
+class BuildError(Exception):
+    """Raised when the daemon reports a failed build"""
+
+    def __init__(self, message: str, logs: Optional[List[str]] = None):
+        super().__init__(message)
+        self.logs = logs or []
+
+
+class BuildTimeout(BuildError):
+    """Raised when a build runs past build_timeout"""
+
+
+class BuildQueueFull(Exception):
+    """Raised when max_queued builds are already waiting or running"""
+
+
+@dataclass
+class BuildRequest:
+    """What to build and where its context lives"""
+    context_path: Path
+    tag: str
+    dockerfile: str = "Dockerfile"
+    buildargs: Dict[str, str] = field(default_factory=dict)
+    target: Optional[str] = None
+    cache_key: Optional[str] = None
+
+    @property
+    def cache_name(self) -> str:
+        """Builds sharing a cache name reuse each other's layers (defaults to the image name)"""
+        name = self.cache_key or self.tag.rsplit(":", 1)[0]
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+@dataclass
+class BuildResult:
+    """Outcome of a finished build"""
+    tag: str
+    image_id: Optional[str]
+    duration: float
+    steps: int
+    cache_hits: int
+    cacheable_steps: int
+    logs: List[str]
+
+    @property
+    def cache_ratio(self) -> float:
+        """Share of cacheable steps (everything but FROM) served from the layer cache"""
+        return self.cache_hits / self.cacheable_steps if self.cacheable_steps else 0.0
+
+
+class BuildLog:
+    """Build output lines written from the worker thread, read as an async iterator on the loop
+
+    At most max_pending unread lines are held: past that the worker waits for the reader, and a
+    reader that makes no room within stall_timeout gets later lines dropped and counted instead.
+    """
+
+    _END = object()
+
+    def __init__(self, max_pending: int = 1000, stall_timeout: float = 5.0):
+        self.stall_timeout = stall_timeout
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._space = threading.Semaphore(max_pending)
+        self._stalled = False
+        self._closed = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Attach to the loop the reader runs on"""
+        self._loop = loop
+
+    def write(self, line: str) -> None:
+        """Queue a line, waiting while the reader is behind (thread-safe)"""
+        if self._closed:
+            # An abandoned build still streaming after the reader saw the end
+            return
+        # Once the reader has stalled, don't hold the worker up again until it catches up
+        if not self._space.acquire(timeout=0 if self._stalled else self.stall_timeout):
+            self._stalled = True
+            self.dropped += 1
+            return
+        self._stalled = False
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, line)
+        except RuntimeError:
+            # The loop has shut down under a build that outlived it
+            self._closed = True
+
+    def close(self) -> None:
+        """End iteration once queued lines are read (thread-safe)"""
+        self._closed = True
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, self._END)
+        except RuntimeError:
+            pass
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """Yield lines until the build ends"""
+        while True:
+            line = await self._queue.get()
+            if line is self._END:
+                return
+            self._space.release()
+            yield line
+
+
+class BuildProgress:
+    """Tallies steps, cache hits and the image ID from the daemon's JSON stream"""
+
+    def __init__(self, on_line: Optional[Callable[[str], None]] = None):
+        self.on_line = on_line
+        self.steps = 0
+        self.from_steps = 0
+        self.cache_hits = 0
+        self.image_id: Optional[str] = None
+        self.logs: Deque[str] = deque(maxlen=LOG_TAIL)
+
+    def feed(self, chunk: Dict[str, Any]) -> None:
+        """Consume one decoded stream message, raising BuildError on a daemon error"""
+        if "error" in chunk:
+            error = chunk["error"].strip()
+            if self.on_line is not None:
+                self.on_line(error)
+            raise BuildError(error, list(self.logs))
+
+        if isinstance(chunk.get("aux"), dict) and "ID" in chunk["aux"]:
+            self.image_id = chunk["aux"]["ID"]
+
+        for line in (chunk.get("stream") or "").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            self.logs.append(line)
+            if self.on_line is not None:
+                self.on_line(line)
+            match = _STEP.match(line)
+            if match:
+                self.steps += 1
+                if match.group(1).upper() == "FROM":
+                    self.from_steps += 1
+            elif line == "---> Using cache":
+                self.cache_hits += 1
+
+
+def context_files(root: Path, dockerfile: str) -> List[str]:
+    """Paths under root that belong in the build context, honouring .dockerignore"""
+    if not (root / dockerfile).is_file():
+        raise BuildError(f"No {dockerfile} in build context {root}")
+    patterns: List[str] = []
+    ignore_file = root / ".dockerignore"
+    if ignore_file.exists():
+        patterns = [
+            line.strip() for line in ignore_file.read_text().splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+    return sorted(docker.utils.build.exclude_paths(str(root), patterns, dockerfile=dockerfile))
+
+
+def stream_context(root: Path, dockerfile: str = "Dockerfile") -> BinaryIO:
+    """Readable tar stream of the build context, written by a background thread through a pipe"""
+    files = context_files(root, dockerfile)
+
+    def write(write_fd: int) -> None:
+        try:
+            with os.fdopen(write_fd, "wb") as pipe, tarfile.open(fileobj=pipe, mode="w|") as tar:
+                for name in files:
+                    tar.add(str(root / name), arcname=name, recursive=False)
+        except (BrokenPipeError, OSError):
+            # The reader went away (build cancelled or failed); nothing to clean up
+            pass
+
+    read_fd, write_fd = os.pipe()
+    try:
+        threading.Thread(target=write, args=(write_fd,), name="build-context", daemon=True).start()
+        return os.fdopen(read_fd, "rb")
+    except BaseException:
+        # Until the writer owns write_fd and the caller owns read_fd, both are ours to close
+        os.close(read_fd)
+        os.close(write_fd)
+        raise
+
+
+class DockerBuilder:
+    """Bounded build queue running docker SDK builds on a thread pool"""
+
+    def __init__(
+        self,
+        api_factory: Callable[[], Any],
+        cache_dir: str = "/app/build-cache",
+        max_parallel: int = 2,
+        max_queued: int = 20,
+        build_timeout: float = 300.0,
+        metrics: Optional[Metrics] = None
+    ):
+        self.api_factory = api_factory
+        self.cache_dir = Path(cache_dir)
+        self.max_parallel = max_parallel
+        self.max_queued = max_queued
+        self.build_timeout = build_timeout
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
+        self._api = None
+        self._api_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="docker-build")
+        self._slots = asyncio.Semaphore(max_parallel)
+        self.queued = 0
+        self.running = 0
+        self.stats = {"succeeded": 0, "failed": 0, "timed_out": 0, "cache_hits": 0, "cacheable_steps": 0}
+
+    @classmethod
+    def from_config(
+        cls,
+        docker_config: Dict[str, Any],
+        cache_dir: str = "/app/build-cache",
+        metrics: Optional[Metrics] = None
+    ) -> "DockerBuilder":
+        """Build a service for the DinD daemon described by the docker config section"""
+        build_timeout = docker_config.get("build_timeout", 300)
+
+        def api_factory():
+            tls = None
+            if docker_config.get("tls_verify", False):
+                cert_path = Path(docker_config.get("cert_path", "/certs/client"))
+                tls = docker.tls.TLSConfig(
+                    client_cert=(str(cert_path / "cert.pem"), str(cert_path / "key.pem")),
+                    ca_cert=str(cert_path / "ca.pem"),
+                    verify=True
+                )
+            # The socket timeout also bounds a daemon that stops sending build output
+            return docker.APIClient(base_url=docker_config.get("host", "tcp://dind:2376"), tls=tls, timeout=build_timeout)
+
+        return cls(
+            api_factory,
+            cache_dir=cache_dir,
+            max_parallel=docker_config.get("max_parallel_builds", 2),
+            max_queued=docker_config.get("max_queued_builds", 20),
+            build_timeout=build_timeout,
+            metrics=metrics
+        )
+
+    @property
+    def api(self):
+        """Low-level docker API client, created on first use"""
+        with self._api_lock:
+            if self._api is None:
+                self._api = self.api_factory()
+            return self._api
+
+    def _cache_manifest(self, request: BuildRequest) -> Path:
+        """File remembering which image last built this cache name"""
+        return self.cache_dir / f"{request.cache_name}.json"
+
+    def _cache_sources(self, request: BuildRequest) -> List[str]:
+        """Images whose layers the daemon may reuse (blocking)"""
+        sources = [request.tag]
+        manifest = self._cache_manifest(request)
+        try:
+            sources[:0] = [tag for tag in json.loads(manifest.read_text()).get("images", []) if tag != request.tag]
+        except (OSError, ValueError):
+            pass
+        return sources
+
+    def _remember(self, request: BuildRequest, result: BuildResult) -> None:
+        """Record a successful build as the cache source for the next one (blocking)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._cache_manifest(request)
+        # Per-thread temp name: concurrent builds of one cache name must not share it
+        tmp = manifest.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({
+            "images": [request.tag],
+            "image_id": result.image_id,
+            "built_at": time.time(),
+            "cache_ratio": result.cache_ratio,
+        }))
+        os.replace(tmp, manifest)
+
+    def _build_sync(self, request: BuildRequest, cancelled: threading.Event, log: Optional[BuildLog]) -> BuildResult:
+        """Stream the context to the daemon and follow its output (runs on the pool)"""
+        started = time.monotonic()
+        progress = BuildProgress(log.write if log is not None else None)
+
+        with stream_context(request.context_path, request.dockerfile) as context:
+            output = self.api.build(
+                fileobj=context,
+                custom_context=True,
+                tag=request.tag,
+                dockerfile=request.dockerfile,
+                buildargs=request.buildargs,
+                target=request.target,
+                cache_from=self._cache_sources(request),
+                rm=True,
+                forcerm=True,
+                decode=True
+            )
+            for chunk in output:
+                if cancelled.is_set():
+                    # Dropping the stream closes the connection, which stops the build in the daemon
+                    output.close()
+                    raise BuildTimeout(f"Build of {request.tag} exceeded {self.build_timeout:.0f}s", list(progress.logs))
+                progress.feed(chunk)
+
+        if progress.image_id is None:
+            raise BuildError(f"Build of {request.tag} finished without an image", list(progress.logs))
+
+        result = BuildResult(
+            tag=request.tag,
+            image_id=progress.image_id,
+            duration=time.monotonic() - started,
+            steps=progress.steps,
+            cache_hits=progress.cache_hits,
+            cacheable_steps=progress.steps - progress.from_steps,
+            logs=list(progress.logs)
+        )
+        self._remember(request, result)
+        return result
+
+    async def build(self, request: BuildRequest, log: Optional[BuildLog] = None) -> BuildResult:
+        """Queue a build, wait for a slot and run it under build_timeout, copying output lines to log"""
+        loop = asyncio.get_running_loop()
+        if log is not None:
+            log.bind(loop)
+            try:
+                return await self._build(request, loop, log)
+            finally:
+                log.close()
+                if log.dropped:
+                    self.logger.warning(f"⚠️ Build log for {request.tag} fell behind; {log.dropped} lines dropped")
+        return await self._build(request, loop, log)
+
+    async def _build(self, request: BuildRequest, loop: asyncio.AbstractEventLoop, log: Optional[BuildLog]) -> BuildResult:
+        """Admit the build to the queue and run it on the pool"""
+        if self.queued + self.running >= self.max_queued:
+            raise BuildQueueFull(f"{self.queued + self.running} builds already queued")
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        started = time.monotonic()
+        cancelled = threading.Event()
+        future = loop.run_in_executor(self._executor, self._build_sync, request, cancelled, log)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=self.build_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # The worker stops at its next output chunk (a silent step is bounded by the
+            # client's socket timeout); its BuildTimeout is consumed here
+            cancelled.set()
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._record("timeout", time.monotonic() - started)
+            self.logger.error(f"❌ Build of {request.tag} timed out after {self.build_timeout:.0f}s")
+            raise BuildTimeout(f"Build of {request.tag} exceeded {self.build_timeout:.0f}s")
+        except Exception as e:
+            self._record("error", time.monotonic() - started)
+            self.logger.error(f"❌ Build of {request.tag} failed: {e}")
+            if isinstance(e, BuildError):
+                raise
+            # Daemon/API errors (unreachable host, bad TLS, missing base image) surface as BuildError too
+            raise BuildError(str(e)) from e
+        finally:
+            # The slot is freed only once the worker has stopped, so an abandoned build that
+            # is still running in the daemon keeps counting against max_parallel
+            future.add_done_callback(self._release_slot)
+
+        self._record("success", result.duration, result)
+        self.logger.info(
+            f"✅ Built {result.tag} in {result.duration:.1f}s "
+            f"({result.cache_hits}/{result.cacheable_steps} steps cached)"
+        )
+        return result
+
+    def _release_slot(self, _future: asyncio.Future) -> None:
+        """Free a parallelism slot once a worker has finished"""
+        self.running -= 1
+        self._slots.release()
+
+    async def build_repo(self, repo_cache, repo: str, ref: str, tag: str, **options) -> BuildResult:
+        """Build straight from a repo cache worktree; the context is streamed, never copied"""
+        async with repo_cache.checkout(repo, ref) as checkout:
+            context_path = checkout.path / options.pop("context", ".")
+            options.setdefault("cache_key", repo)
+            return await self.build(BuildRequest(context_path=context_path, tag=tag, **options))
+
+    def _record(self, outcome: str, duration: float, result: Optional[BuildResult] = None) -> None:
+        """Count a finished build and export its duration and cache ratio"""
+        key = {"success": "succeeded", "error": "failed", "timeout": "timed_out"}[outcome]
+        self.stats[key] += 1
+        if result is not None:
+            self.stats["cache_hits"] += result.cache_hits
+            self.stats["cacheable_steps"] += result.cacheable_steps
+        if self.metrics is not None:
+            self.metrics.record_build(duration, outcome, result.cache_ratio if result is not None else None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, outcomes and the overall layer cache hit ratio"""
+        cacheable = self.stats["cacheable_steps"]
+        return {
+            **self.stats,
+            "queued": self.queued,
+            "running": self.running,
+            "cache_ratio": self.stats["cache_hits"] / cacheable if cacheable else 0.0,
+        }
+
+    def close(self) -> None:
+        """Stop the worker pool and close the API client"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._api is not None:
+            self._api.close()
@@ -0,0 +1,173 @@
+"""
+Build Log Relay for OpenClaw Docker Builds
+
+Mirrors a build's output into one Discord message edited at a fixed cadence and spills the full log to gzip.
+"""
+
+import asyncio
+import gzip
+import logging
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterable, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.docker.builder import BuildError, BuildLog, BuildQueueFull, BuildRequest, BuildResult, BuildTimeout
+
+
+# Discord caps message content at 2000 characters
+MAX_MESSAGE_CHARS = 1900
+# Longer lines are shortened in the Discord tail (the log file keeps them whole)
+MAX_LINE_CHARS = 200
+
+
+class BuildLogRelay:
+    """Keeps a bounded tail of a build log for Discord and streams the rest to disk"""
+
+    def __init__(
+        self,
+        edit: Callable[[str], Awaitable[Any]],
+        log_path: Path,
+        title: str = "Build",
+        tail_lines: int = 15,
+        interval: float = 3.0,
+        flush_lines: int = 500,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.edit = edit
+        self.log_path = Path(log_path)
+        self.title = title
+        self.interval = interval
+        self.flush_lines = flush_lines
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self.tail: Deque[str] = deque(maxlen=tail_lines)
+        self.lines = 0
+        self.edits = 0
+        self.status = "🔄 Building"
+        self._pending: List[str] = []
+        self._file: Optional[gzip.GzipFile] = None
+        self._file_lock = asyncio.Lock()
+        self._last_rendered: Optional[str] = None
+        self._started = clock()
+
+    @classmethod
+    def from_config(
+        cls,
+        relay_config: Dict[str, Any],
+        log_dir: str,
+        edit: Callable[[str], Awaitable[Any]],
+        tag: str
+    ) -> "BuildLogRelay":
+        """Relay for one build of tag, built from the docker.log_relay config section"""
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", tag)
+        return cls(
+            edit,
+            Path(log_dir) / "builds" / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.log.gz",
+            title=f"Build {tag}",
+            tail_lines=relay_config.get("tail_lines", 15),
+            interval=relay_config.get("edit_interval", 3.0),
+            flush_lines=relay_config.get("flush_lines", 500)
+        )
+
+    def render(self) -> str:
+        """Discord message body: status line plus the log tail in a code block"""
+        elapsed = self.clock() - self._started
+        header = f"**{self.title}** · {self.status} · {elapsed:.0f}s · {self.lines} lines"
+        tail = [line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS - 1] + "…" for line in self.tail]
+        # Drop the oldest tail lines until the message fits
+        while tail and len(header) + sum(len(line) + 1 for line in tail) + 8 > MAX_MESSAGE_CHARS:
+            tail.pop(0)
+        if not tail:
+            return header
+        return header + "\n```\n" + "\n".join(tail) + "\n```"
+
+    async def _push(self) -> None:
+        """Edit the Discord message if its content changed"""
+        rendered = self.render()
+        if rendered == self._last_rendered:
+            return
+        try:
+            await self.edit(rendered)
+        except Exception as e:
+            # A failed edit (rate limit, deleted message) must not stop the build or the log file
+            self.logger.warning(f"⚠️ Failed to update build log message: {e}")
+            return
+        self._last_rendered = rendered
+        self.edits += 1
+
+    def _write(self, lines: List[str]) -> None:
+        """Append lines to the gzip log (blocking)"""
+        if self._file is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.log_path, "at", encoding="utf-8")
+        self._file.write("".join(line + "\n" for line in lines))
+
+    async def _flush(self) -> None:
+        """Move pending lines to the log file off the event loop"""
+        # The ticker and the consumer both flush; the lock keeps batches in order
+        async with self._file_lock:
+            if self._pending:
+                lines, self._pending = self._pending, []
+                await asyncio.to_thread(self._write, lines)
+
+    async def _tick(self) -> None:
+        """Edit the message and flush the log every interval"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._flush()
+            await self._push()
+
+    async def relay(self, lines: AsyncIterable[str]) -> None:
+        """Consume a build log until it ends; memory stays bounded by tail_lines and flush_lines"""
+        await self._push()
+        ticker = asyncio.create_task(self._tick(), name="build-log-relay")
+        try:
+            async for line in lines:
+                self.lines += 1
+                self.tail.append(line)
+                self._pending.append(line)
+                if len(self._pending) >= self.flush_lines:
+                    await self._flush()
+        finally:
+            ticker.cancel()
+            await asyncio.gather(ticker, return_exceptions=True)
+            await self._flush()
+
+    async def finish(self, status: str) -> None:
+        """Show the final status and close the log file"""
+        self.status = status
+        await self._push()
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+            self.logger.info(f"📬 Build log for {self.title} saved to {self.log_path}")
+
+    async def follow(self, builder, request: BuildRequest) -> BuildResult:
+        """Run a build on builder while relaying its output"""
+        log = BuildLog()
+        relaying = asyncio.create_task(self.relay(log))
+        try:
+            result = await builder.build(request, log=log)
+        except BuildQueueFull:
+            await relaying
+            await self.finish("⏳ Build queue is full, try again later")
+            raise
+        except BuildTimeout:
+            await relaying
+            await self.finish("⏱️ Timed out")
+            raise
+        except BuildError:
+            await relaying
+            await self.finish("❌ Failed")
+            raise
+        except BaseException:
+            relaying.cancel()
+            await asyncio.gather(relaying, return_exceptions=True)
+            await self.finish("⚠️ Cancelled")
+            raise
+
+        await relaying
+        await self.finish(f"✅ Built in {result.duration:.0f}s, {result.cache_ratio:.0%} cached")
+        return result
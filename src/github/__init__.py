@@ -0,0 +1,19 @@
+"""
+GitHub Integration for OpenClaw AI Agent
+
+Imported lazily so the agent does not load aiohttp until GitHub is used.
+"""
+
+from src.core.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "GitHubClient": ".client",
+    "GitHubError": ".client",
+    "GitHubRateLimited": ".client",
+    "GitHubResponse": ".client",
+    "Checkout": ".repo_cache",
+    "RepoCache": ".repo_cache",
+    "RepoCacheError": ".repo_cache",
+    "WebhookEvent": ".webhooks",
+    "WebhookProcessor": ".webhooks",
+})
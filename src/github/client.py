@@ -0,0 +1,356 @@
+"""
+GitHub API Client for OpenClaw AI Agent
+
+Async REST client that revalidates cached responses with ETags and paces requests against the rate limit.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from src.core.lazy import lazy_import
+from src.core.resilience import parse_retry_after
+
+aiohttp = lazy_import("aiohttp")
+
+
+DEFAULT_BASE_URL = "https://api.github.com"
+
+API_VERSION = "2022-11-28"
+
+
+class GitHubError(Exception):
+    """Raised for GitHub API error responses"""
+
+    def __init__(self, status: int, message: str, url: str = ""):
+        super().__init__(f"GitHub API {status}: {message}" + (f" ({url})" if url else ""))
+        self.status = status
+        self.message = message
+        self.url = url
+
+
+class GitHubRateLimited(GitHubError):
+    """Raised when the rate limit would make us wait longer than max_rate_limit_wait"""
+
+    def __init__(self, retry_after: float, url: str = ""):
+        super().__init__(403, f"rate limited for {retry_after:.0f}s", url)
+        self.retry_after = retry_after
+
+
+@dataclass
+class GitHubResponse:
+    """Decoded response; from_cache is set when GitHub answered 304 Not Modified"""
+    status: int
+    data: Any
+    headers: Mapping[str, str]
+    links: Dict[str, str]
+    from_cache: bool = False
+
+
+@dataclass
+class RateLimitState:
+    """Last known quota for one rate limit resource (core, search, ...)"""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset: Optional[float] = None
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Take the quota from X-RateLimit-* response headers"""
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+        self.remaining = int(headers["X-RateLimit-Remaining"])
+        self.reset = float(headers.get("X-RateLimit-Reset", self.reset or 0))
+
+    def delay(self, now: float, reserve: int, pace_below: int) -> float:
+        """Seconds to wait before the next request
+
+        Below pace_below the remaining quota is spread evenly until the reset;
+        at or below reserve nothing is sent until the reset.
+        """
+        if self.remaining is None or self.reset is None or now >= self.reset:
+            return 0.0
+        window = self.reset - now
+        if self.remaining <= reserve:
+            return window
+        if self.remaining < pace_below:
+            return window / (self.remaining - reserve)
+        return 0.0
+
+
+@dataclass
+class _CachedResponse:
+    """Validators and body of a cached GET"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    data: Any
+    links: Dict[str, str]
+
+
+def rate_limit_resource(path: str) -> str:
+    """Rate limit bucket GitHub charges a path to"""
+    if path.startswith("/search/"):
+        return "search"
+    if path.startswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+def page_number(url: Optional[str]) -> Optional[int]:
+    """page= query parameter of a pagination link"""
+    if not url:
+        return None
+    values = parse_qs(urlparse(url).query).get("page")
+    return int(values[0]) if values else None
+
+
+class GitHubClient:
+    """Async GitHub REST client with conditional requests and rate-limit-aware scheduling"""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        max_concurrency: int = 8,
+        cache_entries: int = 1024,
+        rate_limit_reserve: int = 50,
+        pace_below: int = 500,
+        max_rate_limit_wait: float = 900.0,
+        max_retries: int = 2,
+        timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.cache_entries = cache_entries
+        self.rate_limit_reserve = rate_limit_reserve
+        self.pace_below = pace_below
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.logger = logging.getLogger(__name__)
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self.rate_limits: Dict[str, RateLimitState] = {}
+        self._cache: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._schedule_lock = asyncio.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "rate_limit_waits": 0, "rate_limit_wait_seconds": 0.0}
+
+    @classmethod
+    def from_config(cls, github_config: Dict[str, Any], token: Optional[str] = None) -> "GitHubClient":
+        """Build a client from the github config section"""
+        api_config = github_config.get("api", {})
+        return cls(
+            token=token or api_config.get("token"),
+            base_url=api_config.get("base_url", DEFAULT_BASE_URL),
+            max_concurrency=api_config.get("max_concurrency", 8),
+            cache_entries=api_config.get("cache_entries", 1024),
+            rate_limit_reserve=api_config.get("rate_limit_reserve", 50),
+            pace_below=api_config.get("pace_below", 500),
+            max_rate_limit_wait=api_config.get("max_rate_limit_wait", 900.0),
+            max_retries=api_config.get("max_retries", 2),
+            timeout=api_config.get("timeout", 30.0)
+        )
+
+    async def start(self) -> None:
+        """Open the HTTP session"""
+        if self.session is None:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": API_VERSION,
+                "User-Agent": "OpenClaw-AI-Agent",
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self.session = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit_per_host=self.max_concurrency)
+            )
+
+    async def close(self) -> None:
+        """Close the HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "GitHubClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _url(self, path: str) -> str:
+        """Absolute URL for an API path (absolute URLs, e.g. from Link headers, pass through)"""
+        return path if path.startswith("http") else f"{self.base_url}{path}"
+
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        """Cache key for a GET with its query parameters"""
+        if not params:
+            return url
+        return f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()))}"
+
+    async def _wait_for_quota(self, resource: str, url: str) -> None:
+        """Hold the request until the rate limit allows it, reserving one request of quota"""
+        async with self._schedule_lock:
+            state = self.rate_limits.setdefault(resource, RateLimitState())
+            delay = state.delay(self.clock(), self.rate_limit_reserve, self.pace_below)
+            if delay > self.max_rate_limit_wait:
+                raise GitHubRateLimited(delay, url)
+            if delay > 0:
+                self.stats["rate_limit_waits"] += 1
+                self.stats["rate_limit_wait_seconds"] += delay
+                self.logger.warning(f"⚠️ GitHub {resource} quota at {state.remaining}, waiting {delay:.1f}s")
+                await self.sleep(delay)
+                if state.reset is not None and self.clock() >= state.reset:
+                    state.remaining = state.limit
+            if state.remaining is not None and state.remaining > 0:
+                state.remaining -= 1
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None
+    ) -> GitHubResponse:
+        """Send a request, revalidating cached GETs and waiting out rate limits"""
+        if self.session is None:
+            await self.start()
+
+        url = self._url(path)
+        resource = rate_limit_resource(urlparse(url).path)
+        cache_key = self._cache_key(url, params) if method == "GET" else None
+        cached = self._cache.get(cache_key) if cache_key else None
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        attempt = 0
+        while True:
+            await self._wait_for_quota(resource, url)
+            async with self._concurrency:
+                self.stats["requests"] += 1
+                async with self.session.request(method, url, params=params, json=json, headers=headers) as response:
+                    self.rate_limits[resource].update(response.headers)
+                    links = {rel: str(link["url"]) for rel, link in response.links.items()}
+
+                    if response.status == 304 and cached is not None:
+                        # Free against the rate limit; serve the body we already have
+                        self.stats["not_modified"] += 1
+                        self._cache.move_to_end(cache_key)
+                        return GitHubResponse(304, cached.data, response.headers, cached.links, from_cache=True)
+
+                    retry_after = self._rate_limit_retry_after(response)
+                    if retry_after is not None and attempt < self.max_retries:
+                        if retry_after > self.max_rate_limit_wait:
+                            raise GitHubRateLimited(retry_after, url)
+                        self.logger.warning(f"⚠️ GitHub rate limited {method} {path}, retrying in {retry_after:.1f}s")
+                    else:
+                        data = await response.json(content_type=None) if response.status != 204 else None
+                        if response.status >= 400:
+                            message = data.get("message", "") if isinstance(data, dict) else str(data)
+                            raise GitHubError(response.status, message, url)
+                        if cache_key and ("ETag" in response.headers or "Last-Modified" in response.headers):
+                            self._store(cache_key, _CachedResponse(
+                                response.headers.get("ETag"), response.headers.get("Last-Modified"), data, links
+                            ))
+                        return GitHubResponse(response.status, data, response.headers, links)
+
+            attempt += 1
+            self.stats["rate_limit_waits"] += 1
+            self.stats["rate_limit_wait_seconds"] += retry_after
+            await self.sleep(retry_after)
+
+    def _rate_limit_retry_after(self, response) -> Optional[float]:
+        """Seconds to wait if the response is a primary or secondary rate limit rejection"""
+        if response.status not in (403, 429):
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"), self.clock())
+        if retry_after is not None:
+            return retry_after
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset", 0))
+            return max(1.0, reset - self.clock())
+        if response.status == 429:
+            return 60.0
+        return None
+
+    def _store(self, key: str, entry: _CachedResponse) -> None:
+        """Remember a response's validators, evicting the least recently used entry"""
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a resource and return its decoded JSON"""
+        return (await self.request("GET", path, params=params)).data
+
+    async def paginate(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        max_pages: Optional[int] = None
+    ) -> List[Any]:
+        """Fetch every page of a list endpoint, requesting pages after the first concurrently"""
+        params = dict(params or {}, per_page=per_page)
+        first = await self.request("GET", path, params=dict(params, page=1))
+        items = list(self._page_items(first.data))
+
+        last = page_number(first.links.get("last"))
+        if last is None:
+            # No last link (e.g. cursor pagination): follow next links one by one
+            next_url, pages = first.links.get("next"), 1
+            while next_url and (max_pages is None or pages < max_pages):
+                response = await self.request("GET", next_url)
+                items.extend(self._page_items(response.data))
+                next_url, pages = response.links.get("next"), pages + 1
+            return items
+
+        if max_pages is not None:
+            last = min(last, max_pages)
+        responses = await asyncio.gather(*[
+            self.request("GET", path, params=dict(params, page=page)) for page in range(2, last + 1)
+        ])
+        for response in responses:
+            items.extend(self._page_items(response.data))
+        return items
+
+    @staticmethod
+    def _page_items(data: Any) -> List[Any]:
+        """Items of one page; search endpoints wrap them in {"items": [...]}"""
+        if isinstance(data, dict):
+            return data.get("items", [])
+        return data or []
+
+    def get_rate_limit(self, resource: str = "core") -> Tuple[Optional[int], Optional[float]]:
+        """Last known (remaining, reset epoch) for a rate limit resource"""
+        state = self.rate_limits.get(resource, RateLimitState())
+        return state.remaining, state.reset
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request, cache and rate limit counters"""
+        return {
+            **self.stats,
+            "cache_entries": len(self._cache),
+            "rate_limits": {
+                resource: {"limit": s.limit, "remaining": s.remaining, "reset": s.reset}
+                for resource, s in self.rate_limits.items()
+            },
+        }
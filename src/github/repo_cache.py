@@ -0,0 +1,282 @@
+"""
+Repository Cache for OpenClaw GitHub Workspace
+
+Keeps one bare mirror per repository, hands out cheap worktree checkouts and evicts cold mirrors.
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+DEFAULT_URL_TEMPLATE = "https://github.com/{repo}.git"
+
+# Touched whenever a mirror is used, so LRU order survives restarts
+LAST_USED_MARKER = "openclaw-last-used"
+
+_REPO_NAME = re.compile(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$")
+
+
+class RepoCacheError(Exception):
+    """Raised when a git operation on the cache fails"""
+
+
+@dataclass
+class Checkout:
+    """A worktree of a cached mirror, checked out at one commit"""
+    repo: str
+    ref: str
+    commit: str
+    path: Path
+
+
+def directory_size(path: Path) -> int:
+    """Bytes used by the files under path"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class RepoCache:
+    """Bare mirrors under <root>/mirrors with per-task worktrees under <root>/worktrees"""
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 10 * 1024 ** 3,
+        workers: int = 4,
+        fetch_interval: float = 60.0,
+        url_template: str = DEFAULT_URL_TEMPLATE,
+        token: Optional[str] = None,
+        git: str = "git",
+        clock=time.time
+    ):
+        self.root = Path(root)
+        self.mirrors_dir = self.root / "mirrors"
+        self.worktrees_dir = self.root / "worktrees"
+        self.max_bytes = max_bytes
+        self.fetch_interval = fetch_interval
+        self.url_template = url_template
+        self.token = token
+        self.git = git
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="repo-cache")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._active: Dict[str, int] = {}
+        # Mirror sizes and last use, kept current on clone/fetch so eviction needs no directory walk;
+        # None until the first eviction reads what an earlier run left on disk
+        self._sizes: Optional[Dict[str, int]] = None
+        self._last_used: Dict[str, float] = {}
+        # Live worktrees count against max_bytes too; each is measured once when checked out
+        self._checkout_bytes: Dict[Path, int] = {}
+        self.stats = {"clones": 0, "fetches": 0, "fetch_skipped": 0, "checkouts": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any], root: str, token: Optional[str] = None) -> "RepoCache":
+        """Build a cache from the github.repo_cache config section"""
+        return cls(
+            root=root,
+            max_bytes=cache_config.get("max_bytes", 10 * 1024 ** 3),
+            workers=cache_config.get("workers", 4),
+            fetch_interval=cache_config.get("fetch_interval", 60.0),
+            url_template=cache_config.get("url_template", DEFAULT_URL_TEMPLATE),
+            token=token
+        )
+
+    def mirror_path(self, repo: str) -> Path:
+        """Where the bare mirror of owner/name lives"""
+        if not _REPO_NAME.match(repo) or ".." in repo:
+            raise RepoCacheError(f"Invalid repository name: {repo!r}")
+        return self.mirrors_dir / f"{repo}.git"
+
+    def _git_env(self) -> Dict[str, str]:
+        """git environment, authenticating over HTTPS without putting the token on disk or in argv"""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if self.token:
+            # GIT_CONFIG_* is invisible to ps, unlike "-c http.extraHeader=..."
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            index = int(env.get("GIT_CONFIG_COUNT", "0"))
+            env[f"GIT_CONFIG_KEY_{index}"] = "http.extraHeader"
+            env[f"GIT_CONFIG_VALUE_{index}"] = f"Authorization: Basic {credentials}"
+            env["GIT_CONFIG_COUNT"] = str(index + 1)
+        return env
+
+    def _run_git(self, args: List[str], cwd: Optional[Path] = None) -> str:
+        """Run git and return stdout (blocking; called on the worker pool)"""
+        result = subprocess.run(
+            [self.git, *args], cwd=cwd, env=self._git_env(), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RepoCacheError(f"git {args[0]} failed: {result.stderr.strip()[-500:]}")
+        return result.stdout.strip()
+
+    async def _git(self, *args: str, cwd: Optional[Path] = None) -> str:
+        """Run git on the worker pool so the event loop never waits on it"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._run_git, list(args), cwd))
+
+    async def _offload(self, func, *args):
+        """Run blocking filesystem work on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+
+    def _lock(self, repo: str) -> asyncio.Lock:
+        """Serialises clone/fetch/worktree changes per mirror"""
+        return self._locks.setdefault(repo, asyncio.Lock())
+
+    def _touch(self, mirror: Path) -> None:
+        """Mark a mirror as recently used"""
+        (mirror / LAST_USED_MARKER).touch()
+
+    async def _measure(self, repo: str, mirror: Path) -> None:
+        """Record the size of one mirror after it changed"""
+        size = await self._offload(directory_size, mirror)
+        if self._sizes is not None:
+            self._sizes[repo] = size
+
+    async def ensure_mirror(self, repo: str, refresh: bool = False) -> Path:
+        """Clone the mirror on first use, otherwise fetch incrementally if it is stale"""
+        mirror = self.mirror_path(repo)
+        async with self._lock(repo):
+            if not await self._offload(mirror.exists):
+                # Clone next to the final path and rename, so a crash never leaves a half mirror
+                partial_path = mirror.with_name(f".{mirror.name}.{uuid.uuid4().hex}")
+                await self._offload(partial_path.parent.mkdir, 0o755, True, True)
+                try:
+                    await self._git("clone", "--mirror", "--quiet", self.url_template.format(repo=repo), str(partial_path))
+                    await self._offload(os.rename, partial_path, mirror)
+                finally:
+                    await self._offload(shutil.rmtree, partial_path, True)
+                self.stats["clones"] += 1
+                self._fetched_at[repo] = self.clock()
+                await self._measure(repo, mirror)
+                self.logger.info(f"✅ Mirrored {repo} into the repo cache")
+            elif refresh or self.clock() - self._fetched_at.get(repo, 0.0) >= self.fetch_interval:
+                await self._git("fetch", "--prune", "--quiet", "origin", cwd=mirror)
+                self.stats["fetches"] += 1
+                self._fetched_at[repo] = self.clock()
+                await self._measure(repo, mirror)
+            else:
+                self.stats["fetch_skipped"] += 1
+            await self._offload(self._touch, mirror)
+            self._last_used[repo] = self.clock()
+        return mirror
+
+    async def create_checkout(self, repo: str, ref: str = "HEAD") -> Checkout:
+        """Check out ref of repo into a fresh worktree sharing the mirror's objects"""
+        self._active[repo] = self._active.get(repo, 0) + 1
+        try:
+            mirror = await self.ensure_mirror(repo)
+            path = self.worktrees_dir / repo.replace("/", "__") / uuid.uuid4().hex
+            async with self._lock(repo):
+                await self._offload(path.parent.mkdir, 0o755, True, True)
+                await self._git("worktree", "add", "--detach", "--quiet", str(path), ref, cwd=mirror)
+            commit = await self._git("rev-parse", "HEAD", cwd=path)
+            self._checkout_bytes[path] = await self._offload(directory_size, path)
+        except BaseException:
+            self._active[repo] -= 1
+            raise
+
+        self.stats["checkouts"] += 1
+        await self.evict()
+        return Checkout(repo=repo, ref=ref, commit=commit, path=path)
+
+    async def remove_checkout(self, checkout: Checkout) -> None:
+        """Delete a worktree and let its mirror be evicted again"""
+        mirror = self.mirror_path(checkout.repo)
+        try:
+            async with self._lock(checkout.repo):
+                await self._git("worktree", "remove", "--force", str(checkout.path), cwd=mirror)
+        except RepoCacheError as e:
+            self.logger.warning(f"⚠️ Failed to remove worktree {checkout.path}: {e}")
+            await self._offload(shutil.rmtree, checkout.path, True)
+        finally:
+            self._checkout_bytes.pop(checkout.path, None)
+            self._active[checkout.repo] = max(0, self._active.get(checkout.repo, 0) - 1)
+
+    @asynccontextmanager
+    async def checkout(self, repo: str, ref: str = "HEAD") -> AsyncIterator[Checkout]:
+        """Worktree for the duration of a task"""
+        checkout = await self.create_checkout(repo, ref)
+        try:
+            yield checkout
+        finally:
+            await self.remove_checkout(checkout)
+
+    def _scan(self) -> List[Dict[str, Any]]:
+        """Every mirror with its size and last use (blocking)"""
+        mirrors = []
+        if not self.mirrors_dir.exists():
+            return mirrors
+        for mirror in self.mirrors_dir.glob("*/*.git"):
+            marker = mirror / LAST_USED_MARKER
+            last_used = marker.stat().st_mtime if marker.exists() else mirror.stat().st_mtime
+            repo = f"{mirror.parent.name}/{mirror.name[:-len('.git')]}"
+            mirrors.append({"repo": repo, "path": mirror, "bytes": directory_size(mirror), "last_used": last_used})
+        return mirrors
+
+    async def _load_sizes(self) -> Dict[str, int]:
+        """Sizes of every mirror, walking the cache directory only the first time"""
+        if self._sizes is None:
+            mirrors = await self._offload(self._scan)
+            self._sizes = {m["repo"]: m["bytes"] for m in mirrors}
+            self._last_used.update({m["repo"]: m["last_used"] for m in mirrors})
+        return self._sizes
+
+    async def evict(self) -> int:
+        """Remove the least recently used mirrors without checkouts until mirrors plus live checkouts fit max_bytes"""
+        sizes = await self._load_sizes()
+        total = sum(sizes.values()) + sum(self._checkout_bytes.values())
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for repo in sorted(sizes, key=lambda r: self._last_used.get(r, 0.0)):
+            if total <= self.max_bytes:
+                break
+            if self._active.get(repo) or self._lock(repo).locked():
+                continue
+            async with self._lock(repo):
+                await self._offload(shutil.rmtree, self.mirror_path(repo), True)
+            size = sizes.pop(repo)
+            self._last_used.pop(repo, None)
+            self._fetched_at.pop(repo, None)
+            total -= size
+            evicted += 1
+            self.stats["evictions"] += 1
+            self.logger.info(f"🧹 Evicted cold mirror {repo} ({size / 1024 ** 2:.1f} MiB)")
+        return evicted
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Cache size, mirror count and operation counters"""
+        sizes = await self._load_sizes()
+        return {
+            **self.stats,
+            "mirrors": len(sizes),
+            "bytes": sum(sizes.values()) + sum(self._checkout_bytes.values()),
+            "checkout_bytes": sum(self._checkout_bytes.values()),
+            "max_bytes": self.max_bytes,
+            "active_checkouts": sum(self._active.values()),
+        }
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,257 @@
+"""
+GitHub Webhook Ingestion for OpenClaw AI Agent
+
+Verifies and queues webhook deliveries, then dedupes, coalesces and dispatches them in batches.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from src.core.metrics import Metrics
+
+
+WebhookHandler = Callable[[List["WebhookEvent"]], Awaitable[None]]
+
+# Events about a pull request or issue are coalesced per (event type, repository, number)
+_COALESCED_EVENTS = {
+    "pull_request", "pull_request_review", "pull_request_review_comment", "pull_request_review_thread",
+    "issues", "issue_comment",
+}
+
+
+def sign(secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 value GitHub sends for body"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check X-Hub-Signature-256 in constant time"""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+@dataclass
+class WebhookEvent:
+    """One delivery, or several coalesced deliveries of one event type about the same PR/issue"""
+    delivery_id: str
+    event: str
+    body: bytes = field(repr=False)
+    received_at: float
+    payload: Dict[str, Any] = field(default_factory=dict, repr=False)
+    actions: List[str] = field(default_factory=list)
+    delivery_ids: List[str] = field(default_factory=list)
+
+    @property
+    def action(self) -> Optional[str]:
+        """Latest action (opened, synchronize, ...)"""
+        return self.payload.get("action")
+
+    @property
+    def repository(self) -> Optional[str]:
+        """owner/name of the repository the event is about"""
+        return (self.payload.get("repository") or {}).get("full_name")
+
+    @property
+    def number(self) -> Optional[int]:
+        """Pull request or issue number, if the event has one"""
+        for key in ("pull_request", "issue"):
+            if isinstance(self.payload.get(key), dict):
+                return self.payload[key].get("number")
+        return self.payload.get("number")
+
+    @property
+    def coalesce_key(self) -> Tuple[Any, ...]:
+        """Deliveries of the same event type about the same PR/issue within one batch are merged"""
+        # The event type is part of the key: merging a review into an "opened" pull_request
+        # would hide the PR event from pull_request subscribers
+        if self.number is not None and self.event in _COALESCED_EVENTS:
+            return (self.event, self.repository, self.number)
+        return ("delivery", self.delivery_id)
+
+
+class WebhookProcessor:
+    """Constant-time webhook intake backed by a batching background consumer"""
+
+    def __init__(
+        self,
+        secret: str,
+        max_queue: int = 1000,
+        batch_window: float = 1.0,
+        max_batch: int = 100,
+        dedupe_size: int = 10000,
+        metrics: Optional[Metrics] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not secret:
+            raise ValueError("A webhook secret is required")
+        self.secret = secret
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.dedupe_size = dedupe_size
+        self.metrics = metrics
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._handlers: Dict[str, List[WebhookHandler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "received": 0, "duplicates": 0, "invalid_signature": 0, "dropped": 0,
+            "coalesced": 0, "batches": 0, "dispatched": 0, "handler_errors": 0,
+        }
+
+    @classmethod
+    def from_config(cls, webhook_config: Dict[str, Any], metrics: Optional[Metrics] = None) -> "WebhookProcessor":
+        """Build a processor from the github.webhooks config section"""
+        return cls(
+            secret=webhook_config.get("secret") or "",
+            max_queue=webhook_config.get("max_queue", 1000),
+            batch_window=webhook_config.get("batch_window", 1.0),
+            max_batch=webhook_config.get("max_batch", 100),
+            dedupe_size=webhook_config.get("dedupe_size", 10000),
+            metrics=metrics
+        )
+
+    def subscribe(self, event: str, handler: WebhookHandler) -> None:
+        """Receive batches of an event type ("*" for every event)"""
+        self._handlers.setdefault(event, []).append(handler)
+
+    def _count(self, outcome: str) -> None:
+        """Bump a stat and its exported counter"""
+        self.stats[outcome] += 1
+        if self.metrics is not None:
+            self.metrics.github_webhooks.labels(outcome=outcome).inc()
+
+    def accept(self, body: bytes, headers: Mapping[str, str]) -> Tuple[int, str]:
+        """Verify and enqueue a delivery without parsing it; returns (HTTP status, status text)"""
+        if not verify_signature(self.secret, body, headers.get("X-Hub-Signature-256")):
+            self._count("invalid_signature")
+            return 401, "invalid signature"
+
+        delivery_id = headers.get("X-GitHub-Delivery")
+        event = headers.get("X-GitHub-Event")
+        if not delivery_id or not event:
+            return 400, "missing delivery headers"
+
+        if delivery_id in self._seen:
+            # GitHub redelivery (manual or after a timeout); already handled or queued
+            self._seen.move_to_end(delivery_id)
+            self._count("duplicates")
+            return 200, "duplicate"
+
+        try:
+            self.queue.put_nowait(WebhookEvent(delivery_id, event, body, self.clock()))
+        except asyncio.QueueFull:
+            self._count("dropped")
+            return 503, "queue full"
+
+        self._seen[delivery_id] = None
+        if len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+        self._count("received")
+        return 202, "queued"
+
+    def start(self) -> None:
+        """Start the background consumer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume(), name="github-webhooks")
+            self.logger.info("✅ GitHub webhook consumer started")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Dispatch what is already queued, then stop the consumer"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"⚠️ Dropped {self.queue.qsize()} queued GitHub webhooks on shutdown")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _drain(self) -> None:
+        """Wait until every queued delivery has been dispatched"""
+        await self.queue.join()
+
+    async def _collect(self) -> List[WebhookEvent]:
+        """Wait for one delivery, then gather more for up to batch_window seconds"""
+        batch = [await self.queue.get()]
+        deadline = self.clock() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def coalesce(self, batch: List[WebhookEvent]) -> List[WebhookEvent]:
+        """Parse deliveries and merge same-type ones about the same PR/issue, keeping the latest payload"""
+        merged: "OrderedDict[Tuple[Any, ...], WebhookEvent]" = OrderedDict()
+        for event in batch:
+            try:
+                event.payload = json.loads(event.body)
+            except ValueError:
+                self.logger.warning(f"⚠️ Ignoring GitHub delivery {event.delivery_id} with invalid JSON")
+                continue
+
+            key = event.coalesce_key
+            earlier = merged.pop(key, None)
+            if earlier is not None:
+                self.stats["coalesced"] += 1
+                event.actions = earlier.actions
+                event.delivery_ids = earlier.delivery_ids
+            if event.action:
+                event.actions.append(event.action)
+            event.delivery_ids.append(event.delivery_id)
+            # Re-inserted so a merged event is dispatched at the position of its latest delivery
+            merged[key] = event
+        return list(merged.values())
+
+    async def _dispatch(self, events: List[WebhookEvent]) -> None:
+        """Hand each handler the batch of events it subscribed to"""
+        by_type: Dict[str, List[WebhookEvent]] = {}
+        for event in events:
+            by_type.setdefault(event.event, []).append(event)
+
+        calls = [
+            (handler, batch)
+            for event_type, batch in by_type.items()
+            for handler in self._handlers.get(event_type, [])
+        ]
+        calls += [(handler, events) for handler in self._handlers.get("*", [])]
+
+        results = await asyncio.gather(*(handler(batch) for handler, batch in calls), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.stats["handler_errors"] += 1
+                self.logger.error(f"❌ GitHub webhook handler failed: {result}")
+
+        self.stats["batches"] += 1
+        self.stats["dispatched"] += len(events)
+
+    async def _consume(self) -> None:
+        """Collect, coalesce and dispatch batches until cancelled"""
+        while True:
+            batch = await self._collect()
+            try:
+                await self._dispatch(self.coalesce(batch))
+            except Exception as e:
+                self.logger.error(f"❌ GitHub webhook batch failed: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Intake and dispatch counters"""
+        return {**self.stats, "queued": self.queue.qsize()}
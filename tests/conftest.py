@@ -8,8 +8,8 @@ import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Add project root to path for imports (src/ itself would shadow the discord/docker packages)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
 @pytest.fixture
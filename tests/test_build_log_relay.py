@@ -0,0 +1,184 @@
+"""
+Test relaying Docker build logs to a coalesced Discord message
+"""
+
+import asyncio
+import gzip
+import threading
+import time
+
+import pytest
+
+from src.docker.builder import BuildError, BuildLog, BuildRequest, DockerBuilder
+from src.docker.log_relay import MAX_MESSAGE_CHARS, BuildLogRelay
+
+
+async def lines_of(count, delay=0.0):
+    """Async build log of count numbered lines"""
+    for n in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        yield f"line {n}"
+
+
+class Editor:
+    """Records message edits"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, text):
+        self.messages.append(text)
+
+
+class ChattyAPI:
+    """docker API stub whose build prints many lines, optionally failing at the end"""
+
+    def __init__(self, lines, error=None):
+        self.lines = lines
+        self.error = error
+
+    def build(self, fileobj, **kwargs):
+        fileobj.read()
+        return self._stream()
+
+    def _stream(self):
+        yield {"stream": "Step 1/2 : FROM python:3.11-slim\n"}
+        for n in range(self.lines):
+            yield {"stream": f"output {n}\n"}
+        if self.error:
+            yield {"error": self.error}
+            return
+        yield {"stream": "Step 2/2 : RUN true\n"}
+        yield {"stream": " ---> Using cache\n"}
+        yield {"aux": {"ID": "sha256:abc"}}
+
+    def close(self):
+        pass
+
+
+class TestBuildLog:
+    """Test the thread-to-loop build log"""
+
+    @pytest.mark.asyncio
+    async def test_slow_reader_holds_the_writer_back(self):
+        """Unread lines stay under max_pending while the reader lags; none are lost"""
+        log = BuildLog(max_pending=5)
+        log.bind(asyncio.get_running_loop())
+
+        def produce():
+            for n in range(50):
+                log.write(f"line {n}")
+            log.close()
+
+        writer = threading.Thread(target=produce)
+        writer.start()
+        await asyncio.sleep(0.05)
+        assert log._queue.qsize() <= 5
+        assert writer.is_alive()
+
+        lines = []
+        async for line in log:
+            lines.append(line)
+            assert log._queue.qsize() <= 6
+        writer.join()
+
+        assert lines == [f"line {n}" for n in range(50)]
+        assert log.dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_stalled_reader_drops_and_counts(self):
+        """A reader that stops making room costs the worker one stall, then lines are dropped"""
+        log = BuildLog(max_pending=2, stall_timeout=0.05)
+        log.bind(asyncio.get_running_loop())
+
+        started = time.monotonic()
+        await asyncio.to_thread(lambda: [log.write(f"line {n}") for n in range(20)])
+
+        assert time.monotonic() - started < 1
+        assert log.dropped == 18
+
+    def test_writes_after_the_loop_closed_are_ignored(self):
+        """A build outliving its event loop does not crash the worker thread"""
+        loop = asyncio.new_event_loop()
+        log = BuildLog()
+        log.bind(loop)
+        loop.close()
+
+        log.write("late line")
+        log.close()
+        log.write("later line")
+
+
+class TestBuildLogRelay:
+    """Test BuildLogRelay"""
+
+    @pytest.mark.asyncio
+    async def test_long_log_spills_to_gzip_with_bounded_tail(self, tmp_path):
+        """Only the tail stays in memory; the whole log lands in the gzip file"""
+        editor = Editor()
+        relay = BuildLogRelay(editor, tmp_path / "build.log.gz", tail_lines=5, interval=60, flush_lines=100)
+
+        await relay.relay(lines_of(1050))
+        await relay.finish("✅ Done")
+
+        assert list(relay.tail) == [f"line {n}" for n in range(1045, 1050)]
+        assert relay._pending == []
+        with gzip.open(tmp_path / "build.log.gz", "rt") as f:
+            assert f.read().splitlines() == [f"line {n}" for n in range(1050)]
+        assert relay.edits == 2
+        assert "✅ Done" in editor.messages[-1]
+        assert "line 1049" in editor.messages[-1]
+
+    @pytest.mark.asyncio
+    async def test_edits_are_coalesced_to_the_interval(self, tmp_path):
+        """A chatty build produces one edit per interval, not one per line"""
+        editor = Editor()
+        relay = BuildLogRelay(editor, tmp_path / "build.log.gz", interval=0.05)
+
+        await relay.relay(lines_of(200, delay=0.001))
+        await relay.finish("✅ Done")
+
+        assert 2 < relay.edits < 20
+        assert relay.lines == 200
+
+    def test_render_fits_discord_limit(self, tmp_path):
+        """Long lines are shortened and old lines dropped to stay under the message limit"""
+        relay = BuildLogRelay(Editor(), tmp_path / "build.log.gz", tail_lines=50)
+        for n in range(50):
+            relay.tail.append(f"{n} " + "x" * 500)
+
+        rendered = relay.render()
+
+        assert len(rendered) <= MAX_MESSAGE_CHARS
+        assert rendered.rstrip("`\n").endswith("…")
+        assert "49 x" in rendered
+
+    @pytest.mark.asyncio
+    async def test_follow_build(self, tmp_path):
+        """follow relays a DockerBuilder build and reports its outcome"""
+        context = tmp_path / "app"
+        context.mkdir()
+        (context / "Dockerfile").write_text("FROM python:3.11-slim\n")
+
+        for api, expected in ((ChattyAPI(300), "✅ Built"), (ChattyAPI(300, error="no space left on device"), "❌ Failed")):
+            editor = Editor()
+            log_path = tmp_path / f"{time.monotonic_ns()}.log.gz"
+            relay = BuildLogRelay(editor, log_path, interval=60)
+            builder = DockerBuilder(lambda: api, cache_dir=str(tmp_path / "cache"))
+            try:
+                if expected == "❌ Failed":
+                    with pytest.raises(BuildError):
+                        await relay.follow(builder, BuildRequest(context, "octo/app:1"))
+                else:
+                    result = await relay.follow(builder, BuildRequest(context, "octo/app:1"))
+                    assert result.cache_ratio == 1.0
+            finally:
+                builder.close()
+
+            assert expected in editor.messages[-1]
+            with gzip.open(log_path, "rt") as f:
+                logged = f.read().splitlines()
+            assert logged[0] == "Step 1/2 : FROM python:3.11-slim"
+            assert len(logged) >= 301
+        assert logged[-1] == "no space left on device"
@@ -2,12 +2,18 @@
 Test Configuration Manager functionality
 """
 
+import asyncio
+import logging
 import pytest
 import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
+
+from pydantic import ValidationError
 
 from src.core.config_manager import ConfigManager
+from src.core.config_schema import parse_config
 
 
 class TestConfigManager:
@@ -198,4 +204,172 @@ llm:
         # Mock get_discord_token to return None
         config_manager.get_discord_token = lambda: None
         
-        assert config_manager.validate_config() is False
\ No newline at end of file
+        assert config_manager.validate_config() is False
+
+HOT_RELOAD_CONFIG = """
+application:
+  name: "Test App"
+llm:
+  base_url: "http://localhost:8001/v1"
+  model_name: "{model}"
+discord:
+  enabled: false
+"""
+
+
+class TestConfigHotReload:
+    """Test cached lookups, reload and change subscriptions"""
+    
+    def test_get_cache_invalidated_on_change(self):
+        """Cached lookups follow config swaps and set_nested_value"""
+        config_manager = ConfigManager()
+        config_manager.config = {"llm": {"model_name": "a"}}
+        assert config_manager.get("llm.model_name") == "a"
+        assert config_manager.get("llm.missing", "default") == "default"
+        
+        config_manager.set_nested_value("llm.model_name", "b")
+        assert config_manager.get("llm.model_name") == "b"
+        
+        config_manager.config = {"llm": {"model_name": "c", "missing": None}}
+        assert config_manager.get("llm.model_name") == "c"
+        assert config_manager.get("llm.missing", "default") is None
+    
+    @pytest.mark.asyncio
+    async def test_reload_swaps_and_notifies(self, tmp_path):
+        """A valid edit is swapped in and only changed sections notify"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-a"))
+        config_manager = ConfigManager(str(tmp_path))
+        await config_manager.load_config()
+        
+        llm_updates, app_updates = [], []
+        config_manager.subscribe("llm", llm_updates.append)
+        
+        async def on_application(value):
+            app_updates.append(value)
+        
+        config_manager.subscribe("application", on_application)
+        
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-b"))
+        assert await config_manager.reload() is True
+        
+        assert config_manager.get("llm.model_name") == "/model-b"
+        assert [u["model_name"] for u in llm_updates] == ["/model-b"]
+        assert app_updates == []
+    
+    @pytest.mark.asyncio
+    async def test_invalid_reload_keeps_current_config(self, tmp_path):
+        """A config that fails validation is rolled back without notifying"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-a"))
+        config_manager = ConfigManager(str(tmp_path))
+        await config_manager.load_config()
+        
+        updates = []
+        config_manager.subscribe("llm", updates.append)
+        
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model=""))
+        assert await config_manager.reload() is False
+        
+        config_file.write_text("llm: [unclosed")
+        assert await config_manager.reload() is False
+        
+        assert config_manager.get("llm.model_name") == "/model-a"
+        assert updates == []
+    
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self, tmp_path):
+        """Unsubscribed callbacks are not called"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-a"))
+        config_manager = ConfigManager(str(tmp_path))
+        await config_manager.load_config()
+        
+        updates = []
+        unsubscribe = config_manager.subscribe("llm", updates.append)
+        unsubscribe()
+        
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-b"))
+        assert await config_manager.reload() is True
+        assert updates == []
+    
+    @pytest.mark.asyncio
+    async def test_watcher_reloads_on_file_change(self, tmp_path):
+        """The mtime watcher picks up edits to config.yaml"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-a"))
+        config_manager = ConfigManager(str(tmp_path))
+        await config_manager.load_config()
+        
+        config_manager.start_watching(interval=0.01)
+        try:
+            config_file.write_text(HOT_RELOAD_CONFIG.format(model="/model-longer"))
+            for _ in range(200):
+                if config_manager.reloads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await config_manager.stop_watching()
+        
+        assert config_manager.reloads == 1
+        assert config_manager.get("llm.model_name") == "/model-longer"
+
+
+class TestConfigSchema:
+    """Test typed settings and cached validation"""
+    
+    def test_settings_are_typed_and_frozen(self, mock_config):
+        """The parsed settings expose typed sections and cannot be mutated"""
+        config_manager = ConfigManager()
+        config_manager.config = mock_config
+        
+        settings = config_manager.settings
+        assert settings.llm.max_tokens == 1000
+        assert settings.web.port == 8080
+        assert settings.docker["host"] == "tcp://dind:2376"
+        with pytest.raises(ValidationError):
+            settings.llm.max_tokens = 1
+        
+        assert config_manager.settings is settings
+    
+    def test_schema_errors_fail_validation(self, mock_config, caplog):
+        """Wrong types are reported with their dotted key"""
+        mock_config["llm"]["temperature"] = "hot"
+        config_manager = ConfigManager()
+        config_manager.config = mock_config
+        
+        with caplog.at_level(logging.ERROR):
+            assert config_manager.validate_config() is False
+        
+        assert config_manager.settings is None
+        assert "llm.temperature" in caplog.text
+    
+    def test_validation_cached_per_version(self, mock_config, caplog):
+        """Repeated validation of the same config neither re-parses nor re-logs"""
+        config_manager = ConfigManager()
+        config_manager.config = mock_config
+        
+        with caplog.at_level(logging.INFO), patch(
+            "src.core.config_manager.parse_config", wraps=parse_config
+        ) as parse:
+            for _ in range(5):
+                assert config_manager.validate_config() is True
+            assert parse.call_count == 1
+            assert caplog.text.count("validation passed") == 1
+            
+            config_manager.set_nested_value("llm.model_name", "")
+            assert config_manager.validate_config() is False
+            assert parse.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_load_config_parses_schema_once(self, tmp_path):
+        """Loading parses the schema in the loader thread, not again on first validation"""
+        (tmp_path / "config.yaml").write_text(HOT_RELOAD_CONFIG.format(model="/model"))
+        config_manager = ConfigManager(str(tmp_path))
+        
+        with patch("src.core.config_manager.parse_config", wraps=parse_config) as parse:
+            await config_manager.load_config()
+            assert config_manager.validate_config() is True
+            assert config_manager.settings.llm.model_name == "/model"
+        
+        assert parse.call_count == 1
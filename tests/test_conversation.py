@@ -0,0 +1,102 @@
+"""
+Test conversation context store
+"""
+
+import pytest
+
+from src.core.tokens import estimate_tokens
+from src.discord.chat.context import ConversationStore, SQLiteConversationBackend
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestConversationStore:
+    """Test ConversationStore class"""
+
+    @pytest.mark.asyncio
+    async def test_keeps_last_n_turns(self):
+        """Test the ring buffer drops the oldest turns"""
+        store = ConversationStore(max_turns=2)
+        key = ConversationStore.make_key(1, 2)
+
+        for i in range(3):
+            await store.add_turn(key, f"q{i}", f"a{i}")
+
+        turns = await store.get_turns(key)
+        assert [t.user for t in turns] == ["q1", "q2"]
+
+    @pytest.mark.asyncio
+    async def test_build_messages_orders_history(self):
+        """Test prompt layout is system, history, then the new message"""
+        store = ConversationStore()
+        await store.add_turn("k", "first question", "first answer")
+
+        messages = await store.build_messages("k", "follow up", system_message="sys")
+
+        assert [m.role for m in messages] == ["system", "user", "assistant", "user"]
+        assert messages[1].content == "first question"
+        assert messages[-1].content == "follow up"
+
+    @pytest.mark.asyncio
+    async def test_build_messages_respects_token_budget(self):
+        """Test older turns are dropped to stay within the budget"""
+        store = ConversationStore(token_budget=60)
+        await store.add_turn("k", "old " * 40, "old answer " * 10)
+        await store.add_turn("k", "recent", "recent answer")
+
+        messages = await store.build_messages("k", "now", system_message="sys")
+        total = sum(estimate_tokens(m.content) for m in messages)
+
+        assert [m.content for m in messages[1:-1]] == ["recent", "recent answer"]
+        assert total <= 60
+
+    @pytest.mark.asyncio
+    async def test_idle_conversations_expire(self):
+        """Test TTL eviction bounds memory"""
+        clock = FakeClock()
+        store = ConversationStore(ttl_seconds=60, clock=clock)
+        await store.add_turn("idle", "q", "a")
+        clock.now += 30
+        await store.add_turn("active", "q", "a")
+
+        clock.now += 40
+        assert store.sweep() == 1
+        assert await store.get_turns("idle") == []
+        assert len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_max_conversations_cap(self):
+        """Test least recently active conversations are dropped past the cap"""
+        store = ConversationStore(max_conversations=2)
+        for key in ("a", "b", "c"):
+            await store.add_turn(key, "q", "a")
+
+        assert len(store) == 2
+        assert await store.get_turns("a") == []
+
+    @pytest.mark.asyncio
+    async def test_persistence_survives_restart(self, tmp_path):
+        """Test context reloads from SQLite"""
+        path = str(tmp_path / "conversations.sqlite")
+        clock = FakeClock()
+
+        store = ConversationStore(max_turns=2, backend=SQLiteConversationBackend(path), clock=clock)
+        for i in range(3):
+            await store.add_turn("k", f"q{i}", f"a{i}")
+        await store.add_turn("other", "x", "y")
+        await store.clear("other")
+        store.close()
+
+        restarted = ConversationStore(max_turns=2, backend=SQLiteConversationBackend(path), clock=clock)
+        turns = await restarted.get_turns("k")
+        assert [t.user for t in turns] == ["q1", "q2"]
+        assert await restarted.get_turns("other") == []
+        restarted.close()
@@ -0,0 +1,228 @@
+"""
+Test the Docker build service against a stubbed Docker API
+"""
+
+import asyncio
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.docker.builder import (
+    BuildError, BuildQueueFull, BuildRequest, BuildTimeout, DockerBuilder, stream_context
+)
+
+
+def build_output(cached=0, steps=3, image_id="sha256:abc"):
+    """Decoded daemon output for a build of FROM plus steps-1 instructions"""
+    chunks = [{"stream": f"Step 1/{steps} : FROM python:3.11-slim\n"}, {"stream": " ---> 1234\n"}]
+    for n in range(2, steps + 1):
+        chunks.append({"stream": f"Step {n}/{steps} : RUN echo {n}\n"})
+        if n - 1 <= cached:
+            chunks.append({"stream": " ---> Using cache\n"})
+        chunks.append({"stream": " ---> 5678\n"})
+    chunks.append({"aux": {"ID": image_id}})
+    chunks.append({"stream": f"Successfully built {image_id[7:]}\n"})
+    return chunks
+
+
+class StubAPI:
+    """Stands in for docker.APIClient.build; records calls and replays scripted output"""
+
+    def __init__(self, outputs=None, delay=0.0):
+        self.outputs = list(outputs or [])
+        self.delay = delay
+        self.calls = []
+        self.contexts = []
+        self.running = 0
+        self.peak = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def build(self, fileobj, **kwargs):
+        self.calls.append(kwargs)
+        with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+            self.contexts.append({m.name: tar.extractfile(m).read() for m in tar if m.isfile()})
+        output = self.outputs.pop(0) if self.outputs else build_output()
+        return self._stream(output)
+
+    def _stream(self, output):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            for chunk in output:
+                time.sleep(self.delay)
+                yield chunk
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def close(self):
+        self.closed = True
+
+
+class StubRepoCache:
+    """Stands in for RepoCache.checkout, handing out a fixed directory"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @asynccontextmanager
+    async def checkout(self, repo, ref):
+        yield SimpleNamespace(path=self.path)
+
+
+def make_context(root: Path) -> Path:
+    """A small build context with a .dockerignore"""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "Dockerfile").write_text("FROM python:3.11-slim\nCOPY app.py .\n")
+    (root / "app.py").write_text("print('hi')\n")
+    (root / "secret.env").write_text("TOKEN=x\n")
+    (root / ".dockerignore").write_text("# local only\nsecret.env\n")
+    return root
+
+
+@asynccontextmanager
+async def builder_for(tmp_path, api, **options):
+    """DockerBuilder wired to a stub API"""
+    builder = DockerBuilder(lambda: api, cache_dir=str(tmp_path / "build-cache"), **options)
+    try:
+        yield builder
+    finally:
+        builder.close()
+
+
+class TestDockerBuilder:
+    """Test DockerBuilder"""
+
+    def test_context_stream_honours_dockerignore(self, tmp_path):
+        """The streamed tar holds the context minus ignored files"""
+        context = make_context(tmp_path / "app")
+
+        with stream_context(context) as stream:
+            data = stream.read()
+
+        names = tarfile.open(fileobj=io.BytesIO(data)).getnames()
+        assert sorted(names) == [".dockerignore", "Dockerfile", "app.py"]
+
+    def test_context_stream_without_dockerfile_leaks_nothing(self, tmp_path):
+        """A context that cannot be listed raises before any pipe or thread exists"""
+        context = tmp_path / "empty"
+        context.mkdir()
+        fds = len(os.listdir("/proc/self/fd"))
+        threads = threading.active_count()
+
+        with pytest.raises(BuildError):
+            stream_context(context, "Dockerfile")
+
+        assert len(os.listdir("/proc/self/fd")) == fds
+        assert threading.active_count() == threads
+
+    @pytest.mark.asyncio
+    async def test_build_reports_cache_hits_and_reuses_cache(self, tmp_path):
+        """Results count cached steps and later builds list the last image as a cache source"""
+        api = StubAPI([build_output(cached=0), build_output(cached=2, image_id="sha256:def")])
+        context = make_context(tmp_path / "app")
+
+        async with builder_for(tmp_path, api) as builder:
+            first = await builder.build(BuildRequest(context, "octo/app:1"))
+            second = await builder.build(BuildRequest(context, "octo/app:2"))
+            stats = builder.get_stats()
+
+        assert first.image_id == "sha256:abc"
+        assert (first.steps, first.cache_hits, first.cache_ratio) == (3, 0, 0.0)
+        assert (second.steps, second.cache_hits, second.cache_ratio) == (3, 2, 1.0)
+        assert api.contexts[0]["app.py"] == b"print('hi')\n"
+        assert "secret.env" not in api.contexts[0]
+
+        call = api.calls[1]
+        assert call["custom_context"] is True
+        assert call["cache_from"] == ["octo/app:1", "octo/app:2"]
+        assert call["buildargs"] == {}
+
+        manifest = json.loads((tmp_path / "build-cache" / "octo_app.json").read_text())
+        assert manifest["images"] == ["octo/app:2"]
+        assert stats["succeeded"] == 2
+        assert stats["cache_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_daemon_error_raises_build_error(self, tmp_path):
+        """An error message in the stream fails the build with the log tail attached"""
+        api = StubAPI([[{"stream": "Step 1/2 : FROM nope\n"}, {"error": "pull access denied for nope\n"}]])
+
+        async with builder_for(tmp_path, api) as builder:
+            with pytest.raises(BuildError) as excinfo:
+                await builder.build(BuildRequest(make_context(tmp_path / "app"), "octo/app:1"))
+            assert builder.get_stats()["failed"] == 1
+
+        assert str(excinfo.value) == "pull access denied for nope"
+        assert excinfo.value.logs == ["Step 1/2 : FROM nope"]
+
+    @pytest.mark.asyncio
+    async def test_build_timeout_enforced(self, tmp_path):
+        """A build still streaming after build_timeout is abandoned and counted"""
+        api = StubAPI(delay=0.05)
+
+        async with builder_for(tmp_path, api, build_timeout=0.1) as builder:
+            with pytest.raises(BuildTimeout):
+                await builder.build(BuildRequest(make_context(tmp_path / "app"), "octo/app:1"))
+            assert builder.get_stats()["timed_out"] == 1
+
+            await asyncio.sleep(0.2)
+            assert builder.running == 0
+        assert not (tmp_path / "build-cache" / "octo_app.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_build_holds_its_slot_until_the_worker_stops(self, tmp_path):
+        """A build stuck in a silent step keeps its slot, so max_parallel still holds"""
+        api = StubAPI([[{"stream": "Step 1/2 : FROM python:3.11-slim\n"}, {"stream": "Step 2/2 : RUN sleep\n"}]], delay=0.3)
+        context = make_context(tmp_path / "app")
+
+        async with builder_for(tmp_path, api, max_parallel=1, build_timeout=0.1) as builder:
+            with pytest.raises(BuildTimeout):
+                await builder.build(BuildRequest(context, "octo/app:1"))
+            assert builder.running == 1
+
+            builder.build_timeout = 5
+            api.delay = 0.0
+            result = await builder.build(BuildRequest(context, "octo/app:2"))
+
+        assert result.image_id == "sha256:abc"
+        assert api.peak == 1
+
+    @pytest.mark.asyncio
+    async def test_parallelism_and_queue_bounds(self, tmp_path):
+        """No more than max_parallel builds run and builds past max_queued are rejected"""
+        api = StubAPI(delay=0.01)
+        context = make_context(tmp_path / "app")
+
+        async with builder_for(tmp_path, api, max_parallel=2, max_queued=4) as builder:
+            builds = [asyncio.create_task(builder.build(BuildRequest(context, f"octo/app:{n}"))) for n in range(4)]
+            await asyncio.sleep(0)
+            with pytest.raises(BuildQueueFull):
+                await builder.build(BuildRequest(context, "octo/app:5"))
+            results = await asyncio.gather(*builds)
+
+        assert len(results) == 4
+        assert api.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_build_repo_cache_key(self, tmp_path):
+        """Repo builds share a cache per repo unless the caller names one"""
+        api = StubAPI()
+        repo_cache = StubRepoCache(make_context(tmp_path / "checkout"))
+
+        async with builder_for(tmp_path, api) as builder:
+            await builder.build_repo(repo_cache, "octo/app", "main", "octo/app:1")
+            await builder.build_repo(repo_cache, "octo/app", "main", "octo/app:2", cache_key="shared")
+
+        assert (tmp_path / "build-cache" / "octo_app.json").exists()
+        assert (tmp_path / "build-cache" / "shared.json").exists()
@@ -0,0 +1,191 @@
+"""
+Test the async GitHub client against a local fake GitHub server
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.github.client import GitHubClient, GitHubError, GitHubRateLimited, RateLimitState
+
+
+ISSUES = [{"number": n} for n in range(1, 251)]
+
+
+class FakeGitHub:
+    """Just enough of the GitHub REST API to exercise the client"""
+
+    def __init__(self):
+        self.remaining = 5000
+        self.reset = int(time.time()) + 3600
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttle_next = None
+        self.app = web.Application()
+        self.app.router.add_get("/repos/{owner}/{repo}", self.repo)
+        self.app.router.add_get("/repos/{owner}/{repo}/issues", self.issues)
+
+    def _headers(self, charged: bool = True):
+        if charged:
+            self.remaining -= 1
+        return {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+
+    async def repo(self, request):
+        self.requests.append(request)
+        if self.throttle_next:
+            status, headers = self.throttle_next
+            self.throttle_next = None
+            return web.json_response({"message": "slow down"}, status=status, headers=headers)
+        if request.match_info["repo"] == "missing":
+            return web.json_response({"message": "Not Found"}, status=404, headers=self._headers())
+        if request.headers.get("If-None-Match") == '"v1"':
+            # Conditional hits are not charged against the quota
+            return web.Response(status=304, headers={**self._headers(charged=False), "ETag": '"v1"'})
+        return web.json_response(
+            {"full_name": f"{request.match_info['owner']}/{request.match_info['repo']}"},
+            headers={**self._headers(), "ETag": '"v1"'}
+        )
+
+    async def issues(self, request):
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            per_page = int(request.query.get("per_page", 30))
+            page = int(request.query.get("page", 1))
+            last = (len(ISSUES) + per_page - 1) // per_page
+            base = str(request.url.with_query({"per_page": per_page}))
+            links = [f'<{base}&page={last}>; rel="last"'] if page < last else []
+            if page < last:
+                links.append(f'<{base}&page={page + 1}>; rel="next"')
+            headers = self._headers()
+            if links:
+                headers["Link"] = ", ".join(links)
+            return web.json_response(ISSUES[(page - 1) * per_page:page * per_page], headers=headers)
+        finally:
+            self.in_flight -= 1
+
+
+@asynccontextmanager
+async def serve_fake_github():
+    """Run a fake GitHub server for the duration of a test"""
+    fake = FakeGitHub()
+    async with TestServer(fake.app) as server:
+        fake.url = str(server.make_url("")).rstrip("/")
+        yield fake
+
+
+class RecordingSleep:
+    """Sleep stand-in that records delays instead of waiting"""
+
+    def __init__(self):
+        self.delays = []
+
+    async def __call__(self, delay):
+        self.delays.append(delay)
+
+
+class TestGitHubClient:
+    """Test GitHubClient"""
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation_served_from_cache(self):
+        """A repeated GET sends If-None-Match and serves the cached body on 304"""
+        async with serve_fake_github() as fake_github:
+            async with GitHubClient(token="t", base_url=fake_github.url) as client:
+                first = await client.request("GET", "/repos/octo/app")
+                second = await client.request("GET", "/repos/octo/app")
+
+            assert first.data == second.data == {"full_name": "octo/app"}
+            assert not first.from_cache and second.from_cache
+            assert fake_github.requests[1].headers["If-None-Match"] == '"v1"'
+            assert fake_github.requests[0].headers["Authorization"] == "Bearer t"
+            assert client.get_stats()["not_modified"] == 1
+            assert client.get_rate_limit()[0] == 4999
+
+    @pytest.mark.asyncio
+    async def test_paginate_fetches_remaining_pages_concurrently(self):
+        """Pages after the first are requested together and returned in order"""
+        async with serve_fake_github() as fake_github:
+            async with GitHubClient(base_url=fake_github.url) as client:
+                issues = await client.paginate("/repos/octo/app/issues", {"state": "open"}, per_page=50)
+
+            assert issues == ISSUES
+            assert len(fake_github.requests) == 5
+            assert fake_github.max_in_flight > 1
+            assert all(r.query["state"] == "open" for r in fake_github.requests)
+
+    @pytest.mark.asyncio
+    async def test_paginate_respects_max_pages(self):
+        """max_pages caps how many pages are fetched"""
+        async with serve_fake_github() as fake_github:
+            async with GitHubClient(base_url=fake_github.url) as client:
+                issues = await client.paginate("/repos/octo/app/issues", per_page=100, max_pages=2)
+
+            assert issues == ISSUES[:200]
+
+    @pytest.mark.asyncio
+    async def test_waits_for_reset_when_quota_exhausted(self):
+        """At the reserve the next request waits for the reset"""
+        async with serve_fake_github() as fake_github:
+            sleep = RecordingSleep()
+            fake_github.remaining = 11
+            async with GitHubClient(
+                base_url=fake_github.url, rate_limit_reserve=10, max_rate_limit_wait=3600, sleep=sleep
+            ) as client:
+                await client.get("/repos/octo/app")
+                await client.get("/repos/octo/other")
+
+            assert len(sleep.delays) == 1
+            assert 3500 < sleep.delays[0] <= 3600
+
+    @pytest.mark.asyncio
+    async def test_retries_secondary_rate_limit(self):
+        """A 403 with Retry-After is waited out and retried"""
+        async with serve_fake_github() as fake_github:
+            sleep = RecordingSleep()
+            fake_github.throttle_next = (403, {"Retry-After": "3"})
+            async with GitHubClient(base_url=fake_github.url, sleep=sleep) as client:
+                repo = await client.get("/repos/octo/app")
+
+            assert repo == {"full_name": "octo/app"}
+            assert sleep.delays == [3.0]
+            assert len(fake_github.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_long_rate_limit_raises(self):
+        """A wait longer than max_rate_limit_wait raises instead of stalling"""
+        async with serve_fake_github() as fake_github:
+            fake_github.throttle_next = (429, {"Retry-After": "7200"})
+            async with GitHubClient(base_url=fake_github.url, max_rate_limit_wait=60) as client:
+                with pytest.raises(GitHubRateLimited):
+                    await client.get("/repos/octo/app")
+
+    @pytest.mark.asyncio
+    async def test_error_response_raises(self):
+        """API errors carry the status and GitHub's message"""
+        async with serve_fake_github() as fake_github:
+            async with GitHubClient(base_url=fake_github.url) as client:
+                with pytest.raises(GitHubError) as exc_info:
+                    await client.get("/repos/octo/missing")
+
+            assert exc_info.value.status == 404
+            assert exc_info.value.message == "Not Found"
+
+    def test_rate_limit_pacing(self):
+        """Below pace_below the remaining quota is spread over the reset window"""
+        state = RateLimitState(limit=5000, remaining=110, reset=1100.0)
+
+        assert state.delay(now=1000.0, reserve=10, pace_below=500) == pytest.approx(1.0)
+        assert RateLimitState(limit=5000, remaining=4000, reset=1100.0).delay(1000.0, 10, 500) == 0.0
+        assert state.delay(now=1200.0, reserve=10, pace_below=500) == 0.0
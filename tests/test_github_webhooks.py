@@ -0,0 +1,169 @@
+"""
+Test GitHub webhook intake and batched processing
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.health import create_app
+from src.github.webhooks import WebhookProcessor, sign, verify_signature
+
+
+SECRET = "s3cret"
+
+
+def delivery(delivery_id, event="pull_request", action="opened", number=7, repo="octo/app"):
+    """Signed body and headers for a webhook delivery"""
+    payload = {"action": action, "repository": {"full_name": repo}}
+    if number is not None:
+        payload["pull_request" if event.startswith("pull_request") else "issue"] = {"number": number}
+    body = json.dumps(payload).encode()
+    headers = {
+        "X-Hub-Signature-256": sign(SECRET, body),
+        "X-GitHub-Delivery": delivery_id,
+        "X-GitHub-Event": event,
+    }
+    return body, headers
+
+
+class TestWebhookProcessor:
+    """Test WebhookProcessor"""
+
+    def test_signature_verification(self):
+        """Only bodies signed with the shared secret are accepted"""
+        body = b'{"zen": "Keep it logically awesome."}'
+
+        assert verify_signature(SECRET, body, sign(SECRET, body))
+        assert not verify_signature(SECRET, body, sign("other", body))
+        assert not verify_signature(SECRET, body + b" ", sign(SECRET, body))
+        assert not verify_signature(SECRET, body, None)
+
+    @pytest.mark.asyncio
+    async def test_accept_queues_and_dedupes(self):
+        """Valid deliveries are queued once; redeliveries and bad signatures are not"""
+        processor = WebhookProcessor(SECRET, max_queue=2)
+        body, headers = delivery("d1")
+
+        assert processor.accept(body, headers) == (202, "queued")
+        assert processor.accept(body, headers) == (200, "duplicate")
+        assert processor.accept(body, {**headers, "X-Hub-Signature-256": "sha256=0"})[0] == 401
+        assert processor.accept(body, {"X-Hub-Signature-256": headers["X-Hub-Signature-256"]})[0] == 400
+
+        processor.accept(*delivery("d2"))
+        assert processor.accept(*delivery("d3")) == (503, "queue full")
+
+        stats = processor.get_stats()
+        assert stats["received"] == 2
+        assert stats["duplicates"] == 1
+        assert stats["invalid_signature"] == 1
+        assert stats["dropped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bursts_coalesced_and_dispatched_in_batches(self):
+        """Events for the same PR within a batch window reach handlers once, with every action"""
+        processor = WebhookProcessor(SECRET, batch_window=0.05)
+        pull_requests, everything = [], []
+
+        async def on_pull_request(events):
+            pull_requests.append(events)
+
+        async def on_any(events):
+            everything.append(events)
+
+        processor.subscribe("pull_request", on_pull_request)
+        processor.subscribe("*", on_any)
+        processor.start()
+
+        processor.accept(*delivery("d1", action="opened"))
+        processor.accept(*delivery("d2", action="synchronize"))
+        processor.accept(*delivery("d3", event="issues", action="opened", number=3))
+        processor.accept(*delivery("d4", action="synchronize", number=8))
+        processor.accept(*delivery("d5", event="push", action=None, number=None))
+        processor.accept(*delivery("d6", action="closed"))
+        await processor.stop()
+
+        assert len(pull_requests) == 1
+        merged = {event.number: event for event in pull_requests[0]}
+        assert merged[7].actions == ["opened", "synchronize", "closed"]
+        assert merged[7].delivery_ids == ["d1", "d2", "d6"]
+        assert merged[7].action == "closed"
+        assert merged[8].actions == ["synchronize"]
+        assert [e.event for e in everything[0]] == ["issues", "pull_request", "push", "pull_request"]
+        assert processor.get_stats()["coalesced"] == 2
+        assert processor.get_stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mixed_event_types_for_one_pr_are_not_merged(self):
+        """A review after "opened" in one batch still reaches pull_request subscribers"""
+        processor = WebhookProcessor(SECRET, batch_window=0.05)
+        seen = {"pull_request": [], "pull_request_review": [], "issues": [], "issue_comment": []}
+
+        for event_type, events in seen.items():
+            async def handler(batch, events=events):
+                events.extend(batch)
+            processor.subscribe(event_type, handler)
+        processor.start()
+
+        processor.accept(*delivery("d1", action="opened"))
+        processor.accept(*delivery("d2", event="pull_request_review", action="submitted"))
+        processor.accept(*delivery("d3", event="issues", action="opened", number=3))
+        processor.accept(*delivery("d4", event="issue_comment", action="created", number=3))
+        processor.accept(*delivery("d5", event="pull_request_review", action="dismissed"))
+        await processor.stop()
+
+        assert [e.actions for e in seen["pull_request"]] == [["opened"]]
+        assert [e.actions for e in seen["pull_request_review"]] == [["submitted", "dismissed"]]
+        assert [e.delivery_id for e in seen["issues"]] == ["d3"]
+        assert [e.delivery_id for e in seen["issue_comment"]] == ["d4"]
+        assert processor.get_stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_do_not_stop_consumer(self):
+        """A failing handler is logged and later batches still dispatch"""
+        processor = WebhookProcessor(SECRET, batch_window=0.01)
+        seen = []
+
+        async def broken(events):
+            raise RuntimeError("boom")
+
+        async def working(events):
+            seen.extend(e.delivery_id for e in events)
+
+        processor.subscribe("pull_request", broken)
+        processor.subscribe("pull_request", working)
+        processor.start()
+
+        processor.accept(*delivery("d1"))
+        await asyncio.sleep(0.05)
+        processor.accept(*delivery("d2", number=9))
+        await processor.stop()
+
+        assert seen == ["d1", "d2"]
+        assert processor.get_stats()["handler_errors"] == 2
+
+
+class TestWebhookRoute:
+    """Test POST /github/webhook"""
+
+    def test_route_acks_and_queues(self, mock_config_manager):
+        """The route answers 202 without processing and rejects bad signatures"""
+        processor = WebhookProcessor(SECRET)
+        client = TestClient(create_app(mock_config_manager, webhooks=processor))
+        body, headers = delivery("d1")
+
+        response = client.post("/github/webhook", content=body, headers=headers)
+        assert response.status_code == 202
+        assert response.json() == {"status": "queued"}
+        assert processor.queue.qsize() == 1
+
+        response = client.post("/github/webhook", content=body, headers={**headers, "X-Hub-Signature-256": "sha256=bad"})
+        assert response.status_code == 401
+
+    def test_route_absent_without_processor(self, mock_config_manager):
+        """Webhooks are opt-in"""
+        client = TestClient(create_app(mock_config_manager))
+
+        assert client.post("/github/webhook", content=b"{}").status_code == 404
@@ -0,0 +1,152 @@
+"""
+Test health check service
+"""
+
+import asyncio
+import os
+import signal
+import socket
+
+import aiohttp
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.health import HealthChecker, HealthServer, create_app
+
+
+class TestHealthChecker:
+    """Test HealthChecker class"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_uses_cheap_probe(self, mock_config_manager, mock_llm_client):
+        """Test the monitor snapshot never runs a real generation"""
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+
+        snapshot = await checker.refresh()
+
+        mock_llm_client.health_check.assert_awaited_once_with(deep=False)
+        assert checker.get_cached_health() is snapshot
+        assert snapshot["services"]["vllm"]["status"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_simple_health_served_from_snapshot(self, mock_config_manager, mock_llm_client):
+        """Test /health reads the cached snapshot without probing"""
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+
+        assert (await checker.get_simple_health())["status"] == "starting"
+
+        snapshot = await checker.refresh()
+        mock_llm_client.health_check.reset_mock()
+
+        for _ in range(5):
+            health = await checker.get_simple_health()
+            assert health["status"] == snapshot["status"]
+            assert health["timestamp"] == snapshot["timestamp"]
+
+        mock_llm_client.health_check.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_deep_probe(self, mock_config_manager, mock_llm_client):
+        """Test deep health runs the full vLLM probe"""
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+
+        await checker.get_system_health(deep=True)
+
+        mock_llm_client.health_check.assert_awaited_once_with(deep=True)
+
+    @pytest.mark.asyncio
+    async def test_monitor_refreshes_periodically(self, mock_config_manager, mock_llm_client):
+        """Test the background monitor keeps the snapshot fresh"""
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+        checker.check_interval = 0.01
+
+        checker.start_monitor()
+        await asyncio.sleep(0.05)
+        await checker.stop_monitor()
+
+        assert mock_llm_client.health_check.await_count >= 2
+        assert checker.get_cached_health() is not None
+
+    def test_liveness_has_no_dependencies(self):
+        """Test liveness works without config or vLLM"""
+        checker = HealthChecker(None)
+
+        assert checker.get_liveness()["status"] == "alive"
+
+
+class TestHealthApp:
+    """Test health API endpoints"""
+
+    def test_endpoints(self, mock_config_manager, mock_llm_client):
+        """Test live, ready and deep endpoints"""
+        app = create_app(mock_config_manager, mock_llm_client)
+
+        with TestClient(app) as client:
+            assert client.get("/health/live").status_code == 200
+
+            detailed = client.get("/health/detailed").json()
+            assert detailed["services"]["vllm"]["status"] == "healthy"
+
+            snapshot = app.state.health_checker.get_cached_health()
+            assert client.get("/health").json()["status"] == snapshot["status"]
+            assert client.get("/health/ready").json()["status"] == snapshot["status"]
+
+            client.get("/health/deep")
+            mock_llm_client.health_check.assert_any_await(deep=True)
+
+    def test_shared_checker_and_stopping(self, mock_config_manager, mock_llm_client):
+        """Test the app uses a passed-in checker and fails readiness while stopping"""
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+        app = create_app(mock_config_manager, health_checker=checker)
+
+        with TestClient(app) as client:
+            assert app.state.health_checker is checker
+            checker.mark_stopping()
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "stopping"
+
+
+class TestHealthServer:
+    """Test the in-process uvicorn server"""
+
+    @pytest.mark.asyncio
+    async def test_serves_on_running_loop(self, mock_config_manager, mock_llm_client):
+        """Test start, a live request and graceful stop on the current event loop"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+        server = HealthServer(create_app(mock_config_manager, health_checker=checker), host="127.0.0.1", port=port)
+
+        assert await server.start()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/health/live") as response:
+                assert response.status == 200
+            await server.stop()
+
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await session.get(f"http://127.0.0.1:{port}/health/live")
+
+
+    @pytest.mark.asyncio
+    async def test_agent_signal_handlers_survive_start(self, mock_config_manager, mock_llm_client):
+        """Test SIGTERM still reaches the agent's handler while uvicorn is serving"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        loop = asyncio.get_running_loop()
+        received = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, received.set)
+        checker = HealthChecker(mock_config_manager, mock_llm_client)
+        server = HealthServer(create_app(mock_config_manager, health_checker=checker), host="127.0.0.1", port=port)
+        try:
+            assert await server.start()
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(received.wait(), timeout=1)
+            assert not server.server.should_exit
+        finally:
+            await server.stop()
+            loop.remove_signal_handler(signal.SIGTERM)
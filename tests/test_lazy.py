@@ -0,0 +1,92 @@
+"""
+Test lazy imports and import profiling
+"""
+
+import sys
+import types
+
+import pytest
+
+from src.core.lazy import (
+    LazyModule,
+    attach,
+    format_import_table,
+    get_lazy_load_times,
+    is_loaded,
+    lazy_import,
+    parse_importtime,
+)
+
+
+IMPORTTIME_SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2500 |     yaml.reader
+import time:      3000 |       5500 |   yaml
+import time:       400 |       5900 | src.core.config_manager
+"""
+
+
+class TestLazyImport:
+    """Test lazy_import and attach"""
+
+    def test_defers_import_until_attribute_access(self):
+        """Test the real module is imported on first attribute access"""
+        sys.modules.pop("colorsys", None)
+        module = lazy_import("colorsys")
+
+        assert isinstance(module, LazyModule)
+        assert not is_loaded(module)
+        assert "colorsys" not in sys.modules
+
+        assert module.rgb_to_hsv(1, 0, 0)[0] == 0
+        assert is_loaded(module)
+        assert "colorsys" in get_lazy_load_times()
+
+    def test_returns_already_imported_module(self):
+        """Test no proxy is created for modules that are already loaded"""
+        assert lazy_import("sys") is sys
+
+    def test_missing_module_fails_on_use(self):
+        """Test import errors surface at first use, not at declaration"""
+        module = lazy_import("openclaw_does_not_exist")
+
+        with pytest.raises(ModuleNotFoundError):
+            module.anything
+
+    def test_attach_exposes_package_attributes(self, monkeypatch):
+        """Test PEP 562 attributes resolve from their submodule on demand"""
+        package = types.ModuleType("fakepkg")
+        package.__path__ = []
+        submodule = types.ModuleType("fakepkg.client")
+        submodule.Client = object
+        monkeypatch.setitem(sys.modules, "fakepkg", package)
+        monkeypatch.setitem(sys.modules, "fakepkg.client", submodule)
+
+        getattr_, dir_, all_ = attach("fakepkg", {"Client": ".client"})
+
+        assert all_ == ["Client"]
+        assert getattr_("Client") is object
+        assert "Client" in dir_()
+        with pytest.raises(AttributeError):
+            getattr_("Missing")
+
+
+class TestImportProfile:
+    """Test -X importtime parsing and reporting"""
+
+    def test_parse_importtime(self):
+        """Test lines are parsed with nesting depth and the header is skipped"""
+        timings = parse_importtime(IMPORTTIME_SAMPLE)
+
+        assert [t.module for t in timings] == ["_io", "yaml.reader", "yaml", "src.core.config_manager"]
+        assert timings[1].depth == 2
+        assert timings[3].depth == 0
+        assert timings[3].cumulative_us == 5900
+
+    def test_format_import_table(self):
+        """Test the report aggregates self time per package"""
+        table = format_import_table(parse_importtime(IMPORTTIME_SAMPLE))
+
+        assert "Total import time: 5.5ms across 4 modules" in table
+        yaml_row = next(line for line in table.splitlines() if line.startswith("yaml "))
+        assert "5.0" in yaml_row
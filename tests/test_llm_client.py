@@ -2,11 +2,25 @@
 Test VLLM Client functionality
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 import aiohttp
 
-from src.core.llm_client import VLLMClient, ChatMessage
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core.llm_client import (
+    VLLMClient,
+    ChatMessage,
+    CompletionBatcher,
+    RequestScheduler,
+    SingleFlight,
+    SchedulerBusyError,
+    TimeoutSettings,
+)
+from src.core.metrics import Metrics
 
 
 class TestVLLMClient:
@@ -34,7 +48,7 @@ class TestVLLMClient:
     async def test_test_connection_success(self, mock_config_manager):
         """Test successful vLLM connection"""
         client = VLLMClient(mock_config_manager)
-        client.session = AsyncMock()
+        client.session = MagicMock()
         client.base_url = "http://localhost:8001/v1"
         
         # Mock successful response
@@ -54,7 +68,7 @@ class TestVLLMClient:
     async def test_test_connection_failure(self, mock_config_manager):
         """Test failed vLLM connection"""
         client = VLLMClient(mock_config_manager)
-        client.session = AsyncMock()
+        client.session = MagicMock()
         client.base_url = "http://localhost:8001/v1"
         
         # Mock failed response
@@ -70,7 +84,7 @@ class TestVLLMClient:
     async def test_get_completion_success(self, mock_config_manager):
         """Test successful completion request"""
         client = VLLMClient(mock_config_manager)
-        client.session = AsyncMock()
+        client.session = MagicMock()
         client.base_url = "http://localhost:8001/v1"
         client.model_name = "/model"
         client.max_tokens = 1000
@@ -101,6 +115,96 @@ class TestVLLMClient:
         assert json_data["max_tokens"] == 1000
         assert json_data["temperature"] == 0.7
     
+    @pytest.mark.asyncio
+    async def test_stream_completion_parses_sse(self, mock_config_manager):
+        """Test SSE chunks are yielded as content deltas"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.base_url = "http://localhost:8001/v1"
+        client.model_name = "/model"
+        
+        lines = [
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n',
+            b'\n',
+            b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n',
+            b': keep-alive\n',
+            b'data: {"choices": [{"delta": {"content": "lo"}}]}\n',
+            b'data: [DONE]\n',
+            b'data: {"choices": [{"delta": {"content": "ignored"}}]}\n',
+        ]
+        
+        async def iter_lines():
+            for line in lines:
+                yield line
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.content = iter_lines()
+        client.session.post.return_value.__aenter__.return_value = mock_response
+        
+        chunks = [chunk async for chunk in client.stream_completion([ChatMessage(role="user", content="Hi")])]
+        
+        assert chunks == ["Hel", "lo"]
+        assert client.session.post.call_args[1]["json"]["stream"] is True
+    
+    @pytest.mark.asyncio
+    async def test_stream_completion_reports_completion(self, mock_config_manager):
+        """Test on_complete fires only for streams that reach [DONE]"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        
+        def respond(lines):
+            async def iter_lines():
+                for line in lines:
+                    yield line
+            response = MagicMock()
+            response.status = 200
+            response.content = iter_lines()
+            client.session.post.return_value.__aenter__.return_value = response
+        
+        delta = b'data: {"choices": [{"delta": {"content": "partial"}}]}\n'
+        completed = []
+        
+        respond([delta])
+        chunks = [c async for c in client.stream_completion([ChatMessage(role="user", content="Hi")], on_complete=lambda: completed.append(1))]
+        assert chunks == ["partial"]
+        assert completed == []
+        
+        respond([delta, b'data: [DONE]\n'])
+        chunks = [c async for c in client.stream_completion([ChatMessage(role="user", content="Hi")], on_complete=lambda: completed.append(1))]
+        assert chunks == ["partial"]
+        assert completed == [1]
+    
+    @pytest.mark.asyncio
+    async def test_stream_completion_error_status(self, mock_config_manager):
+        """Test streaming yields nothing on a non-200 response"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        
+        mock_response = AsyncMock()
+        mock_response.status = 500
+        mock_response.text.return_value = "boom"
+        client.session.post.return_value.__aenter__.return_value = mock_response
+        
+        chunks = [chunk async for chunk in client.stream_completion([ChatMessage(role="user", content="Hi")])]
+        
+        assert chunks == []
+    
+    @pytest.mark.asyncio
+    async def test_get_completion_stream_flag_collects_chunks(self, mock_config_manager):
+        """Test stream=True on get_completion returns the joined stream"""
+        client = VLLMClient(mock_config_manager)
+        
+        async def fake_stream(messages, **kwargs):
+            for chunk in ["a", "b", "c"]:
+                yield chunk
+        
+        client.stream_completion = fake_stream
+        
+        result = await client.get_completion([ChatMessage(role="user", content="Hi")], stream=True)
+        
+        assert result == "abc"
+    
     @pytest.mark.asyncio
     async def test_chat_success(self, mock_config_manager):
         """Test chat interface"""
@@ -124,7 +228,7 @@ class TestVLLMClient:
     async def test_get_available_models(self, mock_config_manager):
         """Test getting available models"""
         client = VLLMClient(mock_config_manager)
-        client.session = AsyncMock()
+        client.session = MagicMock()
         client.base_url = "http://localhost:8001/v1"
         
         # Mock successful response
@@ -149,6 +253,7 @@ class TestVLLMClient:
     async def test_health_check(self, mock_config_manager):
         """Test health check functionality"""
         client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
         client.model_name = "/model"
         client.base_url = "http://localhost:8001/v1"
         
@@ -168,6 +273,7 @@ class TestVLLMClient:
     async def test_health_check_unhealthy(self, mock_config_manager):
         """Test health check when unhealthy"""
         client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
         client.model_name = "/model"
         client.base_url = "http://localhost:8001/v1"
         
@@ -195,4 +301,366 @@ class TestVLLMClient:
         message = ChatMessage(role="user", content="Hello world")
         
         assert message.role == "user"
-        assert message.content == "Hello world"
\ No newline at end of file
+        assert message.content == "Hello world"
+
+
+class TestRequestScheduler:
+    """Test RequestScheduler admission control"""
+    
+    @pytest.mark.asyncio
+    async def test_admits_up_to_max_in_flight(self):
+        """Test requests run immediately while slots are free"""
+        scheduler = RequestScheduler(max_in_flight=2)
+        
+        await scheduler.acquire()
+        await scheduler.acquire()
+        
+        assert scheduler.in_flight == 2
+        assert scheduler.queue_depth() == 0
+        
+        scheduler.release()
+        scheduler.release()
+        assert scheduler.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_sheds_load_when_lane_full(self):
+        """Test a full lane raises SchedulerBusyError immediately"""
+        scheduler = RequestScheduler(max_in_flight=1, queue_limits={"interactive": 1, "health": 0, "background": 0})
+        await scheduler.acquire()
+        
+        waiter = asyncio.create_task(scheduler.acquire("interactive"))
+        await asyncio.sleep(0)
+        
+        with pytest.raises(SchedulerBusyError):
+            await scheduler.acquire("interactive")
+        with pytest.raises(SchedulerBusyError):
+            await scheduler.acquire("background")
+        
+        stats = scheduler.get_stats()
+        assert stats["lanes"]["interactive"]["rejected"] == 1
+        assert stats["lanes"]["background"]["rejected"] == 1
+        assert stats["queue_depth"] == 1
+        
+        scheduler.release()
+        await waiter
+        assert scheduler.in_flight == 1
+    
+    @pytest.mark.asyncio
+    async def test_priority_order_on_release(self):
+        """Test interactive waiters are served before health and background"""
+        scheduler = RequestScheduler(max_in_flight=1)
+        await scheduler.acquire()
+        order = []
+        
+        async def worker(lane):
+            async with scheduler.slot(lane):
+                order.append(lane)
+        
+        tasks = [asyncio.create_task(worker(lane)) for lane in ("background", "health", "interactive")]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth() == 3
+        
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        
+        assert order == ["interactive", "health", "background"]
+        assert scheduler.in_flight == 0
+        assert scheduler.get_stats()["lanes"]["background"]["max_wait_seconds"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test cancelling a queued request frees its queue position"""
+        scheduler = RequestScheduler(max_in_flight=1)
+        await scheduler.acquire()
+        
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        
+        assert scheduler.queue_depth() == 0
+        scheduler.release()
+        assert scheduler.in_flight == 0
+    
+    def test_from_config_merges_lane_limits(self):
+        """Test config overrides are merged with default lane limits"""
+        scheduler = RequestScheduler.from_config({"max_in_flight": 8, "queue_limits": {"health": 5}})
+        
+        assert scheduler.max_in_flight == 8
+        assert scheduler.queue_limits["health"] == 5
+        assert scheduler.queue_limits["interactive"] == 32
+    
+    @pytest.mark.asyncio
+    async def test_get_completion_propagates_busy(self, mock_config_manager):
+        """Test a shed request surfaces as SchedulerBusyError instead of None"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.scheduler = RequestScheduler(max_in_flight=0, queue_limits={"interactive": 0})
+        
+        with pytest.raises(SchedulerBusyError):
+            await client.get_completion([ChatMessage(role="user", content="Hi")])
+
+
+
+class TestConnectionTuning:
+    """Test connection pooling and timeout settings"""
+    
+    def test_timeout_scales_with_max_tokens(self):
+        """Test the total budget grows with max_tokens up to the cap"""
+        timeouts = TimeoutSettings(connect=2, sock_read=20, total=10, per_token=0.1, max_total=100)
+        
+        short = timeouts.for_request(50)
+        assert short.total == 15
+        assert short.connect == 2
+        assert short.sock_read == 20
+        assert timeouts.for_request(5000).total == 100
+    
+    @pytest.mark.asyncio
+    async def test_initialize_configures_connector(self, mock_config_manager, mock_config):
+        """Test connector limits and timeouts come from config"""
+        mock_config["llm"]["connection"] = {"limit": 8, "limit_per_host": 4, "keepalive_timeout": 15}
+        mock_config["llm"]["timeouts"] = {"connect": 3}
+        client = VLLMClient(mock_config_manager)
+        
+        with patch("aiohttp.TCPConnector") as connector_class, patch("aiohttp.ClientSession") as session_class:
+            await client.initialize()
+        
+        connector_kwargs = connector_class.call_args[1]
+        assert connector_kwargs["limit"] == 8
+        assert connector_kwargs["limit_per_host"] == 4
+        assert connector_kwargs["keepalive_timeout"] == 15
+        assert connector_kwargs["use_dns_cache"] is True
+        assert session_class.call_args[1]["timeout"].connect == 3
+        assert client.get_pool_stats()["limit"] == 8
+    
+    def test_apply_config_updates_request_settings(self, mock_config_manager):
+        """Test a reloaded llm section changes model, sampling and timeouts live"""
+        client = VLLMClient(mock_config_manager)
+        client.base_url = "http://localhost:8001/v1"
+        
+        client.apply_config({
+            "base_url": "http://localhost:8001/v1",
+            "model_name": "/model-b",
+            "temperature": 0.2,
+            "timeouts": {"connect": 7},
+            "retry": {"max_attempts": 5},
+            "lane_models": {"batch": "/small"}
+        })
+        
+        assert client.model_name == "/model-b"
+        assert client.temperature == 0.2
+        assert client.max_tokens == 4000
+        assert client.timeouts.for_request().connect == 7
+        assert client.retry_policy.max_attempts == 5
+        assert client.lane_models == {"batch": "/small"}
+    
+    def test_apply_config_warns_only_when_endpoints_change(self, mock_config_manager, caplog):
+        """Test the restart warning fires for an edited endpoint list, not an unchanged one"""
+        client = VLLMClient(mock_config_manager)
+        client.base_url = "http://localhost:8001/v1"
+        client.endpoints_config = ["http://a/v1", "http://b/v1"]
+        
+        client.apply_config({"base_url": "http://localhost:8001/v1", "endpoints": ["http://a/v1", "http://b/v1"]})
+        assert "after a restart" not in caplog.text
+        
+        client.apply_config({"base_url": "http://localhost:8001/v1", "endpoints": ["http://a/v1"]})
+        assert "after a restart" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_pool_stats_track_connection_reuse(self, mock_config_manager):
+        """Test keep-alive reuse is visible in pool stats"""
+        async def completions(request):
+            return web.json_response({"choices": [{"message": {"content": "pong"}}]})
+        
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", completions)
+        
+        async with TestServer(app) as server:
+            client = VLLMClient(mock_config_manager)
+            await client.initialize()
+            client.base_url = str(server.make_url("/v1"))
+            try:
+                for _ in range(3):
+                    assert await client.chat("ping") == "pong"
+            finally:
+                await client.cleanup()
+        
+        stats = client.get_pool_stats()
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 2
+        assert stats["requests_in_flight"] == 0
+
+
+
+class TestCompletionBatcher:
+    """Test micro-batching of short prompts"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_prompts_share_one_call(self):
+        """Test prompts submitted within the window are sent together"""
+        sent = []
+        
+        async def send_batch(key, prompts):
+            sent.append(list(prompts))
+            return [p.upper() for p in prompts]
+        
+        batcher = CompletionBatcher(send_batch, max_batch_size=8, max_wait=0.01)
+        key = ("/model", 16, 0.0, "background")
+        
+        results = await asyncio.gather(*(batcher.submit(key, p) for p in ("a", "b", "c")))
+        
+        assert results == ["A", "B", "C"]
+        assert sent == [["a", "b", "c"]]
+        assert batcher.get_stats()["batched_requests"] == 3
+        assert batcher.get_stats()["batches"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_dispatches_immediately(self):
+        """Test reaching max_batch_size flushes without waiting"""
+        sent = []
+        
+        async def send_batch(key, prompts):
+            sent.append(len(prompts))
+            return list(prompts)
+        
+        batcher = CompletionBatcher(send_batch, max_batch_size=2, max_wait=10)
+        key = ("/model", 16, 0.0, "background")
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(key, str(i)) for i in range(4))),
+            timeout=1
+        )
+        
+        assert results == ["0", "1", "2", "3"]
+        assert sent == [2, 2]
+    
+    @pytest.mark.asyncio
+    async def test_different_parameters_are_not_mixed(self):
+        """Test prompts with different sampling settings go in separate batches"""
+        sent = []
+        
+        async def send_batch(key, prompts):
+            sent.append((key, list(prompts)))
+            return list(prompts)
+        
+        batcher = CompletionBatcher(send_batch, max_wait=0.01)
+        
+        await asyncio.gather(
+            batcher.submit(("/model", 16, 0.0, "background"), "x"),
+            batcher.submit(("/model", 32, 0.0, "background"), "y"),
+        )
+        
+        assert len(sent) == 2
+    
+    @pytest.mark.asyncio
+    async def test_client_complete_fans_out_choices_by_index(self, mock_config_manager):
+        """Test the /completions response is mapped back by choice index"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.batcher = CompletionBatcher(client._send_prompt_batch, max_wait=0.01)
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.json = AsyncMock(return_value={
+            "choices": [{"index": 1, "text": "second"}, {"index": 0, "text": "first"}]
+        })
+        client.session.post.return_value.__aenter__.return_value = mock_response
+        
+        results = await asyncio.gather(client.complete("one", max_tokens=8), client.complete("two", max_tokens=8))
+        
+        assert results == ["first", "second"]
+        assert client.session.post.call_count == 1
+        call = client.session.post.call_args
+        assert call[0][0].endswith("/completions")
+        assert call[1]["json"]["prompt"] == ["one", "two"]
+
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight requests"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_share_one_call(self):
+        """Test N identical concurrent calls run fn once"""
+        calls = 0
+        release = asyncio.Event()
+        
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "shared"
+        
+        flight = SingleFlight()
+        waiters = [asyncio.create_task(flight.do("k", fn)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        
+        assert await asyncio.gather(*waiters) == ["shared"] * 5
+        assert calls == 1
+        assert flight.get_stats() == {"calls": 1, "deduplicated": 4, "in_flight": 0}
+    
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_deduplicated(self):
+        """Test a finished call is not reused by later requests"""
+        flight = SingleFlight()
+        
+        async def fn():
+            return "x"
+        
+        await flight.do("k", fn)
+        await flight.do("k", fn)
+        
+        assert flight.calls == 2
+        assert flight.deduplicated == 0
+    
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_waiter(self):
+        """Test a failed leader call fails its duplicates too"""
+        flight = SingleFlight()
+        
+        async def fn():
+            await asyncio.sleep(0)
+            raise SchedulerBusyError("full")
+        
+        results = await asyncio.gather(flight.do("k", fn), flight.do("k", fn), return_exceptions=True)
+        
+        assert all(isinstance(r, SchedulerBusyError) for r in results)
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Test the remaining waiters still get the result when one gives up"""
+        flight = SingleFlight()
+        release = asyncio.Event()
+        
+        async def fn():
+            await release.wait()
+            return "done"
+        
+        first = asyncio.create_task(flight.do("k", fn))
+        second = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        
+        assert await second == "done"
+    
+    @pytest.mark.asyncio
+    async def test_client_deduplicates_identical_completions(self, mock_config_manager):
+        """Test identical concurrent get_completion calls send one request"""
+        client = VLLMClient(mock_config_manager, metrics=Metrics())
+        client.session = MagicMock()
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.json = AsyncMock(return_value={"choices": [{"message": {"content": "hi"}}]})
+        client.session.post.return_value.__aenter__.return_value = mock_response
+        
+        messages = [ChatMessage(role="user", content="hello")]
+        results = await asyncio.gather(*(client.get_completion(messages) for _ in range(3)))
+        
+        assert results == ["hi", "hi", "hi"]
+        assert client.session.post.call_count == 1
+        assert client.single_flight.deduplicated == 2
+        assert client.metrics.llm_deduplicated._value.get() == 2
@@ -0,0 +1,220 @@
+"""
+Test vLLM endpoint routing
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+
+from src.core.llm_client import VLLMClient, ChatMessage
+from src.core.llm_router import Endpoint, EndpointRouter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEndpointRouter:
+    """Test EndpointRouter class"""
+
+    def test_from_config(self):
+        """Test string and dict endpoint entries"""
+        router = EndpointRouter.from_config({
+            "endpoints": ["http://a/v1/", {"url": "http://b/v1", "models": ["big"]}],
+            "routing": {"strategy": "latency_ewma"}
+        })
+
+        assert [e.base_url for e in router.endpoints] == ["http://a/v1", "http://b/v1"]
+        assert router.endpoints[1].models == ["big"]
+        assert router.strategy == "latency_ewma"
+        assert EndpointRouter.from_config({"base_url": "http://a/v1"}) is None
+
+    def test_least_outstanding(self):
+        """Test requests go to the replica with the fewest in flight"""
+        router = EndpointRouter([Endpoint("http://a"), Endpoint("http://b")])
+
+        first = router.choose()
+        router.start(first)
+        second = router.choose()
+
+        assert first is not second
+        router.finish(first, True, 0.1)
+        assert first.outstanding == 0
+
+    def test_latency_ewma(self):
+        """Test the faster replica is preferred"""
+        router = EndpointRouter([Endpoint("http://slow"), Endpoint("http://fast")], strategy="latency_ewma")
+        slow, fast = router.endpoints
+        for endpoint, latency in ((slow, 2.0), (fast, 0.2)):
+            router.start(endpoint)
+            router.finish(endpoint, True, latency)
+
+        assert router.choose() is fast
+
+        router.start(fast)
+        router.finish(fast, True, 1.2)
+        assert fast.latency_ewma == pytest.approx(0.5)
+
+    def test_model_routing(self):
+        """Test replicas only receive models they serve"""
+        router = EndpointRouter([Endpoint("http://chat", models=["small"]), Endpoint("http://heavy", models=["big"])])
+
+        assert router.choose("big").base_url == "http://heavy"
+        assert router.choose("small").base_url == "http://chat"
+        with pytest.raises(ValueError):
+            router.choose("unknown")
+
+    def test_passive_ejection_and_readmission(self):
+        """Test failing replicas are ejected and come back after the window"""
+        clock = FakeClock()
+        router = EndpointRouter(
+            [Endpoint("http://a"), Endpoint("http://b")],
+            failure_threshold=2,
+            ejection_seconds=10,
+            clock=clock
+        )
+        bad, good = router.endpoints
+        for _ in range(2):
+            router.start(bad)
+            router.finish(bad, False)
+
+        assert all(router.choose() is good for _ in range(3))
+
+        clock.now = 10
+        router.start(good)
+        assert router.choose() is bad
+        router.finish(bad, True, 0.1)
+        assert bad.ejected_until is None
+
+    def test_all_ejected_picks_soonest(self):
+        """Test routing still returns a replica when all are ejected"""
+        clock = FakeClock()
+        router = EndpointRouter([Endpoint("http://a"), Endpoint("http://b")], failure_threshold=1, clock=clock)
+        a, b = router.endpoints
+        router.finish(b, False)
+        clock.now = 1
+        router.finish(a, False)
+
+        assert router.choose() is b
+
+
+class TestVLLMClientRouting:
+    """Test routing integration in VLLMClient"""
+
+    @pytest.mark.asyncio
+    async def test_retry_moves_to_another_replica(self, mock_config_manager):
+        """Test a connection failure is retried on a different endpoint"""
+        client = VLLMClient(mock_config_manager)
+        client.router = EndpointRouter([Endpoint("http://a/v1"), Endpoint("http://b/v1")])
+        client.session = MagicMock()
+
+        ok = MagicMock()
+        ok.status = 200
+        ok.json = AsyncMock(return_value={"choices": [{"message": {"content": "ok"}}]})
+        client.session.post.return_value.__aenter__.side_effect = [aiohttp.ClientConnectionError("down"), ok]
+
+        with patch("src.core.llm_client.asyncio.sleep", new=AsyncMock()):
+            result = await client.get_completion([ChatMessage(role="user", content="Hi")])
+
+        urls = [call[0][0] for call in client.session.post.call_args_list]
+        assert result == "ok"
+        assert urls == ["http://a/v1/chat/completions", "http://b/v1/chat/completions"]
+        assert client.router.endpoints[0].failures == 1
+        assert all(e.outstanding == 0 for e in client.router.endpoints)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_requests_do_not_eject_replicas(self, mock_config_manager):
+        """Test caller cancellations before a response are not counted as replica failures"""
+        async def hang(*args):
+            await asyncio.Event().wait()
+
+        client = VLLMClient(mock_config_manager)
+        client.router = EndpointRouter([Endpoint("http://a/v1")], failure_threshold=1)
+        client.session = MagicMock()
+        client.session.post.return_value.__aenter__.side_effect = hang
+        client.single_flight = None
+
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.get_completion([ChatMessage(role="user", content="Hi")]), timeout=0.02)
+
+        endpoint = client.router.endpoints[0]
+        assert endpoint.failures == 0
+        assert endpoint.outstanding == 0
+        assert endpoint.ejected_until is None
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_on_one_replica_spares_the_others(self, mock_config_manager):
+        """Test each replica has its own breaker and an open one only removes that replica"""
+        client = VLLMClient(mock_config_manager)
+        client.breaker_config = {"failure_threshold": 1}
+        client.router = EndpointRouter([Endpoint("http://a/v1"), Endpoint("http://b/v1")], failure_threshold=5)
+        client.session = MagicMock()
+
+        ok = MagicMock()
+        ok.status = 200
+        ok.json = AsyncMock(return_value={"choices": [{"message": {"content": "ok"}}]})
+        client.session.post.return_value.__aenter__.side_effect = [aiohttp.ClientConnectionError("down"), ok, ok, ok]
+
+        with patch("src.core.llm_client.asyncio.sleep", new=AsyncMock()):
+            for _ in range(3):
+                assert await client.get_completion([ChatMessage(role="user", content="Hi")]) == "ok"
+
+        a, b = client.router.endpoints
+        urls = [call[0][0] for call in client.session.post.call_args_list]
+        assert a.breaker.state == "open"
+        assert b.breaker.state == "closed"
+        assert urls[1:] == ["http://b/v1/chat/completions"] * 3
+        assert client.circuit_breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_probes_go_to_the_replicas(self, mock_config_manager):
+        """Test connection and health probes ask every replica, not base_url, and pass if one answers"""
+        client = VLLMClient(mock_config_manager)
+        client.base_url = "http://unused/v1"
+        client.router = EndpointRouter([Endpoint("http://a/v1"), Endpoint("http://b/v1")])
+        client.session = MagicMock()
+
+        def models_from(url):
+            if url.startswith("http://a/"):
+                raise aiohttp.ClientConnectionError("down")
+            response = MagicMock()
+            response.status = 200
+            response.json = AsyncMock(return_value={"data": [{"id": "/model"}]})
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=False)
+            return context
+
+        client.session.get.side_effect = models_from
+
+        assert await client.test_connection()
+        assert await client.get_available_models() == ["/model"]
+        health = await client.health_check(deep=False)
+
+        urls = {call[0][0] for call in client.session.get.call_args_list}
+        assert urls == {"http://a/v1/models", "http://b/v1/models"}
+        assert health["status"] == "healthy"
+        assert health["base_url"] is None
+        assert health["circuit_breaker"] is None
+        assert [e["base_url"] for e in health["endpoints"]] == ["http://a/v1", "http://b/v1"]
+
+    def test_lane_models(self, mock_config_manager):
+        """Test per-lane model overrides"""
+        client = VLLMClient(mock_config_manager)
+        client.model_name = "/model"
+        client.lane_models = {"background": "/big"}
+        messages = [ChatMessage(role="user", content="Hi")]
+
+        assert client._build_request(messages)["model"] == "/model"
+        assert client._build_request(messages, lane="background")["model"] == "/big"
+        assert client._build_request(messages, model="/other")["model"] == "/other"
@@ -0,0 +1,78 @@
+"""
+Test the queued logging pipeline
+"""
+
+import json
+import logging
+import queue
+
+from src.core.logging_setup import LoggingPipeline, NonBlockingQueueHandler
+
+
+class TestLoggingPipeline:
+    """Test LoggingPipeline class"""
+
+    def test_writes_through_background_thread(self, tmp_path):
+        """Test records reach the rotating file once the listener drains"""
+        log_file = tmp_path / "logs" / "openclaw.log"
+        pipeline = LoggingPipeline.from_config({"console": False, "file": str(log_file)})
+        root = logging.getLogger()
+        previous = root.handlers[:]
+
+        pipeline.start()
+        try:
+            assert root.handlers == [pipeline.queue_handler]
+            logging.getLogger("test").info("hello %s", "world")
+        finally:
+            pipeline.stop()
+
+        assert "hello world" in log_file.read_text()
+        assert root.handlers == previous
+
+    def test_json_format(self, tmp_path):
+        """Test format: json writes one JSON object per line"""
+        log_file = tmp_path / "openclaw.log"
+        pipeline = LoggingPipeline.from_config({"console": False, "file": str(log_file), "format": "json"})
+
+        pipeline.start()
+        try:
+            logging.getLogger("test.json").warning("disk %d%% full", 91)
+        finally:
+            pipeline.stop()
+
+        entry = json.loads(log_file.read_text().strip().splitlines()[-1])
+        assert entry["event"] == "disk 91% full"
+        assert entry["level"] == "warning"
+        assert entry["logger"] == "test.json"
+
+    def test_time_rotation_handler(self, tmp_path):
+        """Test rotation: time selects a timed rotating handler"""
+        pipeline = LoggingPipeline.from_config(
+            {"console": False, "file": str(tmp_path / "a.log"), "rotation": "time", "when": "H"}
+        )
+
+        assert isinstance(pipeline.handlers[0], logging.handlers.TimedRotatingFileHandler)
+
+
+class TestNonBlockingQueueHandler:
+    """Test NonBlockingQueueHandler class"""
+
+    def test_defers_formatting(self):
+        """Test records are queued with their arguments unformatted"""
+        log_queue = queue.Queue()
+        handler = NonBlockingQueueHandler(log_queue)
+        record = logging.LogRecord("t", logging.INFO, __file__, 1, "value %s", ("x",), None)
+
+        handler.emit(record)
+
+        queued = log_queue.get_nowait()
+        assert queued.msg == "value %s"
+        assert queued.args == ("x",)
+
+    def test_drops_when_full(self):
+        """Test a full queue drops records instead of blocking"""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        for _ in range(3):
+            handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "m", None, None))
+
+        assert handler.dropped == 2
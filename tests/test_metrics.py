@@ -0,0 +1,87 @@
+"""
+Test Prometheus metrics instrumentation
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.core.llm_client import VLLMClient, ChatMessage
+from src.core.metrics import Metrics, monitor_event_loop_lag
+
+
+class TestMetrics:
+    """Test Metrics class"""
+
+    def test_record_llm_request(self):
+        """Test latency and throughput are observed"""
+        metrics = Metrics()
+
+        metrics.record_llm_request("completion", 2.0, completion_tokens=100, time_to_first_token=0.2)
+
+        registry = metrics.registry
+        assert registry.get_sample_value("openclaw_llm_request_duration_seconds_count", {"mode": "completion"}) == 1
+        assert registry.get_sample_value("openclaw_llm_tokens_per_second_sum") == 50
+        assert registry.get_sample_value("openclaw_llm_time_to_first_token_seconds_sum") == pytest.approx(0.2)
+
+    def test_record_command_and_health(self):
+        """Test command counters and service health gauges"""
+        metrics = Metrics()
+
+        metrics.record_command("ping", 0.01)
+        metrics.record_health({"services": {"vllm": {"status": "healthy"}, "config": {"status": "unhealthy"}}})
+
+        registry = metrics.registry
+        assert registry.get_sample_value("openclaw_discord_commands_total", {"command": "ping", "outcome": "success"}) == 1
+        assert registry.get_sample_value("openclaw_service_healthy", {"service": "vllm"}) == 1
+        assert registry.get_sample_value("openclaw_service_healthy", {"service": "config"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag_monitor(self):
+        """Test loop lag samples are collected"""
+        metrics = Metrics()
+
+        task = asyncio.create_task(monitor_event_loop_lag(metrics, interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert metrics.registry.get_sample_value("openclaw_event_loop_lag_seconds_count") >= 1
+
+
+class TestLLMInstrumentation:
+    """Test VLLMClient metric emission"""
+
+    @pytest.mark.asyncio
+    async def test_completion_and_error_metrics(self, mock_config_manager):
+        """Test successful and failed completions are recorded"""
+        metrics = Metrics()
+        client = VLLMClient(mock_config_manager, metrics=metrics)
+        client.session = MagicMock()
+
+        ok_response = MagicMock()
+        ok_response.status = 200
+
+        async def json():
+            return {"choices": [{"message": {"content": "hi"}}], "usage": {"completion_tokens": 4}}
+
+        ok_response.json = json
+        client.session.post.return_value.__aenter__.return_value = ok_response
+
+        await client.get_completion([ChatMessage(role="user", content="Hi")])
+
+        error_response = MagicMock()
+        error_response.status = 500
+
+        async def text():
+            return "unavailable"
+
+        error_response.text = text
+        client.session.post.return_value.__aenter__.return_value = error_response
+
+        await client.get_completion([ChatMessage(role="user", content="Hi")])
+
+        registry = metrics.registry
+        assert registry.get_sample_value("openclaw_llm_request_duration_seconds_count", {"mode": "completion"}) == 1
+        assert registry.get_sample_value("openclaw_llm_errors_total", {"status": "500"}) == 1
+        assert registry.get_sample_value("openclaw_llm_requests_in_flight") == 0
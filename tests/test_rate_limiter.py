@@ -0,0 +1,127 @@
+"""
+Test rate limiting
+"""
+
+import pytest
+
+from src.core.rate_limiter import MemoryRateLimitBackend, RateLimiter, SQLiteRateLimitBackend
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter:
+    """Test RateLimiter class"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_limited(self):
+        """Test a user gets their burst and then has to wait for a refill"""
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, burst=3, clock=clock)
+
+        for _ in range(3):
+            assert (await limiter.check("u1")).allowed
+
+        decision = await limiter.check("u1")
+        assert not decision.allowed
+        assert decision.scope == "user"
+        assert decision.retry_after == pytest.approx(1.0)
+
+        clock.now += 1.0
+        assert (await limiter.check("u1")).allowed
+
+    @pytest.mark.asyncio
+    async def test_users_are_independent(self):
+        """Test one user's usage does not limit another"""
+        limiter = RateLimiter(requests_per_minute=60, burst=1, clock=FakeClock())
+
+        assert (await limiter.check("u1")).allowed
+        assert not (await limiter.check("u1")).allowed
+        assert (await limiter.check("u2")).allowed
+
+    @pytest.mark.asyncio
+    async def test_guild_limit_is_shared(self):
+        """Test the guild bucket limits users together"""
+        limiter = RateLimiter(requests_per_minute=60, guild_requests_per_minute=2, clock=FakeClock())
+
+        assert (await limiter.check("u1", guild_id=1)).allowed
+        assert (await limiter.check("u2", guild_id=1)).allowed
+
+        decision = await limiter.check("u3", guild_id=1)
+        assert not decision.allowed
+        assert decision.scope == "guild"
+        assert (await limiter.check("u3", guild_id=2)).allowed
+
+    @pytest.mark.asyncio
+    async def test_command_limit_does_not_consume_on_denial(self):
+        """Test a denied request leaves the other buckets untouched"""
+        limiter = RateLimiter(requests_per_minute=60, burst=5, command_limits={"chat": 1}, clock=FakeClock())
+
+        assert (await limiter.check("u1", command="chat")).allowed
+        assert (await limiter.check("u1", command="chat")).scope == "command"
+
+        # Only the one allowed request came out of the user bucket
+        for _ in range(4):
+            assert (await limiter.check("u1", command="ping")).allowed
+        assert not (await limiter.check("u1", command="ping")).allowed
+
+    @pytest.mark.asyncio
+    async def test_exempt_users_bypass(self):
+        """Test admin users are never limited"""
+        limiter = RateLimiter(requests_per_minute=60, burst=1, exempt_users=[42], clock=FakeClock())
+
+        for _ in range(5):
+            assert (await limiter.check(42)).allowed
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_reset_bypass(self):
+        """Test a limited user can still cancel work or reset their conversation"""
+        limiter = RateLimiter(requests_per_minute=60, burst=1, clock=FakeClock())
+
+        assert (await limiter.check("u1", command="chat")).allowed
+        assert not (await limiter.check("u1", command="chat")).allowed
+        assert (await limiter.check("u1", command="cancel")).allowed
+        assert (await limiter.check("u1", command="reset")).allowed
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_are_swept(self):
+        """Test buckets idle past a full refill are dropped"""
+        clock = FakeClock()
+        backend = MemoryRateLimitBackend()
+        limiter = RateLimiter(requests_per_minute=60, burst=10, backend=backend, sweep_interval=5, clock=clock)
+
+        await limiter.check("u1")
+        await limiter.check("u2")
+        assert len(backend) == 2
+
+        clock.now += 30
+        await limiter.check("u3")
+        assert len(backend) == 1
+
+    def test_disabled_config_returns_none(self):
+        """Test from_config honours enabled: false"""
+        assert RateLimiter.from_config({"rate_limiting": {"enabled": False}}) is None
+        limiter = RateLimiter.from_config({"rate_limiting": {"enabled": True, "requests_per_minute": 12}})
+        assert limiter.requests_per_minute == 12
+
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_shares_state(self, tmp_path):
+        """Test two limiters on one SQLite file share buckets"""
+        path = str(tmp_path / "limits.sqlite")
+        clock = FakeClock()
+        first = RateLimiter(requests_per_minute=60, burst=2, backend=SQLiteRateLimitBackend(path), clock=clock)
+        second = RateLimiter(requests_per_minute=60, burst=2, backend=SQLiteRateLimitBackend(path), clock=clock)
+
+        assert (await first.check("u1")).allowed
+        assert (await second.check("u1")).allowed
+        assert not (await first.check("u1")).allowed
+
+        first.close()
+        second.close()
@@ -0,0 +1,191 @@
+"""
+Test the bare-mirror repository cache
+"""
+
+import os
+import subprocess
+
+import pytest
+
+from src.github import repo_cache
+from src.github.repo_cache import RepoCache, RepoCacheError
+
+
+def git(*args, cwd):
+    """Run git in a test repository"""
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+        GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com"
+    )
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def make_upstream(root, repo, content="v1", size=0):
+    """Create a local repository standing in for github.com/<repo>"""
+    path = root / repo
+    path.mkdir(parents=True)
+    git("init", "--quiet", "--initial-branch=main", cwd=path)
+    (path / "README.md").write_text(content)
+    if size:
+        (path / "blob.bin").write_bytes(os.urandom(size))
+    git("add", ".", cwd=path)
+    git("commit", "--quiet", "-m", content, cwd=path)
+    return path
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Directory of fake upstream repositories"""
+    return tmp_path / "upstream"
+
+
+@pytest.fixture
+def cache(tmp_path, upstream):
+    """Repo cache cloning from the fake upstream directory"""
+    repo_cache = RepoCache(str(tmp_path / "cache"), url_template=f"{upstream}/{{repo}}", fetch_interval=0)
+    yield repo_cache
+    repo_cache.close()
+
+
+class TestRepoCache:
+    """Test RepoCache"""
+
+    @pytest.mark.asyncio
+    async def test_checkout_from_mirror(self, cache, upstream):
+        """The first checkout clones a mirror; later ones fetch into it"""
+        make_upstream(upstream, "octo/app")
+
+        async with cache.checkout("octo/app") as first:
+            assert (first.path / "README.md").read_text() == "v1"
+            assert cache.mirror_path("octo/app").exists()
+        assert not first.path.exists()
+
+        source = upstream / "octo/app"
+        (source / "README.md").write_text("v2")
+        git("commit", "--quiet", "-am", "v2", cwd=source)
+
+        async with cache.checkout("octo/app", "main") as second:
+            assert (second.path / "README.md").read_text() == "v2"
+            assert second.commit == git("rev-parse", "HEAD", cwd=source)
+
+        stats = await cache.get_stats()
+        assert stats["clones"] == 1
+        assert stats["fetches"] == 1
+        assert stats["mirrors"] == 1
+        assert stats["active_checkouts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_checkouts_share_one_mirror(self, cache, upstream):
+        """Several tasks on one repo get separate worktrees of a single mirror"""
+        make_upstream(upstream, "octo/app")
+
+        first = await cache.create_checkout("octo/app")
+        second = await cache.create_checkout("octo/app")
+        try:
+            assert first.path != second.path
+            assert first.commit == second.commit
+        finally:
+            await cache.remove_checkout(first)
+            await cache.remove_checkout(second)
+
+        assert cache.stats["clones"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_skipped_within_interval(self, cache, upstream):
+        """A fresh mirror is not fetched again until fetch_interval passes"""
+        make_upstream(upstream, "octo/app")
+        cache.fetch_interval = 3600
+
+        await cache.ensure_mirror("octo/app")
+        await cache.ensure_mirror("octo/app")
+        await cache.ensure_mirror("octo/app", refresh=True)
+
+        assert cache.stats["fetch_skipped"] == 1
+        assert cache.stats["fetches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_mirror(self, cache, upstream):
+        """Over max_bytes, the coldest mirror without checkouts is removed"""
+        make_upstream(upstream, "octo/cold", size=200_000)
+        make_upstream(upstream, "octo/warm", size=200_000)
+        make_upstream(upstream, "octo/busy", size=200_000)
+
+        await cache.ensure_mirror("octo/cold")
+        await cache.ensure_mirror("octo/warm")
+        os.utime(cache.mirror_path("octo/cold") / "openclaw-last-used", (1, 1))
+        # Three mirrors plus the live checkout of octo/busy, about 200 kB each
+        cache.max_bytes = 700_000
+
+        async with cache.checkout("octo/busy"):
+            pass
+
+        assert not cache.mirror_path("octo/cold").exists()
+        assert cache.mirror_path("octo/warm").exists()
+        assert cache.mirror_path("octo/busy").exists()
+        assert cache.stats["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_live_checkouts_count_against_max_bytes(self, cache, upstream):
+        """A checkout's files push cold mirrors out and stop counting once it is removed"""
+        make_upstream(upstream, "octo/cold", size=200_000)
+        make_upstream(upstream, "octo/busy", size=200_000)
+        await cache.ensure_mirror("octo/cold")
+        os.utime(cache.mirror_path("octo/cold") / "openclaw-last-used", (1, 1))
+        cache.max_bytes = 500_000
+
+        async with cache.checkout("octo/busy"):
+            stats = await cache.get_stats()
+            assert stats["checkout_bytes"] >= 200_000
+            assert not cache.mirror_path("octo/cold").exists()
+
+        stats = await cache.get_stats()
+        assert stats["checkout_bytes"] == 0
+        assert stats["bytes"] <= cache.max_bytes
+
+    @pytest.mark.asyncio
+    async def test_checkouts_do_not_walk_every_mirror(self, cache, upstream, monkeypatch):
+        """Mirror sizes are measured on clone/fetch, not rescanned by every checkout"""
+        make_upstream(upstream, "octo/one")
+        make_upstream(upstream, "octo/two")
+        cache.fetch_interval = 3600
+        await cache.ensure_mirror("octo/one")
+        await cache.ensure_mirror("octo/two")
+        await cache.evict()
+
+        walked = []
+        real_size = repo_cache.directory_size
+        monkeypatch.setattr(repo_cache, "directory_size", lambda path: walked.append(path) or real_size(path))
+        for _ in range(3):
+            async with cache.checkout("octo/one"):
+                pass
+
+        # Only each new worktree is measured, never the mirrors
+        assert len(walked) == 3
+        assert all(cache.worktrees_dir in path.parents for path in walked)
+        stats = await cache.get_stats()
+        assert stats["mirrors"] == 2
+        assert stats["bytes"] == real_size(cache.mirrors_dir)
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_repo_names_and_missing_repos(self, cache):
+        """Repository names cannot escape the cache and clone failures raise"""
+        with pytest.raises(RepoCacheError):
+            cache.mirror_path("../etc")
+        with pytest.raises(RepoCacheError):
+            await cache.ensure_mirror("octo/missing")
+
+        assert not cache.mirrors_dir.joinpath("octo").exists() or not any(cache.mirrors_dir.joinpath("octo").iterdir())
+
+    def test_token_passed_through_environment_not_argv(self, tmp_path):
+        """The access token never appears on the git command line"""
+        cache = RepoCache(str(tmp_path / "cache"), token="ghs_secret")
+        try:
+            env = cache._git_env()
+        finally:
+            cache.close()
+
+        index = int(env["GIT_CONFIG_COUNT"]) - 1
+        assert env[f"GIT_CONFIG_KEY_{index}"] == "http.extraHeader"
+        assert env[f"GIT_CONFIG_VALUE_{index}"].startswith("Authorization: Basic ")
+        assert "ghs_secret" not in " ".join(env.values())
@@ -0,0 +1,181 @@
+"""
+Test retry policy and circuit breaker
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+
+from src.core.llm_client import VLLMClient, ChatMessage
+from src.core.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(status, headers=None, content=""):
+    """Build a mock aiohttp response"""
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {}
+    response.json = AsyncMock(return_value={"choices": [{"message": {"content": content}}]})
+    response.text = AsyncMock(return_value="error")
+    return response
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy class"""
+
+    def test_parse_retry_after(self):
+        """Test seconds and HTTP-date forms are parsed"""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == 10.0
+        assert parse_retry_after("garbage") is None
+        assert parse_retry_after(None) is None
+
+    def test_should_retry(self):
+        """Test only configured statuses are retried within the attempt budget"""
+        policy = RetryPolicy(max_attempts=3)
+
+        assert policy.should_retry(503, 1)
+        assert policy.should_retry(429, 2)
+        assert not policy.should_retry(503, 3)
+        assert not policy.should_retry(500, 1)
+
+    def test_compute_delay(self):
+        """Test jittered backoff is capped and Retry-After wins"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+
+        for attempt in range(1, 6):
+            assert 0 <= policy.compute_delay(attempt) <= min(4.0, 2 ** (attempt - 1))
+        assert policy.compute_delay(1, retry_after=2.5) == 2.5
+        assert policy.compute_delay(1, retry_after=60) == 4.0
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker class"""
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        """Test consecutive failures open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        assert breaker.get_stats()["rejected"] == 1
+
+    def test_half_open_probe_recovers(self):
+        """Test a successful probe closes the circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """Test a failed probe reopens the circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.get_stats()["retry_in_seconds"] == 10
+
+
+class TestVLLMClientResilience:
+    """Test retry and breaker integration in VLLMClient"""
+
+    def _client(self, mock_config_manager, responses):
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.session.post.return_value.__aenter__.side_effect = responses
+        return client
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_status_honouring_retry_after(self, mock_config_manager):
+        """Test 503 is retried after the Retry-After delay"""
+        client = self._client(mock_config_manager, [
+            make_response(503, {"Retry-After": "2"}),
+            make_response(200, content="recovered"),
+        ])
+
+        with patch("src.core.llm_client.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await client.get_completion([ChatMessage(role="user", content="Hi")])
+
+        assert result == "recovered"
+        sleep.assert_awaited_once_with(2.0)
+        assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_retry_then_open_circuit(self, mock_config_manager):
+        """Test repeated connection failures trip the breaker and later calls fail fast"""
+        client = self._client(mock_config_manager, aiohttp.ClientConnectionError("refused"))
+        client.retry_policy = RetryPolicy(max_attempts=2)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=2)
+
+        with patch("src.core.llm_client.asyncio.sleep", new=AsyncMock()):
+            assert await client.get_completion([ChatMessage(role="user", content="Hi")]) is None
+
+        assert client.circuit_breaker.state == CircuitBreaker.OPEN
+        calls = client.session.post.call_count
+
+        assert await client.get_completion([ChatMessage(role="user", content="Hi")]) is None
+        assert client.session.post.call_count == calls
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, mock_config_manager):
+        """Test 400 responses return immediately"""
+        client = self._client(mock_config_manager, [make_response(400)])
+
+        assert await client.get_completion([ChatMessage(role="user", content="Hi")]) is None
+        assert client.session.post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_probe_releases_slot(self, mock_config_manager):
+        """Test a probe cancelled mid-request does not leave the breaker stuck half-open"""
+        async def hang(*args):
+            await asyncio.Event().wait()
+
+        client = self._client(mock_config_manager, hang)
+        client.single_flight = None
+        clock = FakeClock()
+        client.circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+        client.circuit_breaker.record_failure()
+        clock.now = 5
+
+        async def consume():
+            return [chunk async for chunk in client.stream_completion([ChatMessage(role="user", content="Hi")])]
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(consume(), timeout=0.05)
+        assert client.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+
+        client.session.post.return_value.__aenter__.side_effect = [make_response(200, content="back")]
+        assert await client.get_completion([ChatMessage(role="user", content="Hi")]) == "back"
+        assert client.circuit_breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,176 @@
+"""
+Test response cache functionality
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.core.llm_client import VLLMClient, ChatMessage
+from src.core.response_cache import ResponseCache, SQLiteCacheBackend, make_cache_key
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Test ResponseCache class"""
+
+    def test_cache_key_is_stable(self):
+        """Test identical requests hash to the same key"""
+        messages = [{"role": "user", "content": "hi"}]
+        key = make_cache_key("/model", messages, 100, 0)
+
+        assert key == make_cache_key("/model", [{"content": "hi", "role": "user"}], 100, 0)
+        assert key != make_cache_key("/model", messages, 101, 0)
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted"""
+        cache = ResponseCache()
+
+        assert cache.get("k") is None
+        await cache.set("k", "value")
+        assert cache.get("k") == "value"
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ResponseCache(ttl_seconds=10, clock=clock)
+        await cache.set("k", "value")
+
+        clock.now += 11
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_entries(self):
+        """Test least recently used entries are evicted first"""
+        cache = ResponseCache(max_entries=2)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        cache.get("a")
+        await cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_byte_cap(self):
+        """Test the byte budget bounds total size"""
+        cache = ResponseCache(max_bytes=10)
+        await cache.set("a", "12345")
+        await cache.set("b", "123456")
+        await cache.set("huge", "x" * 11)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "123456"
+        assert cache.get("huge") is None
+        assert cache.total_bytes == 6
+
+    @pytest.mark.asyncio
+    async def test_persistence_survives_restart(self, tmp_path):
+        """Test cached entries reload from the SQLite backend"""
+        path = tmp_path / "cache.sqlite"
+        clock = FakeClock()
+
+        cache = ResponseCache(ttl_seconds=60, backend=SQLiteCacheBackend(str(path)), clock=clock)
+        await cache.set("keep", "persisted")
+        await cache.set("old", "stale")
+        cache.close()
+
+        reloaded = ResponseCache(backend=SQLiteCacheBackend(str(path)), clock=clock)
+        await reloaded.load()
+        assert reloaded.get("keep") == "persisted"
+        reloaded.close()
+
+        clock.now += 120
+        expired = ResponseCache(backend=SQLiteCacheBackend(str(path)), clock=clock)
+        await expired.load()
+        assert len(expired) == 0
+        expired.close()
+
+
+class TestVLLMClientCaching:
+    """Test cache integration in VLLMClient"""
+
+    def _client(self, mock_config_manager):
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.cache = ResponseCache()
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+
+        async def json():
+            return {"choices": [{"message": {"content": "Cached answer"}}]}
+
+        mock_response.json = json
+        client.session.post.return_value.__aenter__.return_value = mock_response
+        return client
+
+    @pytest.mark.asyncio
+    async def test_deterministic_requests_are_cached(self, mock_config_manager):
+        """Test temperature-0 completions hit the cache on repeat"""
+        client = self._client(mock_config_manager)
+        messages = [ChatMessage(role="user", content="How do I rebuild?")]
+
+        assert await client.get_completion(messages, temperature=0) == "Cached answer"
+        assert await client.get_completion(messages, temperature=0) == "Cached answer"
+
+        assert client.session.post.call_count == 1
+        assert client.cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_sampled_requests_bypass_cache_unless_requested(self, mock_config_manager):
+        """Test non-zero temperature is only cached when cache=True"""
+        client = self._client(mock_config_manager)
+        messages = [ChatMessage(role="user", content="Tell me a joke")]
+
+        await client.get_completion(messages, temperature=0.7)
+        await client.get_completion(messages, temperature=0.7)
+        assert client.session.post.call_count == 2
+        assert len(client.cache) == 0
+
+        await client.get_completion(messages, temperature=0.7, cache=True)
+        await client.get_completion(messages, temperature=0.7, cache=True)
+        assert client.session.post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cache_writes_happen_after_the_slot_is_released(self, mock_config_manager):
+        """Test storing a reply never occupies a scheduler slot, streamed or not"""
+        client = self._client(mock_config_manager)
+        in_flight = []
+        real_set = client.cache.set
+
+        async def recording_set(key, value):
+            in_flight.append(client.scheduler.in_flight)
+            await real_set(key, value)
+
+        client.cache.set = recording_set
+        await client.get_completion([ChatMessage(role="user", content="One")], temperature=0)
+
+        async def lines():
+            yield b'data: {"choices": [{"delta": {"content": "Two"}}]}\n'
+            yield b"data: [DONE]\n"
+
+        client.session.post.return_value.__aenter__.return_value.content = lines()
+        chunks = [c async for c in client.stream_completion([ChatMessage(role="user", content="Two")], temperature=0)]
+
+        assert chunks == ["Two"]
+        assert in_flight == [0, 0]
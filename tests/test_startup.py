@@ -0,0 +1,127 @@
+"""
+Test the startup pipeline
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.startup import StartupError, StartupPipeline
+
+
+class TestStartupPipeline:
+    """Test StartupPipeline class"""
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        """Test steps without dependencies between them overlap"""
+        running = set()
+        overlapped = []
+
+        def step(name):
+            async def run():
+                running.add(name)
+                await asyncio.sleep(0.01)
+                overlapped.append(len(running) > 1)
+                running.discard(name)
+            return run
+
+        pipeline = StartupPipeline()
+        pipeline.add("a", step("a")).add("b", step("b"))
+        report = await pipeline.run()
+
+        assert any(overlapped)
+        assert {r.name for r in report.results} == {"a", "b"}
+        assert report.ready_seconds is not None
+
+    @pytest.mark.asyncio
+    async def test_dependencies_run_first(self):
+        """Test a step starts only after the steps it depends on"""
+        order = []
+
+        async def config():
+            await asyncio.sleep(0.005)
+            order.append("config")
+
+        pipeline = StartupPipeline()
+        pipeline.add("client", lambda: order.append("client"), depends_on=("config",))
+        pipeline.add("config", config)
+        await pipeline.run()
+
+        assert order == ["config", "client"]
+
+    @pytest.mark.asyncio
+    async def test_background_step_does_not_block_ready(self):
+        """Test a slow background probe finishes after the pipeline is ready"""
+        probe_done = asyncio.Event()
+
+        async def probe():
+            await asyncio.sleep(0.05)
+            probe_done.set()
+
+        pipeline = StartupPipeline()
+        pipeline.add("client", lambda: None)
+        pipeline.add("probe", probe, depends_on=("client",), background=True)
+        await pipeline.run()
+
+        assert not probe_done.is_set()
+        await pipeline.wait_background(timeout=1)
+        assert probe_done.is_set()
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_aborts(self):
+        """Test a failing critical step raises StartupError"""
+        def broken():
+            raise RuntimeError("no config")
+
+        pipeline = StartupPipeline()
+        pipeline.add("config", broken)
+        pipeline.add("client", lambda: None, depends_on=("config",))
+
+        with pytest.raises(StartupError, match="config"):
+            await pipeline.run()
+
+    @pytest.mark.asyncio
+    async def test_non_critical_failure_is_recorded(self):
+        """Test a failing optional step is reported without aborting"""
+        def broken():
+            raise RuntimeError("port in use")
+
+        pipeline = StartupPipeline()
+        pipeline.add("metrics", broken, critical=False)
+        report = await pipeline.run()
+
+        assert not report.results[0].ok
+        assert "port in use" in report.format()
+
+    def test_rejects_cycles_and_unknown_dependencies(self):
+        """Test invalid graphs are rejected before anything runs"""
+        pipeline = StartupPipeline()
+        pipeline.add("a", lambda: None, depends_on=("b",))
+        pipeline.add("b", lambda: None, depends_on=("a",))
+        with pytest.raises(ValueError, match="cycle"):
+            pipeline._validate()
+
+        pipeline = StartupPipeline()
+        pipeline.add("a", lambda: None, depends_on=("missing",))
+        with pytest.raises(ValueError, match="unknown"):
+            pipeline._validate()
+
+
+class TestOpenClawAgent:
+    """Test OpenClawAgent lifecycle"""
+
+    @pytest.mark.asyncio
+    async def test_failed_initialize_still_cleans_up(self):
+        """Components started before a critical step failed are stopped on exit"""
+        from src.core.main import OpenClawAgent
+
+        agent = OpenClawAgent()
+        agent._install_signal_handlers = MagicMock()
+        agent.initialize = AsyncMock(return_value=False)
+        agent.cleanup = AsyncMock()
+
+        await agent.run()
+
+        agent.cleanup.assert_awaited_once()
@@ -0,0 +1,79 @@
+"""
+Test streaming Discord response helpers
+"""
+
+import pytest
+
+from src.discord.chat.streaming import (
+    StreamingResponder,
+    THINKING_PLACEHOLDER,
+    clean_response,
+    render_partial,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStreamingHelpers:
+    """Test response rendering helpers"""
+
+    def test_clean_response_strips_think_block(self):
+        """Test reasoning is removed from the final answer"""
+        text = "<think>internal notes</think>Here is the final answer."
+        assert clean_response(text) == "Here is the final answer."
+
+    def test_clean_response_keeps_original_when_too_short(self):
+        """Test fallback to the original text when cleaning empties it"""
+        text = "<think>notes</think>ok"
+        assert clean_response(text) == text
+
+    def test_render_partial_hides_open_think_block(self):
+        """Test unfinished reasoning renders as a placeholder"""
+        assert render_partial("<think>still going") == THINKING_PLACEHOLDER
+        assert render_partial("<think>done</think> Answer") == "Answer"
+        assert render_partial("Plain") == "Plain"
+
+
+class TestStreamingResponder:
+    """Test StreamingResponder edit cadence"""
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_edits_immediately_then_rate_limits(self):
+        """Test edits are coalesced to the configured interval"""
+        edits = []
+        clock = FakeClock()
+
+        async def edit(text):
+            edits.append(text)
+
+        responder = StreamingResponder(edit, interval=1.0, clock=clock)
+
+        await responder.feed("Hello")
+        await responder.feed(" there")
+        clock.now = 0.5
+        await responder.feed(" friend")
+        assert edits == ["Hello"]
+
+        clock.now = 1.2
+        await responder.feed("!")
+        assert edits == ["Hello", "Hello there friend!"]
+        assert responder.edits == 2
+
+        assert await responder.finish() == "Hello there friend!"
+
+    @pytest.mark.asyncio
+    async def test_finish_without_chunks_returns_empty(self):
+        """Test an empty stream produces no response"""
+        async def edit(text):
+            raise AssertionError("should not edit")
+
+        responder = StreamingResponder(edit)
+        assert await responder.finish() == ""
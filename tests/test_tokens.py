@@ -0,0 +1,166 @@
+"""
+Test token counting and prompt budgeting
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.core.llm_client import VLLMClient, ChatMessage
+from src.core.tokens import PromptBudget, TokenCounter, TokenUsage, TRUNCATION_MARKER
+
+
+class TestTokenCounter:
+    """Test TokenCounter class"""
+
+    def test_counts_are_cached(self):
+        """Test repeated texts are counted once"""
+        calls = []
+
+        def encode(text):
+            calls.append(text)
+            return text.split()
+
+        counter = TokenCounter(encode=encode)
+
+        assert counter.count("one two three") == 3
+        assert counter.count("one two three") == 3
+        assert calls == ["one two three"]
+        assert counter.get_stats()["hits"] == 1
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used count is evicted"""
+        counter = TokenCounter(cache_size=2)
+        for text in ("a", "b", "c"):
+            counter.count(text)
+
+        assert counter.get_stats()["cached_texts"] == 2
+
+    def test_truncate_keeps_start_and_end(self):
+        """Test truncation cuts the middle and fits the limit"""
+        counter = TokenCounter()
+        text = "START " + "x" * 4000 + " END"
+
+        truncated = counter.truncate(text, 100)
+
+        assert counter.count(truncated) <= 100
+        assert truncated.startswith("START")
+        assert truncated.endswith("END")
+        assert TRUNCATION_MARKER in truncated
+
+    def test_truncate_leaves_short_text(self):
+        """Test text under the limit is returned unchanged"""
+        assert TokenCounter().truncate("short", 100) == "short"
+
+
+class TestPromptBudget:
+    """Test PromptBudget class"""
+
+    def test_clamps_max_tokens_to_remaining_window(self):
+        """Test max_tokens never exceeds the room left after the prompt"""
+        counter = TokenCounter()
+        messages = [{"role": "user", "content": "x" * 400}]
+        budget = PromptBudget(context_window=500, min_completion_tokens=10)
+
+        fitted, max_tokens, prompt_tokens = budget.fit(counter, messages, 4000)
+
+        assert fitted == messages
+        assert max_tokens == 500 - prompt_tokens
+
+    def test_drops_oldest_history_before_truncating(self):
+        """Test old turns go first while the system prompt and latest message stay"""
+        counter = TokenCounter()
+        messages = [
+            {"role": "system", "content": "system"},
+            {"role": "user", "content": "old " * 200},
+            {"role": "assistant", "content": "reply " * 200},
+            {"role": "user", "content": "latest question"},
+        ]
+        budget = PromptBudget(context_window=200, min_completion_tokens=50)
+
+        fitted, _, prompt_tokens = budget.fit(counter, messages, 100)
+
+        assert [m["content"] for m in fitted] == ["system", "latest question"]
+        assert prompt_tokens <= 150
+
+    def test_truncates_oversized_single_message(self):
+        """Test a lone message larger than the window is cut down to fit"""
+        counter = TokenCounter()
+        messages = [{"role": "user", "content": "y" * 10000}]
+        budget = PromptBudget(context_window=300, min_completion_tokens=50)
+
+        fitted, max_tokens, prompt_tokens = budget.fit(counter, messages, 100)
+
+        assert prompt_tokens <= 250
+        assert max_tokens >= 50
+        assert messages[0]["content"] == "y" * 10000
+
+
+class TestTokenUsage:
+    """Test TokenUsage class"""
+
+    def test_records_reported_usage(self):
+        """Test usage blocks accumulate and missing usage is ignored"""
+        usage = TokenUsage()
+
+        assert usage.record({"prompt_tokens": 10, "completion_tokens": 5}) == (10, 5)
+        assert usage.record(None) == (None, None)
+
+        stats = usage.get_stats()
+        assert stats["requests"] == 1
+        assert stats["prompt_tokens"] == 10
+        assert stats["completion_tokens"] == 5
+
+
+class TestClientBudgeting:
+    """Test VLLMClient fits requests before sending"""
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_is_fitted(self, mock_config_manager):
+        """Test the payload is trimmed and max_tokens clamped to the window"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+        client.budget = PromptBudget(context_window=1000, min_completion_tokens=100)
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.json = AsyncMock(return_value={
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 880, "completion_tokens": 2}
+        })
+        client.session.post.return_value.__aenter__.return_value = mock_response
+
+        await client.get_completion([ChatMessage(role="user", content="z" * 20000)], max_tokens=4000)
+
+        json_data = client.session.post.call_args[1]["json"]
+        assert len(json_data["messages"][0]["content"]) < 20000
+        assert json_data["max_tokens"] <= 1000 - client.tokens.count_messages(json_data["messages"])
+        assert client.token_usage.get_stats()["truncated_requests"] == 1
+        assert client.token_usage.prompt_tokens == 880
+
+    @pytest.mark.asyncio
+    async def test_stream_usage_chunk_is_recorded(self, mock_config_manager):
+        """Test the final usage chunk of a stream is accounted"""
+        client = VLLMClient(mock_config_manager)
+        client.session = MagicMock()
+
+        lines = [
+            b'data: {"choices": [{"delta": {"content": "Hi"}}], "usage": null}\n',
+            b'data: {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 1}}\n',
+            b'data: [DONE]\n',
+        ]
+
+        async def iter_lines():
+            for line in lines:
+                yield line
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.content = iter_lines()
+        client.session.post.return_value.__aenter__.return_value = mock_response
+
+        chunks = [chunk async for chunk in client.stream_completion([ChatMessage(role="user", content="Hi")])]
+
+        assert chunks == ["Hi"]
+        assert client.session.post.call_args[1]["json"]["stream_options"] == {"include_usage": True}
+        assert client.token_usage.prompt_tokens == 12
+        assert client.token_usage.completion_tokens == 1
@@ -0,0 +1,163 @@
+"""
+Test the Discord interaction work queue
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.metrics import Metrics
+from src.discord.commands.work_queue import InteractionWorkQueue, Job, WorkQueueFull
+
+
+def make_job(order, name, guild_id=1, user_id=1, delay=0.0, **kwargs):
+    """Job that records its name when it runs"""
+    async def run():
+        await asyncio.sleep(delay)
+        order.append(name)
+    return Job(command="status", run=run, guild_id=guild_id, user_id=user_id, **kwargs)
+
+
+async def drain(queue):
+    """Wait until nothing is waiting or running"""
+    for _ in range(500):
+        if queue.pending == 0 and not queue.get_stats()["running"]:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("work queue did not drain")
+
+
+class TestInteractionWorkQueue:
+    """Test InteractionWorkQueue scheduling"""
+
+    @pytest.mark.asyncio
+    async def test_guilds_take_turns(self):
+        """A burst from one guild does not delay another guild's first job"""
+        queue = InteractionWorkQueue(workers=1)
+        order = []
+        for n in range(3):
+            queue.submit(make_job(order, f"a{n}", guild_id=1))
+        queue.submit(make_job(order, "b0", guild_id=2))
+
+        queue.start()
+        try:
+            await drain(queue)
+        finally:
+            await queue.stop()
+
+        assert order == ["a0", "b0", "a1", "a2"]
+        assert queue.outcomes["success"] == 4
+
+    @pytest.mark.asyncio
+    async def test_queue_limits(self):
+        """Submissions beyond the total or per-guild limit are refused"""
+        queue = InteractionWorkQueue(workers=1, max_pending=3, max_pending_per_guild=2)
+        order = []
+        queue.submit(make_job(order, "a0", guild_id=1))
+        queue.submit(make_job(order, "a1", guild_id=1))
+
+        with pytest.raises(WorkQueueFull):
+            queue.submit(make_job(order, "a2", guild_id=1))
+
+        queue.submit(make_job(order, "b0", guild_id=2))
+        with pytest.raises(WorkQueueFull):
+            queue.submit(make_job(order, "c0", guild_id=3))
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_job_and_reports(self):
+        """A job over its timeout is cancelled and its failure callback runs"""
+        queue = InteractionWorkQueue(workers=1, job_timeout=0.05)
+        failures = []
+
+        async def on_failure(outcome):
+            failures.append(outcome)
+
+        order = []
+        queue.submit(make_job(order, "slow", delay=10, on_failure=on_failure))
+        queue.start()
+        try:
+            await drain(queue)
+        finally:
+            await queue.stop()
+
+        assert order == []
+        assert failures == ["timeout"]
+        assert queue.outcomes["timeout"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_ignores_jobs_that_already_ended(self):
+        """A timed-out job still reporting its failure is not reported as cancelled"""
+        queue = InteractionWorkQueue(workers=1, job_timeout=0.01)
+        reporting = asyncio.Event()
+        release = asyncio.Event()
+
+        async def on_failure(outcome):
+            reporting.set()
+            await release.wait()
+
+        job = queue.submit(make_job([], "slow", user_id=7, delay=10, on_failure=on_failure))
+        queue.start()
+        try:
+            await asyncio.wait_for(reporting.wait(), timeout=1)
+            assert queue.cancel(job.id) is False
+            assert queue.cancel_user(7, guild_id=1) == 0
+            release.set()
+            await drain(queue)
+        finally:
+            await queue.stop()
+
+        assert queue.outcomes["timeout"] == 1
+        assert queue.outcomes["cancelled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_waiting_and_running_jobs(self):
+        """cancel_user stops a user's running job and drops their waiting ones"""
+        queue = InteractionWorkQueue(workers=1)
+        failures = []
+
+        async def on_failure(outcome):
+            failures.append(outcome)
+
+        order = []
+        queue.submit(make_job(order, "running", user_id=7, delay=10, on_failure=on_failure))
+        queue.submit(make_job(order, "waiting", user_id=7, on_failure=on_failure))
+        queue.submit(make_job(order, "other", user_id=8))
+        queue.start()
+        try:
+            await asyncio.sleep(0.01)
+            assert queue.cancel_user(7, guild_id=1) == 2
+            await drain(queue)
+        finally:
+            await queue.stop()
+
+        assert order == ["other"]
+        assert sorted(failures) == ["cancelled", "cancelled"]
+        assert queue.outcomes == {"success": 1, "error": 0, "timeout": 0, "cancelled": 2}
+        assert queue.cancel(12345) is False
+
+    @pytest.mark.asyncio
+    async def test_errors_and_metrics(self):
+        """Failed jobs are counted and every job's wait and run time is exported"""
+        metrics = Metrics()
+        queue = InteractionWorkQueue(workers=2, metrics=metrics)
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        order = []
+        queue.submit(Job(command="chat", run=boom, guild_id=1))
+        queue.submit(make_job(order, "ok"))
+        queue.start()
+        try:
+            await drain(queue)
+        finally:
+            await queue.stop()
+
+        assert queue.outcomes["error"] == 1
+        assert metrics.registry.get_sample_value(
+            "openclaw_discord_job_duration_seconds_count", {"command": "chat", "outcome": "error"}
+        ) == 1
+        assert metrics.registry.get_sample_value(
+            "openclaw_discord_job_wait_seconds_count", {"command": "status"}
+        ) == 1
+        assert metrics.registry.get_sample_value("openclaw_discord_job_queue_depth") == 0